@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 10:12:41 2026
+
+@author: User
+"""
+
+# apps/figure_cache.py
+# Cached figure rendering for the Streamlit pages.
+#
+# Streamlit reruns the whole script on every widget change, so a page that
+# calls plt.figure()/st.pyplot() rebuilds every matplotlib figure even when
+# only an unrelated widget moved. Here the figure is identified by a hash of
+# the plotted arrays + style options and the rendered PNG/SVG bytes are kept
+# in st.cache_data, which is shared across reruns and sessions.
+from __future__ import annotations
+
+import hashlib
+import io
+from typing import Callable
+
+import numpy as np
+import streamlit as st
+
+# Above this many plotted points, render_figure(..., client_side=None) prefers
+# a client-side st.line_chart (when chart_data is given).
+CLIENT_SIDE_MIN_POINTS = 20000
+
+
+def figure_key(build: Callable, arrays: tuple, style: dict, fmt: str = "png", dpi: int = 150) -> str:
+    """
+    Stable hash for (builder, plotted arrays, style options, output format).
+    Arrays are hashed by dtype, shape and raw bytes; style by its repr.
+    """
+    h = hashlib.blake2b(digest_size=20)
+    h.update(f"{build.__module__}.{build.__qualname__}|{fmt}|{dpi}".encode())
+    for a in arrays:
+        a = np.ascontiguousarray(a)
+        h.update(f"|{a.dtype.str}{a.shape}".encode())
+        h.update(a.tobytes())
+    h.update(repr(sorted(style.items())).encode())
+    return h.hexdigest()
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _render_bytes(key: str, fmt: str, dpi: int, _build: Callable, _arrays: tuple, _style: dict) -> bytes:
+    # key carries the hash; the underscored args are not hashed by Streamlit
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig = _build(*_arrays, **_style)
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, dpi=dpi, bbox_inches="tight")
+    plt.close(fig)
+    return buf.getvalue()
+
+
+def render_figure(
+    build: Callable,
+    *arrays,
+    fmt: str = "png",
+    dpi: int = 150,
+    chart_data=None,
+    client_side: bool | None = False,
+    use_container_width: bool = True,
+    **style,
+) -> None:
+    """
+    Drop-in replacement for ``st.pyplot(build(*arrays, **style))``.
+
+    build       : function returning a matplotlib Figure from (*arrays, **style).
+    fmt         : "png" or "svg".
+    chart_data  : optional DataFrame (index = x, one column per curve) for the
+                  lightweight client-side chart.
+    client_side : True -> always st.line_chart(chart_data);
+                  None -> only when the arrays hold more than CLIENT_SIDE_MIN_POINTS;
+                  False -> always the cached matplotlib image.
+    """
+    if chart_data is not None:
+        n_points = sum(np.size(a) for a in arrays)
+        if client_side or (client_side is None and n_points > CLIENT_SIDE_MIN_POINTS):
+            st.line_chart(chart_data, use_container_width=use_container_width)
+            return
+
+    arrays = tuple(np.asarray(a) for a in arrays)
+    key = figure_key(build, arrays, style, fmt=fmt, dpi=dpi)
+    data = _render_bytes(key, fmt, dpi, _build=build, _arrays=arrays, _style=style)
+
+    if fmt == "svg":
+        st.image(data.decode("utf-8"), use_container_width=use_container_width)
+    else:
+        st.image(data, use_container_width=use_container_width)
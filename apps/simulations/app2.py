@@ -9,6 +9,7 @@ Created on Wed Mar  4 19:27:13 2026
 from __future__ import annotations
 
 import sys
+import time
 from pathlib import Path
 
 import numpy as np
@@ -29,10 +30,20 @@ except Exception:
 PROJECT_ROOT = Path(__file__).resolve().parents[2]  # .../tfgmcr
 SRC_DIR = PROJECT_ROOT / "src"
 REFS_DIR = PROJECT_ROOT / "refs" / "minerva_hydrogen"
+FLUX_CSV = "flux_rhc_numubar_nueconstrained.csv"
+RESPONSE_DE = 0.02  # GeV, Eν spacing of the precomputed flux response
 sys.path.insert(0, str(SRC_DIR))
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
 
-from minerva.flux_folding import flux_folded_binned_xsec
-from ccqe_hydrogen_xsec import dsigma_dQ2_numubar_p
+from minerva.flux_folding import flux_folded_binned_xsec, flux_shape
+from minerva.cut_histogram import MINOS_CUTS, cut_prediction, default_edges, fold_muon_histogram
+from minerva.flux_response import flux_response_matrix, fold_flux_response
+from minerva.convergence import fold_defaults
+from minerva.inputs import find_col, load_cov, load_flux, load_xsec_bins, pick_flux_col
+from instrumentation import instrumented
+from ccqe_hydrogen_xsec import dsigma_dQ2_numubar_p_array, dsigma_dQ2_point_callable
+from apps.figure_cache import render_figure
 
 
 # -----------------------
@@ -54,53 +65,11 @@ st.markdown(
 # -----------------------
 # Helpers
 # -----------------------
-def find_col(df: pd.DataFrame, candidates: list[str]) -> str:
-    cols = list(df.columns)
-    strip_map = {c.strip(): c for c in cols}
-
-    for cand in candidates:
-        if cand in strip_map:
-            return strip_map[cand]
-
-    lower_exact = {c.strip().lower(): c for c in cols}
-    for cand in candidates:
-        cl = cand.strip().lower()
-        if cl in lower_exact:
-            return lower_exact[cl]
-
-    cols_low = [(c, c.strip().lower()) for c in cols]
-    for cand in candidates:
-        cl = cand.strip().lower()
-        for orig, low in cols_low:
-            if cl in low:
-                return orig
-
-    raise KeyError(f"No encuentro columnas {candidates}. Tengo: {list(df.columns)}")
-
-
-def pick_flux_col(df: pd.DataFrame) -> str:
-    for c in df.columns:
-        if c.strip().lower().startswith("flux("):
-            return c
-    return find_col(df, ["flux", "phi"])
-
-
-def read_cov_matrix(path: Path, n: int) -> np.ndarray:
-    V = pd.read_csv(path, header=None).to_numpy(dtype=float)
-    if V.shape == (n, n + 1):
-        V = V[:, 1:]
-    if V.shape == (n + 1, n + 1):
-        V = V[1:, 1:]
-    if V.shape != (n, n):
-        raise ValueError(f"Covarianza con forma {V.shape}, esperaba {(n, n)}. Revisa {path.name}.")
-    return V
-
-
-def dsigma_dQ2_model(Ev: float, Q2: float, params: dict) -> float:
+def dsigma_dQ2_model_array(Ev, Q2, params: dict):
     MA = float(params.get("MA", 1.00))
     MV2 = float(params.get("MV2", 0.71))
     vector_ff = str(params.get("vector_ff", "gkex"))
-    return float(dsigma_dQ2_numubar_p(Ev, Q2, MA=MA, MV2=MV2, vector_ff=vector_ff))
+    return dsigma_dQ2_numubar_p_array(Ev, Q2, MA=MA, MV2=MV2, vector_ff=vector_ff)
 
 
 @st.cache_data(show_spinner=False)
@@ -108,7 +77,7 @@ def load_inputs():
     need = [
         REFS_DIR / "hydrogen_xsec.csv",
         REFS_DIR / "cov_tot.csv",
-        REFS_DIR / "flux_rhc_numubar_nueconstrained.csv",
+        REFS_DIR / FLUX_CSV,
     ]
     missing = [p for p in need if not p.exists()]
     if missing:
@@ -116,33 +85,46 @@ def load_inputs():
             "Faltan archivos en refs/minerva_hydrogen:\n" + "\n".join([str(p) for p in missing])
         )
 
-    xsec = pd.read_csv(REFS_DIR / "hydrogen_xsec.csv")
-    xsec.columns = [c.strip() for c in xsec.columns]
+    q2_low, q2_high, data = load_xsec_bins(REFS_DIR / "hydrogen_xsec.csv")
+    flux_E, flux_phi = load_flux(REFS_DIR / FLUX_CSV)
+    return (q2_low, q2_high, data), (flux_E, flux_phi)
 
-    flux = pd.read_csv(REFS_DIR / "flux_rhc_numubar_nueconstrained.csv")
-    flux.columns = [c.strip() for c in flux.columns]
 
-    return xsec, flux
+def xsec_bins():
+    return load_inputs()[0]
 
 
-@st.cache_data(show_spinner=True)
-def compute_fluxfolded_prediction(MA: float, MV2: float, vector_ff: str, nQ2: int, Ev_max: float):
-    xsec, flux = load_inputs()
+def read_flux_table(flux: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """(E, φ) from a flux table with an energy column and a flux column (sorted in E)."""
+    flux.columns = [str(c).strip() for c in flux.columns]
+    E = pd.to_numeric(flux[find_col(flux, ["Energy(GeV)", "Energy", "E", "enu"])], errors="coerce").to_numpy(float)
+    phi = pd.to_numeric(flux[pick_flux_col(flux)], errors="coerce").to_numpy(float)
+    ok = np.isfinite(E) & np.isfinite(phi)
+    if ok.sum() < 5:
+        raise ValueError("El CSV de flujo necesita al menos 5 filas numéricas (energía, flujo).")
+    order = np.argsort(E[ok], kind="stable")
+    return E[ok][order], phi[ok][order]
 
-    col_q2lo = find_col(xsec, ["Q2low", "Q2Low", "Q2_low"])
-    col_q2hi = find_col(xsec, ["Q2High", "Q2high", "Q2_hi", "Q2_high"])
-    col_xsec = find_col(xsec, ["xsec", "XSec", "dsigma", "dsigdq2", "dsigma_dQ2"])
 
-    q2_low = xsec[col_q2lo].to_numpy(float)
-    q2_high = xsec[col_q2hi].to_numpy(float)
-    data = xsec[col_xsec].to_numpy(float)
+@st.cache_data(show_spinner=False)
+def local_flux_csvs() -> list[Path]:
+    """Flux tables under refs/ and data/raw/ (an energy column and a 'flux(...)' column)."""
+    found = []
+    for root in (PROJECT_ROOT / "refs", PROJECT_ROOT / "data" / "raw"):
+        for p in sorted(root.rglob("*.csv")) if root.exists() else []:
+            try:
+                cols = [c.strip().lower() for c in pd.read_csv(p, nrows=5).columns]
+            except Exception:
+                continue
+            if any("energy" in c for c in cols) and any(c.startswith("flux(") for c in cols):
+                found.append(p)
+    return found
+
+
+def fluxfolded_prediction(MA: float, MV2: float, vector_ff: str, nQ2: int, Ev_max: float, nE: int | None = None):
+    (q2_low, q2_high, data), (flux_E, flux_phi) = load_inputs()
     q2_cent = 0.5 * (q2_low + q2_high)
 
-    col_E = find_col(flux, ["Energy(GeV)", "Energy", "E", "enu"])
-    col_phi = pick_flux_col(flux)
-    flux_E = flux[col_E].to_numpy(float)
-    flux_phi = flux[col_phi].to_numpy(float)
-
     params = {"MA": MA, "MV2": MV2, "vector_ff": vector_ff}
 
     model = flux_folded_binned_xsec(
@@ -150,18 +132,94 @@ def compute_fluxfolded_prediction(MA: float, MV2: float, vector_ff: str, nQ2: in
         q2_high=q2_high,
         flux_E=flux_E,
         flux_phi=flux_phi,
-        dsigma_dQ2_callable=dsigma_dQ2_model,
+        dsigma_dQ2_callable=dsigma_dQ2_point_callable(params) if nE is None else dsigma_dQ2_model_array,
         params=params,
         nQ2=nQ2,
         Ev_max=Ev_max,
+        nE=nE,
     )
 
     return q2_cent, q2_low, q2_high, data, model
 
 
+@st.cache_data(show_spinner=True)
+def compute_fluxfolded_prediction(MA: float, MV2: float, vector_ff: str, nQ2: int, Ev_max: float, nE: int | None = None):
+    return fluxfolded_prediction(MA, MV2, vector_ff, nQ2, Ev_max, nE)
+
+
+@st.cache_data(show_spinner="Precalculando la respuesta por Eν...")
+def compute_flux_response(MA: float, MV2: float, vector_ff: str, nQ2: int, Ev_max: float, nE: int | None = None):
+    """Response of the MINERvA bins to the flux on a fine Eν grid (same rules as the fold)."""
+    q2_low, q2_high, _ = xsec_bins()
+    params = {"MA": MA, "MV2": MV2, "vector_ff": vector_ff}
+    E_grid = np.arange(RESPONSE_DE, Ev_max, RESPONSE_DE)
+    return flux_response_matrix(
+        q2_low, q2_high, E_grid, dsigma_dQ2_model_array, params, nQ2=nQ2, Ev_max=Ev_max, nE=nE
+    )
+
+
+def refold_prediction(MA: float, MV2: float, vector_ff: str, nQ2: int, Ev_max: float, nE: int | None,
+                      flux_E: np.ndarray, flux_phi: np.ndarray):
+    """Same tuple as compute_fluxfolded_prediction for another flux: R φ / (n · φ), no refolding."""
+    q2_low, q2_high, data = xsec_bins()
+    resp = compute_flux_response(MA, MV2, vector_ff, nQ2, Ev_max, nE)
+    phi = np.interp(resp.E, flux_E, np.clip(flux_phi, 0.0, None), left=0.0, right=0.0)
+    model = fold_flux_response(resp, phi)
+    return 0.5 * (q2_low + q2_high), q2_low, q2_high, data, model
+
+
+@st.cache_data(show_spinner="Plegando el histograma (Q², Eμ, θμ)...")
+def compute_muon_histogram(MA: float, MV2: float, vector_ff: str, Ev_max: float,
+                           flux_E: np.ndarray | None = None, flux_phi: np.ndarray | None = None):
+    """Cut-free fold into the (Q², Eμ, θμ) histogram; any cut set is then a sub-block sum."""
+    q2_low, q2_high, _ = xsec_bins()
+    if flux_E is None:
+        flux_E, flux_phi = load_inputs()[1]
+
+    q2_edges, _, _ = default_edges(q2_max=float(q2_high.max()), q2_bin_edges=np.concatenate([q2_low, q2_high]))
+    params = {"MA": MA, "MV2": MV2, "vector_ff": vector_ff}
+    return fold_muon_histogram(flux_E, flux_phi, dsigma_dQ2_model_array, params, q2_edges=q2_edges, Ev_max=Ev_max)
+
+
+def cut_scan_prediction(MA: float, MV2: float, vector_ff: str, Ev_max: float, cuts: dict, flux=None):
+    """Same tuple as compute_fluxfolded_prediction, with the muon cuts of the sliders."""
+    q2_low, q2_high, data = xsec_bins()
+    hist = compute_muon_histogram(MA, MV2, vector_ff, Ev_max, *(flux if flux is not None else ()))
+    model = cut_prediction(hist, q2_low, q2_high, **cuts)
+    return 0.5 * (q2_low + q2_high), q2_low, q2_high, data, model
+
+
+def profile_prediction(MA: float, MV2: float, vector_ff: str, nQ2: int, Ev_max: float, nE: int | None = None):
+    """Uncached prediction with instrumentation on: (report, wall time [s])."""
+    t0 = time.perf_counter()
+    with instrumented() as rec:
+        fluxfolded_prediction(MA, MV2, vector_ff, nQ2, Ev_max, nE)
+    return rec.report(), time.perf_counter() - t0
+
+
+def plot_data_vs_model(q2_cent: np.ndarray, data: np.ndarray, model: np.ndarray):
+    fig, ax = plt.subplots()
+    ax.plot(q2_cent, data, "o", label="MINERvA data")
+    ax.plot(q2_cent, model, "-", label="Model")
+    ax.set_xlabel(r"$Q^2\ [\mathrm{GeV}^2]$")
+    ax.set_ylabel(r"$\langle d\sigma/dQ^2\rangle\ [10^{-38}\ \mathrm{cm^2/GeV^2}]$")
+    ax.legend()
+    return fig
+
+
+def plot_ratio(q2_cent: np.ndarray, ratio: np.ndarray, ycap: float | None = None):
+    fig, ax = plt.subplots()
+    ax.axhline(1.0)
+    ax.plot(q2_cent, ratio, "o")
+    ax.set_xlabel(r"$Q^2\ [\mathrm{GeV}^2]$")
+    ax.set_ylabel("Data / Model")
+    if ycap is not None:
+        ax.set_ylim(0.0, ycap)
+    return fig
+
+
 def compute_chi2(data: np.ndarray, model: np.ndarray) -> tuple[float, float]:
-    V = read_cov_matrix(REFS_DIR / "cov_tot.csv", len(data))
-    V = V * 1e-4  # cov en 1e-80, xsec en 1e-38
+    V = load_cov(len(data), REFS_DIR / "cov_tot.csv")  # cov en 1e-80, xsec en 1e-38 (COV_SCALE)
     r = data - model
     chi2 = float(r @ np.linalg.solve(V, r))
     return chi2, chi2 / len(r)
@@ -206,8 +264,68 @@ with st.sidebar:
 
     st.divider()
     st.header("Cálculo numérico")
-    nQ2 = st.slider("Puntos de integración Q² por bin", 20, 140, 80, 10)
-    Ev_max = st.slider("Eν máx [GeV] (integración de flujo)", 5.0, 40.0, 20.0, 1.0)
+    fold = fold_defaults()  # ajustes convergidos (scripts/check_fold_convergence.py)
+    nQ2 = st.slider("Puntos de integración Q² por bin", 20, 140, int(np.clip(fold["nQ2"], 20, 140)), 10)
+    Ev_max = st.slider("Eν máx [GeV] (integración de flujo)", 5.0, 40.0, float(np.clip(fold["Ev_max"], 5.0, 40.0)), 1.0)
+    nE_options = [None, 3, 4, 6]
+    nE = st.selectbox(
+        "Integración en Eν",
+        options=nE_options,
+        index=nE_options.index(fold["nE"]) if fold["nE"] in nE_options else 0,
+        format_func=lambda n: "Trapecio en los puntos del flujo" if n is None else f"Cuadratura exacta ({n} nodos)",
+    )
+    st.caption(f"Convergido: nQ²={fold['nQ2']}, Eν máx={fold['Ev_max']:g} GeV, "
+               f"{'trapecio' if fold['nE'] is None else str(fold['nE']) + ' nodos'}")
+
+    st.divider()
+    st.header("Flujo")
+    default_flux = REFS_DIR / FLUX_CSV
+    flux_options = [default_flux] + [p for p in local_flux_csvs() if p != default_flux] + ["upload"]
+    flux_choice = st.selectbox(
+        "Flujo del haz",
+        options=flux_options,
+        format_func=lambda p: "Subir CSV..." if p == "upload" else p.relative_to(PROJECT_ROOT).as_posix(),
+    )
+    custom_flux = None
+    try:
+        if flux_choice == "upload":
+            up = st.file_uploader("CSV de flujo (columna de energía [GeV] y columna de flujo)", type="csv")
+            if up is not None:
+                custom_flux = read_flux_table(pd.read_csv(up))
+        elif flux_choice != default_flux:
+            custom_flux = read_flux_table(pd.read_csv(flux_choice))
+    except Exception as e:
+        st.error(f"No se pudo leer el flujo: {e}")
+        custom_flux = None
+    if custom_flux is not None:
+        # a flux in MeV or outside (0, Ev_max) folds to zero: reject it here, with the
+        # checks of both prediction() paths (cut-scan fold and refold), and fall back
+        try:
+            flux_shape(*custom_flux, Ev_max=Ev_max)
+            compute_flux_response(MA, MV2, vector_ff, nQ2, Ev_max, nE)
+            t0 = time.perf_counter()
+            refold_prediction(MA, MV2, vector_ff, nQ2, Ev_max, nE, *custom_flux)
+        except ValueError as e:
+            st.error(f"Flujo no utilizable (energías en GeV dentro de (0, {Ev_max:g}) GeV); "
+                     f"se usa el de referencia: {e}")
+            custom_flux = None
+        else:
+            st.caption(f"Replegado con la respuesta por Eν precalculada (ΔE = {RESPONSE_DE:g} GeV): "
+                       f"{1e3 * (time.perf_counter() - t0):.1f} ms")
+
+    st.divider()
+    st.header("Cortes del muón")
+    cut_scan = st.checkbox(
+        "Cortes variables (histograma Q²–Eμ–θμ)", value=False,
+        help="Pliega una sola vez sin cortes; cada cambio de corte es una suma de sub-bloques.",
+    )
+    cuts = dict(MINOS_CUTS)
+    if cut_scan:
+        cuts["E_mu_min"], cuts["E_mu_max"] = st.slider(
+            "Eμ [GeV]", 0.0, float(Ev_max), (MINOS_CUTS["E_mu_min"], min(MINOS_CUTS["E_mu_max"], float(Ev_max))), 0.25
+        )
+        cuts["theta_max_deg"] = float(st.slider("θμ máx [°]", 1, 45, int(MINOS_CUTS["theta_max_deg"]), 1))
+        st.caption("Los cortes se ajustan a los bordes del histograma (0.25 GeV, 1°).")
 
     st.divider()
     st.header("Gráfica ratio")
@@ -218,6 +336,32 @@ with st.sidebar:
     st.header("Exportar")
     show_download = st.checkbox("Mostrar botón de descarga CSV", value=True)
 
+    st.divider()
+    st.header("Rendimiento")
+    if st.checkbox("Perfilar el cálculo (sin caché)", value=False):
+        rep, wall = profile_prediction(MA, MV2, vector_ff, nQ2, Ev_max, nE)
+        st.metric("Tiempo total", f"{1e3 * wall:.1f} ms")
+        st.dataframe(
+            pd.DataFrame(
+                [{"etapa": k, "ms": 1e3 * v["time_s"], "llamadas": v["calls"]} for k, v in rep["stages"].items()]
+            ),
+            use_container_width=True,
+            hide_index=True,
+        )
+        st.dataframe(
+            pd.DataFrame([{"contador": k, "n": n} for k, n in rep["counts"].items()]),
+            use_container_width=True,
+            hide_index=True,
+        )
+
+
+def prediction():
+    if cut_scan:
+        return cut_scan_prediction(MA, MV2, vector_ff, Ev_max, cuts, custom_flux)
+    if custom_flux is not None:
+        return refold_prediction(MA, MV2, vector_ff, nQ2, Ev_max, nE, *custom_flux)
+    return compute_fluxfolded_prediction(MA, MV2, vector_ff, nQ2, Ev_max, nE)
+
 
 # -----------------------
 # Tab 0
@@ -293,7 +437,12 @@ with tabs[3]:
 
     st.subheader("Cortes (aceptación del muón)")
     st.markdown("Se aplican cortes cinemáticos equivalentes a la selección experimental:")
-    st.latex(r"1.5~\mathrm{GeV}<E_\mu<20~\mathrm{GeV},\qquad \theta_\mu<20^\circ")
+    st.latex(
+        rf"{cuts['E_mu_min']:g}~\mathrm{{GeV}}<E_\mu<{cuts['E_mu_max']:g}~\mathrm{{GeV}},"
+        rf"\qquad \theta_\mu<{cuts['theta_max_deg']:g}^\circ"
+    )
+    if cut_scan:
+        st.caption("Cortes elegidos en la barra lateral (por defecto: 1.5 < Eμ < 20 GeV, θμ < 20°).")
 
 
 # -----------------------
@@ -301,7 +450,7 @@ with tabs[3]:
 # -----------------------
 with tabs[4]:
     st.subheader("Ajuste cuantitativo")
-    q2_cent, q2_low, q2_high, data, model = compute_fluxfolded_prediction(MA, MV2, vector_ff, nQ2, Ev_max)
+    q2_cent, q2_low, q2_high, data, model = prediction()
     chi2, chi2ndof = compute_chi2(data, model)
 
     c1, c2, c3 = st.columns(3)
@@ -343,7 +492,7 @@ with tabs[4]:
 # -----------------------
 with tabs[5]:
     st.subheader("Simulador interactivo")
-    q2_cent, q2_low, q2_high, data, model = compute_fluxfolded_prediction(MA, MV2, vector_ff, nQ2, Ev_max)
+    q2_cent, q2_low, q2_high, data, model = prediction()
     ratio = data / np.where(np.abs(model) > 0, model, np.nan)
 
     left, right = st.columns(2)
@@ -376,22 +525,9 @@ with tabs[5]:
             st.plotly_chart(fig2, use_container_width=True)
     else:
         with left:
-            fig, ax = plt.subplots()
-            ax.plot(q2_cent, data, "o", label="MINERvA data")
-            ax.plot(q2_cent, model, "-", label="Model")
-            ax.set_xlabel(r"$Q^2\ [\mathrm{GeV}^2]$")
-            ax.set_ylabel(r"$\langle d\sigma/dQ^2\rangle\ [10^{-38}\ \mathrm{cm^2/GeV^2}]$")
-            ax.legend()
-            st.pyplot(fig)
+            render_figure(plot_data_vs_model, q2_cent, data, model)
 
         with right:
-            fig, ax = plt.subplots()
-            ax.axhline(1.0)
-            ax.plot(q2_cent, ratio, "o")
-            ax.set_xlabel(r"$Q^2\ [\mathrm{GeV}^2]$")
-            ax.set_ylabel("Data / Model")
-            if cap_ratio:
-                ax.set_ylim(0.0, ycap)
-            st.pyplot(fig)
+            render_figure(plot_ratio, q2_cent, ratio, ycap=(ycap if cap_ratio else None))
 
     st.caption("Consejo: cambia M_A y el modelo vectorial (Dipolo/GKeX) para ver cómo cambia la curva y χ²/ndof.")
\ No newline at end of file
@@ -28,13 +28,21 @@ safe to import elsewhere.
 from __future__ import annotations
 
 import math
+import sys
 from dataclasses import dataclass
+from pathlib import Path
 
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import streamlit as st
 
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from apps.figure_cache import render_figure  # noqa: E402
+
 
 # -----------------------------------------------------------------------------
 # Physical constants (natural units: hbar = c = 1)
@@ -475,22 +483,22 @@ def render_simulator_tab() -> None:
         curve_specs.append(CurveSpec(label=fr"High  $M_A = {M_A_HIGH:.2f}$ GeV", mass=M_A_HIGH, linestyle="-.", linewidth=2.0, alpha=0.95))
 
     st.markdown("### Form factors")
-    fig_ff = plot_form_factors(q2, curve_specs, model_name=model_name, show_selected_q2=q2_probe)
-    st.pyplot(fig_ff, use_container_width=True)
+    render_figure(plot_form_factors, q2, curve_specs=curve_specs, model_name=model_name, show_selected_q2=q2_probe)
 
     st.markdown("### Relative sensitivity to the axial mass")
-    fig_ratio = plot_sensitivity_ratios(
-        q2=q2,
+    render_figure(
+        plot_sensitivity_ratios,
+        q2,
         m_a_selected=m_a_selected,
         m_a_reference=m_a_reference,
         model_name=model_name,
         show_selected_q2=q2_probe,
     )
-    st.pyplot(fig_ratio, use_container_width=True)
 
     st.markdown("### Derived axial quantity and response-oriented view")
-    fig_gap = plot_axial_response_building_blocks(q2, curve_specs, model_name=model_name, show_selected_q2=q2_probe)
-    st.pyplot(fig_gap, use_container_width=True)
+    render_figure(
+        plot_axial_response_building_blocks, q2, curve_specs=curve_specs, model_name=model_name, show_selected_q2=q2_probe
+    )
 
     st.markdown("### Numerical readout at the selected momentum transfer")
     summary_df = make_summary_table(q2_probe, m_a_selected, m_a_reference, model_name)
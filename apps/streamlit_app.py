@@ -13,15 +13,49 @@ Created on Thu Feb 26 16:05:06 2026
 import sys
 from pathlib import Path
 
+import numpy as np
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
 
 REPO_ROOT = Path(__file__).resolve().parents[1]  # .../tfgmcr
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
-from src.ccqe_curves import curve_theta, curve_q2_reparam
+from src.ccqe_curves import EV_GRID, dsdo_surface, surface_slice
+from apps.figure_cache import render_figure
+
+
+# The whole dσ/dΩ(Eν, θ) surface for the slider grid is one vectorized pass per
+# (vector model, M_A, ν/ν̄); moving the Eν slider only takes a row of it.
+@st.cache_data(show_spinner="Calculando dσ/dΩ(Eν, θ)...", max_entries=16)
+def compute_surface(vector_model: str, MA: float, is_antinu: bool):
+    return dsdo_surface(vector_model=vector_model, MA=MA, is_antinu=is_antinu, Ev_grid=EV_GRID, npts=721)
+
+
+def plot_curve(x, y, xlabel: str, ylabel: str):
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure()
+    plt.plot(x, y)
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    plt.grid(True, alpha=0.3)
+    return fig
+
+
+def plot_surface(Ev_grid, theta_deg, dsdo, Ev_now, log_color: bool = False):
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import LogNorm
+
+    fig = plt.figure(figsize=(9, 4))
+    z = np.where(dsdo > 0, dsdo, np.nan)
+    norm = LogNorm(vmin=np.nanmax(z) * 1e-4, vmax=np.nanmax(z)) if log_color else None
+    m = plt.pcolormesh(theta_deg, Ev_grid, z, shading="nearest", norm=norm, cmap="viridis")
+    plt.axhline(Ev_now, color="w", lw=1, ls="--")
+    plt.colorbar(m, label="dσ/dΩ [cm²/sr]")
+    plt.xlabel("θμ [deg]")
+    plt.ylabel("Eν [GeV]")
+    return fig
 
 st.set_page_config(page_title="CCQE Explorer", layout="wide")
 
@@ -32,22 +66,26 @@ with st.sidebar:
     vector_model = st.selectbox("Vector FF model", ["galster", "gkex"], index=1)
     MA = st.selectbox("M_A [GeV]", [1.03, 1.35], index=0)
     is_antinu = st.checkbox("Antineutrino (ν̄)", value=False)
+    client_side = st.checkbox("Lightweight interactive charts", value=False)
+
+Ev_grid, theta_surf, dsdo_surf, q2_surf = compute_surface(vector_model, float(MA), bool(is_antinu))
+row = surface_slice(Ev_grid, dsdo_surf, Ev)
+q2_row = surface_slice(Ev_grid, q2_surf, Ev)
 
 col1, col2 = st.columns(2)
 
-# --- θ plot ---
-theta_deg, dsdo_theta = curve_theta(Ev, vector_model=vector_model, MA=MA, is_antinu=is_antinu)
+# --- θ plot (every other θ of the surface: the 361-point curve) ---
+theta_deg, dsdo_theta = theta_surf[::2], row[::2]
 
 with col2:
     st.subheader("dσ/dΩ vs θμ")
-    fig = plt.figure()
-    plt.plot(theta_deg, dsdo_theta)
-    plt.xlabel("θμ [deg]")
-    plt.ylabel("dσ/dΩ [cm²/sr]")
-    plt.grid(True, alpha=0.3)
-    st.pyplot(fig, clear_figure=True)
-
     df_theta = pd.DataFrame({"theta_deg": theta_deg, "dsigma_dOmega_cm2_sr": dsdo_theta})
+    render_figure(
+        plot_curve, theta_deg, dsdo_theta,
+        xlabel="θμ [deg]", ylabel="dσ/dΩ [cm²/sr]",
+        chart_data=df_theta.set_index("theta_deg"), client_side=client_side,
+    )
+
     st.download_button(
         "Download θ curve (CSV)",
         df_theta.to_csv(index=False).encode("utf-8"),
@@ -56,18 +94,19 @@ with col2:
     )
 
 # --- Q2 plot ---
-Q2, dsdo_q2 = curve_q2_reparam(Ev, vector_model=vector_model, MA=MA, is_antinu=is_antinu)
+ok = np.isfinite(q2_row) & np.isfinite(row) & (q2_row > 0)
+order = np.argsort(q2_row[ok])
+Q2, dsdo_q2 = q2_row[ok][order], row[ok][order]
 
 with col1:
     st.subheader("dσ/dΩ vs |Q²|  (reparametrized)")
-    fig = plt.figure()
-    plt.plot(Q2, dsdo_q2)
-    plt.xlabel("|Q²| [GeV²]")
-    plt.ylabel("dσ/dΩ [cm²/sr]")
-    plt.grid(True, alpha=0.3)
-    st.pyplot(fig, clear_figure=True)
-
     df_q2 = pd.DataFrame({"Q2_GeV2": Q2, "dsigma_dOmega_cm2_sr": dsdo_q2})
+    render_figure(
+        plot_curve, Q2, dsdo_q2,
+        xlabel="|Q²| [GeV²]", ylabel="dσ/dΩ [cm²/sr]",
+        chart_data=df_q2.set_index("Q2_GeV2"), client_side=client_side,
+    )
+
     st.download_button(
         "Download Q² curve (CSV)",
         df_q2.to_csv(index=False).encode("utf-8"),
@@ -75,4 +114,9 @@ with col1:
         mime="text/csv",
     )
 
+# --- whole surface ---
+st.subheader("dσ/dΩ(Eν, θμ)")
+log_color = st.checkbox("Log color scale", value=False)
+render_figure(plot_surface, Ev_grid, theta_surf, dsdo_surf, Ev_now=float(Ev), log_color=log_color)
+
 st.caption("Models: Galster vs GKex (Lomon). QE kinematics. Units: natural units internally; output in cm²/sr.")
\ No newline at end of file
@@ -10,13 +10,13 @@ import streamlit as st
 
 # ------------------------------------------------------------
 # Robust local import (appendix.py in the same folder)
+# The appendix is imported lazily (see render_appendix_page) so that
+# chapters that do not need it pay nothing for it on cold start.
 # ------------------------------------------------------------
 THIS_DIR = Path(__file__).resolve().parent
 if str(THIS_DIR) not in sys.path:
     sys.path.insert(0, str(THIS_DIR))
 
-from appendix import render_appendix  # noqa: E402
-
 # ------------------------------------------------------------
 # Page config
 # ------------------------------------------------------------
@@ -323,6 +323,13 @@ En aplicaciones numéricas resulta natural seguir un esquema modular basado en:
     st.info("Los detalles algebraicos extensos se recogen en el **Apéndice**.")
 
 
+def render_appendix_page() -> None:
+    from appendix import render_appendix  # lazy: only when the page is opened
+
+    section("Apéndice", "Trazas y contracciones")
+    render_appendix()
+
+
 # ------------------------------------------------------------
 # Routing
 # ------------------------------------------------------------
@@ -339,7 +346,7 @@ PAGES: Dict[str, Page] = {
     "ch7": ("Contracción", render_ch7),
     "ch8": ("Sección eficaz", render_ch8),
     "ch9": ("Aplicación numérica", render_ch9),
-    "appendix": ("Apéndice", lambda: (section("Apéndice", "Trazas y contracciones"), render_appendix())),
+    "appendix": ("Apéndice", render_appendix_page),
 }
 
 ORDER = ["home", "ch1", "ch2", "ch3", "ch4", "ch5", "ch6", "ch7", "ch8", "ch9", "appendix"]
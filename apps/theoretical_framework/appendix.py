@@ -5,7 +5,6 @@ import sys
 from pathlib import Path
 
 import streamlit as st
-import streamlit.components.v1 as components
 
 
 def render_appendix() -> None:
@@ -51,6 +50,9 @@ def render_appendix() -> None:
 
     def jump_to(anchor: str, label: str):
         if st.sidebar.button(label, use_container_width=True):
+            # lazy: the components module is only needed after a click
+            import streamlit.components.v1 as components
+
             components.html(
                 f"""
                 <script>
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 01:05:52 2026
+
+@author: User
+"""
+
+# scripts/build_figures.py
+# Rebuilds the thesis figures that are out of date (see src/figure_build.py).
+#
+#   python scripts/build_figures.py                 # stale figures only
+#   python scripts/build_figures.py --jobs 4        # independent figures in parallel
+#   python scripts/build_figures.py fig_4_1 --force
+#   python scripts/build_figures.py --status
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+SCRIPTS_DIR = PROJECT_ROOT / "scripts"
+sys.path.insert(0, str(SRC_DIR))
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from figure_build import CACHE_DIR, FIG_DIR, THESIS_FIG_DIR, Target, build, status
+from minerva.convergence import FOLD_SETTINGS_PATH
+
+import compare_minerva_hydrogen
+import make_fig4_1
+import make_fig_4_2_q2
+import plot_minerva_hydrogen
+
+RAW_DIR = compare_minerva_hydrogen.default_raw_dir()
+
+# modules the cross sections are built from
+XSEC_MODULES = tuple(SRC_DIR / m for m in ("form_factors.py", "form_factors_gkex.py"))
+# (the kernels of make_fig4_1.py are tracked per function by compute_key, so
+# editing a legend there does not recompute fig_4_1 / fig_4_2)
+DSDO_MODULES = XSEC_MODULES + (SRC_DIR / "ccqe_contraction.py",)
+FOLD_MODULES = XSEC_MODULES + tuple(
+    SRC_DIR / m for m in ("ccqe_hydrogen_xsec.py", "minerva/flux_folding.py", "minerva/convergence.py")
+)
+
+TARGETS = [
+    Target(
+        name="fig_4_1",
+        compute=make_fig4_1.compute_fig4_1,
+        render=make_fig4_1.render_fig4_1,
+        outputs=("fig_4_1.pdf",),
+        inputs=DSDO_MODULES,
+        params={"Ev": 1.0, "MA_values": [1.03, 1.35]},
+        style={"MA_values": [1.03, 1.35]},
+    ),
+    Target(
+        name="fig_4_2",
+        compute=make_fig_4_2_q2.compute_fig4_2,
+        render=make_fig_4_2_q2.render_fig4_2,
+        outputs=("fig_4_2_like_guillermo.pdf",),
+        inputs=DSDO_MODULES,
+        params={
+            "Ev_list": list(make_fig_4_2_q2.EV_LIST),
+            "models": [[v, MA] for _, v, MA, _ in make_fig_4_2_q2.CURVES],
+        },
+        style={
+            "Ev_list": list(make_fig_4_2_q2.EV_LIST),
+            "styles": [[label, ls] for label, _, _, ls in make_fig_4_2_q2.CURVES],
+        },
+    ),
+    Target(
+        name="minerva_hydrogen_comparison",
+        compute=compare_minerva_hydrogen.compute_comparison,
+        render=compare_minerva_hydrogen.render_comparison,
+        outputs=("minerva_hydrogen_dsig_dQ2_comparison.pdf", "minerva_hydrogen_ratio_data_over_model.pdf"),
+        inputs=FOLD_MODULES + tuple(sorted(RAW_DIR.glob("*.csv"))) + (FOLD_SETTINGS_PATH,),
+        params={"raw_dir": str(RAW_DIR), "params": {"MA": 1.00, "MV2": 0.71, "vector_ff": "gkex"}},
+    ),
+    Target(
+        name="minerva_hydrogen_xsec",
+        compute=plot_minerva_hydrogen.load_minerva_xsec,
+        render=plot_minerva_hydrogen.plot_minerva_xsec,
+        outputs=("minerva_hydrogen_xsec.pdf",),
+        inputs=(Path(plot_minerva_hydrogen.XSEC_PATH), Path(plot_minerva_hydrogen.COV_TOT_PATH)),
+    ),
+]
+
+
+def main():
+    names = [t.name for t in TARGETS]
+    ap = argparse.ArgumentParser(description="Construye las figuras de la tesis que estén desactualizadas.")
+    ap.add_argument("targets", nargs="*", help=f"figuras a construir (por defecto todas: {names})")
+    ap.add_argument("--jobs", "-j", type=int, default=1, help="procesos en paralelo")
+    ap.add_argument("--force", action="store_true", help="recalcula y redibuja aunque estén al día")
+    ap.add_argument("--status", action="store_true", help="solo muestra qué está desactualizado")
+    ap.add_argument("--out-dir", type=Path, default=FIG_DIR)
+    ap.add_argument("--cache-dir", type=Path, default=CACHE_DIR)
+    ap.add_argument("--thesis-dir", type=Path, default=THESIS_FIG_DIR, help="carpeta figures/ de la tesis")
+    ap.add_argument("--no-thesis", action="store_true", help="no copia las figuras a la tesis")
+    args = ap.parse_args()
+    unknown = set(args.targets) - set(names)
+    if unknown:
+        ap.error(f"figuras desconocidas: {sorted(unknown)}")
+
+    targets = [t for t in TARGETS if not args.targets or t.name in args.targets]
+    if args.status:
+        for t in targets:
+            s = status(t, args.out_dir, args.cache_dir)
+            state = "al día" if not s["stale"] else ("por dibujar" if s["cached"] else "por calcular")
+            print(f"{t.name:32s} {state}")
+        return
+
+    build(
+        targets,
+        outdir=args.out_dir,
+        cache_dir=args.cache_dir,
+        thesis_dir=None if args.no_thesis else args.thesis_dir,
+        jobs=args.jobs,
+        force=args.force,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 21:20:41 2026
+
+@author: User
+"""
+
+# scripts/check_fold_convergence.py
+# Convergence sweep of flux_folded_binned_xsec (nQ2, Eν quadrature order, Ev_max)
+# on the MINERvA hydrogen bins; stores the cheapest converged settings.
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from minerva.inputs import load_flux, load_xsec_bins
+from minerva.convergence import FOLD_SETTINGS_PATH, convergence_sweep, recommend_settings, save_fold_settings
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--tol", type=float, default=1e-3, help="máximo cambio relativo por bin")
+    ap.add_argument("--vector-ff", default="gkex")
+    ap.add_argument("--MA", type=float, default=1.00)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--no-save", action="store_true", help="no guardar la recomendación")
+    ap.add_argument("--sweep-json", type=Path, default=None, help="guardar el barrido completo")
+    args = ap.parse_args()
+
+    q2_low, q2_high, _ = load_xsec_bins()
+    flux_E, flux_phi = load_flux()
+    params = {"MA": args.MA, "MV2": 0.71, "vector_ff": args.vector_ff}
+
+    sweep = convergence_sweep(q2_low, q2_high, flux_E, flux_phi, params, repeat=args.repeat)
+    ref = sweep["reference"]
+    print(f"Referencia: nQ2={ref['nQ2']} nE={ref['nE']} Ev_max={ref['Ev_max']:g}")
+    print(" nQ2    nE  Ev_max   max|Δ|/ref    t [ms]")
+    for r in sorted(sweep["rows"], key=lambda r: r["wall_time_s"]):
+        nE = "trap" if r["nE"] is None else str(r["nE"])
+        flag = "*" if r["max_rel_change"] <= args.tol else " "
+        print(f"{r['nQ2']:4d}  {nE:>4}  {r['Ev_max']:6.1f}   {r['max_rel_change']:.3e}  {1e3 * r['wall_time_s']:8.2f} {flag}")
+
+    if args.sweep_json is not None:
+        args.sweep_json.write_text(json.dumps(sweep, indent=2))
+
+    best = recommend_settings(sweep, tol=args.tol)
+    print(f"Recomendado (tol={args.tol:g}): nQ2={best['nQ2']} nE={best['nE']} Ev_max={best['Ev_max']:g} "
+          f"(max|Δ|={best['max_rel_change']:.2e}, {1e3 * best['wall_time_s']:.1f} ms)")
+    if not args.no_save:
+        print("Guardado:", save_fold_settings(best, FOLD_SETTINGS_PATH))
+
+
+if __name__ == "__main__":
+    main()
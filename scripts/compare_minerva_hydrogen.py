@@ -9,6 +9,7 @@ Created on Wed Mar  4 18:16:47 2026
 from __future__ import annotations
 print("RUNNING:", __file__)
 
+import argparse
 import sys
 from pathlib import Path
 
@@ -23,40 +24,17 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 SRC_DIR = PROJECT_ROOT / "src"
 sys.path.insert(0, str(SRC_DIR))
 
-from minerva.flux_folding import flux_folded_binned_xsec
-from ccqe_hydrogen_xsec import dsigma_dQ2_numubar_p
+from minerva.flux_folding import bin_q2_grid, cumulative_folded_xsec, rebin_cumulative
+from minerva.convergence import fold_defaults
+from minerva.migration import load_migration, truth_predictions, forward_fold
+from minerva.flux_response import energy_band_templates, flux_response_matrix, fold_flux_response, profile_flux_nuisances
+from minerva.inputs import find_col, load_cov, load_flux, load_xsec_bins
+from ccqe_hydrogen_xsec import dsigma_dQ2_numubar_p_array
 
 
 # -----------------------
-# Column helpers
+# Input helpers
 # -----------------------
-def find_col(df: pd.DataFrame, candidates: list[str]) -> str:
-    cols = list(df.columns)
-    strip_map = {c.strip(): c for c in cols}
-
-    # exact
-    for cand in candidates:
-        if cand in strip_map:
-            return strip_map[cand]
-
-    # exact lower
-    lower_exact = {c.strip().lower(): c for c in cols}
-    for cand in candidates:
-        cl = cand.strip().lower()
-        if cl in lower_exact:
-            return lower_exact[cl]
-
-    # substring
-    cols_low = [(c, c.strip().lower()) for c in cols]
-    for cand in candidates:
-        cl = cand.strip().lower()
-        for orig, low in cols_low:
-            if cl in low:
-                return orig
-
-    raise KeyError(f"No encuentro columnas {candidates}. Tengo: {list(df.columns)}")
-
-
 def pick_flux_csv(raw_dir: Path) -> Path:
     """
     Picks a flux CSV by checking it has an Energy column and a column that starts with 'flux('.
@@ -74,135 +52,164 @@ def pick_flux_csv(raw_dir: Path) -> Path:
     raise FileNotFoundError(f"No encuentro un CSV de flujo válido en {raw_dir}.")
 
 
-def pick_flux_col(df: pd.DataFrame) -> str:
-    for c in df.columns:
-        if c.strip().lower().startswith("flux("):
-            return c
-    return find_col(df, ["flux", "phi"])
-
-
-def read_cov_matrix(path: Path, n: int) -> np.ndarray:
-    V = pd.read_csv(path, header=None).to_numpy(dtype=float)
-
-    # common cases: extra index column/row
-    if V.shape == (n, n + 1):
-        V = V[:, 1:]
-    if V.shape == (n + 1, n + 1):
-        V = V[1:, 1:]
-    if V.shape != (n, n):
-        raise ValueError(f"Covarianza con forma {V.shape}, esperaba {(n, n)}. Revisa {path.name}.")
-    return V
-
-
 # -----------------------
 # Model wrapper (already MINERvA units)
 # -----------------------
-def dsigma_dQ2_model(Ev: float, Q2: float, params: dict) -> float:
-    """
-    Returns dσ/dQ^2 in [1e-38 cm^2/GeV^2] for \bar{nu}_mu p -> mu^+ n.
-    """
+def dsigma_dQ2_model_array(Ev, Q2, params: dict):
+    """dσ/dQ^2 [1e-38 cm^2/GeV^2] for \\bar{nu}_mu p -> mu^+ n on arrays (vectorized folds, migration)."""
     MA = float(params.get("MA", 1.00))
     MV2 = float(params.get("MV2", 0.71))
-    return float(dsigma_dQ2_numubar_p(Ev, Q2, MA=MA, MV2=MV2))
+    vector_ff = str(params.get("vector_ff", "gkex"))
+    return dsigma_dQ2_numubar_p_array(Ev, Q2, MA=MA, MV2=MV2, vector_ff=vector_ff)
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="MINERvA hydrogen: data vs flux-folded model.")
+    ap.add_argument("--migration", type=Path, default=None,
+                    help="Matriz reco-vs-true (.npz o .csv) para comparar en espacio reco.")
+    ap.add_argument("--migration-normalize", action="store_true",
+                    help="Normaliza cada columna de la matriz (si contiene cuentas).")
+    ap.add_argument("--MA", type=float, default=1.00, help="masa axial [GeV]")
+    ap.add_argument("--MV2", type=float, default=0.71, help="masa vectorial al cuadrado [GeV²] (dipolo)")
+    ap.add_argument("--vector-ff", default="gkex", help="FF vectoriales: gkex, dipole, galster")
+    ap.add_argument("--flux-nuisances", action="store_true",
+                    help="χ² perfilando la forma del flujo (bandas en Eν con prior gaussiano).")
+    ap.add_argument("--flux-bands", default="0,2,4,6,8,12,20,40",
+                    help="bordes de las bandas de Eν [GeV] de los nuisances de flujo")
+    ap.add_argument("--flux-sigma", type=float, default=0.1, help="prior (fraccional) de cada banda")
+    return ap.parse_args()
+
+
+def default_raw_dir() -> Path:
+    raw_dir = PROJECT_ROOT / "data" / "raw" / "minerva_hydrogen"
+    if not raw_dir.exists():
+        raw_dir = PROJECT_ROOT / "refs" / "minerva_hydrogen"
+    return raw_dir
 
 
 # -----------------------
-# Main
+# Compute: data, flux-folded model, chi2
 # -----------------------
-def main():
-    raw_dir = PROJECT_ROOT / "data" / "raw" / "minerva_hydrogen"
-    proc_dir = PROJECT_ROOT / "data" / "processed" / "minerva_hydrogen"
-    fig_dir = PROJECT_ROOT / "results" / "figures"
-    proc_dir.mkdir(parents=True, exist_ok=True)
-    fig_dir.mkdir(parents=True, exist_ok=True)
+def compute_comparison(
+    raw_dir: Path | None = None,
+    params: dict | None = None,
+    fold: dict | None = None,
+    migration: Path | None = None,
+    migration_normalize: bool = False,
+    flux_bands=None,
+    flux_sigma: float = 0.1,
+) -> dict:
+    """
+    Arrays of the data/model comparison: q2_low, q2_high, data, model, chi2
+    (plus yerr if the table has stat/syst, model_reco/chi2_reco with a migration,
+    and chi2_profiled/model_profiled/flux_theta/flux_theta_err when flux_bands
+    are given: flux-shape nuisances per Eν band with a fractional prior flux_sigma).
+    """
+    raw_dir = Path(raw_dir) if raw_dir is not None else default_raw_dir()
+    params = params if params is not None else {"MA": 1.00, "MV2": 0.71, "vector_ff": "gkex"}
+    fold = fold if fold is not None else fold_defaults()  # converged settings from scripts/check_fold_convergence.py
 
     # ---- DATA (bins + xsec) ----
     xsec_path = raw_dir / "hydrogen_xsec.csv"
     if not xsec_path.exists():
         raise FileNotFoundError(f"Falta {xsec_path}")
 
-    xsec = pd.read_csv(xsec_path)
-    xsec.columns = [c.strip() for c in xsec.columns]
-
-    col_q2lo = find_col(xsec, ["Q2low", "Q2Low", "Q2_low"])
-    col_q2hi = find_col(xsec, ["Q2High", "Q2high", "Q2_hi", "Q2_high"])
-    col_xsec = find_col(xsec, ["xsec", "XSec", "dsigma", "dsigdq2", "dsigma_dQ2"])
-
-    q2_low = xsec[col_q2lo].to_numpy(float)
-    q2_high = xsec[col_q2hi].to_numpy(float)
-    data = xsec[col_xsec].to_numpy(float)
+    q2_low, q2_high, data = load_xsec_bins(xsec_path)
     n_bins = len(data)
 
-    # ---- COV ----
+    # ---- COV (COV_SCALE applied: cov in 1e-80, xsec in 1e-38) ----
     cov_path = raw_dir / "cov_tot.csv"
     if not cov_path.exists():
         raise FileNotFoundError(f"Falta {cov_path}")
 
-    V = read_cov_matrix(cov_path, n_bins)
-
-    # Typical MINERvA release: xsec numbers in 1e-38, cov in 1e-80 -> scale 1e-4
-    COV_SCALE = 1e-4
-    V = V * COV_SCALE
+    V = load_cov(n_bins, cov_path)
 
     # ---- FLUX ----
     flux_path = pick_flux_csv(raw_dir)
-    flux = pd.read_csv(flux_path)
-    flux.columns = [c.strip() for c in flux.columns]
-    col_E = find_col(flux, ["Energy(GeV)", "Energy", "E", "enu"])
-    col_phi = pick_flux_col(flux)
-
-    flux_E = flux[col_E].to_numpy(float)
-    flux_phi = flux[col_phi].to_numpy(float)
+    flux_E, flux_phi = load_flux(flux_path)
 
     print("Usando flujo:", flux_path.name)
-    print("Columna E:", col_E)
-    print("Columna phi:", col_phi)
-
-    # ---- params for the model ----
-    params = {
-        "MA": 1.00,  # puedes probar 1.03, 1.35, etc.
-        "MV2": 0.71, # dipole vector mass squared
-    }
 
     # ---- MODEL: flux-folded + cuts ----
-    model = flux_folded_binned_xsec(
-        q2_low=q2_low,
-        q2_high=q2_high,
+    # one cumulative fold on the per-bin Q2 grids (shared edges evaluated once),
+    # same values as flux_folded_binned_xsec with the same settings
+    print("Integración:", fold)
+    cf = cumulative_folded_xsec(
         flux_E=flux_E,
         flux_phi=flux_phi,
-        dsigma_dQ2_callable=dsigma_dQ2_model,
+        dsigma_dQ2_callable=dsigma_dQ2_model_array,
         params=params,
-        nQ2=80,
-        Ev_max=20.0,
+        q2_grid=bin_q2_grid(q2_low, q2_high, fold["nQ2"]),
+        Ev_max=fold["Ev_max"],
+        nE=fold["nE"],
     )
+    model = rebin_cumulative(cf, q2_low, q2_high)
 
     # ---- CHI2 (correlated) ----
     r = data - model
     chi2 = r @ np.linalg.solve(V, r)
-    ndof = n_bins
-
-    print("chi2 =", float(chi2))
-    print("chi2/ndof =", float(chi2 / ndof))
-
-    # ---- SAVE TABLE ----
-    out = xsec.copy()
-    out["model"] = model
-    out["residual"] = r
-    out_path = proc_dir / "comparison_bins.csv"
-    out.to_csv(out_path, index=False)
-    print("Guardado:", out_path)
+    out = {"q2_low": q2_low, "q2_high": q2_high, "data": data, "model": model, "chi2": np.float64(chi2)}
 
-    # ---- PLOT ----
-    q2_cent = 0.5 * (q2_low + q2_high)
-
-    yerr = None
     try:
+        xsec = pd.read_csv(xsec_path)
         col_stat = find_col(xsec, ["stat", "Stat", "staterr", "StatErr"])
         col_syst = find_col(xsec, ["syst", "Syst", "syserr", "SystErr"])
-        yerr = np.sqrt(xsec[col_stat].to_numpy(float) ** 2 + xsec[col_syst].to_numpy(float) ** 2)
+        out["yerr"] = np.sqrt(xsec[col_stat].to_numpy(float) ** 2 + xsec[col_syst].to_numpy(float) ** 2)
     except Exception:
         pass
 
+    # ---- optional flux-shape nuisances, profiled on the flux response matrix ----
+    if flux_bands is not None:
+        # same flux points as the fold (φ > 0), so R φ reproduces the model
+        m = (flux_E > 0.0) & (flux_E < fold["Ev_max"]) & np.isfinite(flux_phi) & (flux_phi > 0.0)
+        resp = flux_response_matrix(
+            q2_low, q2_high, flux_E[m], dsigma_dQ2_model_array, params,
+            nQ2=fold["nQ2"], Ev_max=fold["Ev_max"], nE=fold["nE"],
+        )
+        phi_resp = flux_phi[m]
+        templates = energy_band_templates(resp.E, flux_bands)
+        templates = templates[templates.any(axis=1)]
+        prof = profile_flux_nuisances(resp, phi_resp, data, V, templates, flux_sigma)
+        out["chi2_profiled"] = np.float64(prof["chi2"])
+        out["model_profiled"] = prof["pred"]
+        out["flux_theta"] = prof["theta"]
+        out["flux_theta_err"] = prof["theta_err"]
+        print(f"Nuisances de flujo: {len(templates)} bandas, prior {flux_sigma:g}; "
+              f"respuesta reproduce el modelo a {np.max(np.abs(fold_flux_response(resp, phi_resp) / model - 1)):.1e}")
+
+    # ---- optional forward folding: truth (fine bins) -> reco ----
+    if migration is not None:
+        migration_path = Path(migration)
+        mig = load_migration(
+            migration_path,
+            reco_edges=np.concatenate([q2_low, [q2_high[-1]]]),
+            normalize=migration_normalize,
+        )
+        pred_true = truth_predictions(
+            mig, flux_E, flux_phi, dsigma_dQ2_model_array, [params], **fold
+        )
+        model_reco = forward_fold(mig, pred_true)[0]
+
+        r_reco = data - model_reco
+        out["model_reco"] = model_reco
+        out["chi2_reco"] = np.float64(r_reco @ np.linalg.solve(V, r_reco))
+        print(f"Migración: {migration_path.name} ({len(mig.true_edges) - 1} bins true)")
+    return out
+
+
+# -----------------------
+# Render
+# -----------------------
+def render_comparison(res: dict, fig_dir: Path | None = None) -> list[Path]:
+    """Data vs model and data/model figures from compute_comparison; returns the written files."""
+    fig_dir = Path(fig_dir) if fig_dir is not None else PROJECT_ROOT / "results" / "figures"
+    fig_dir.mkdir(parents=True, exist_ok=True)
+
+    q2_cent = 0.5 * (res["q2_low"] + res["q2_high"])
+    data, model = res["data"], res["model"]
+    yerr = res.get("yerr")
+    model_reco = res.get("model_reco")
+
     plt.figure()
     if yerr is None:
         plt.plot(q2_cent, data, marker="o", linestyle="none", label="MINERvA data")
@@ -210,6 +217,8 @@ def main():
         plt.errorbar(q2_cent, data, yerr=yerr, marker="o", linestyle="none", label="MINERvA data")
 
     plt.plot(q2_cent, model, label="Model (LS + dipole FF) (flux-folded + cuts)")
+    if model_reco is not None:
+        plt.plot(q2_cent, model_reco, "--", label="Model forward-folded (reco)")
     plt.xlabel(r"$Q^2\ \mathrm{[GeV^2]}$")
     plt.ylabel(r"$\langle d\sigma/dQ^2\rangle\ [10^{-38}\ \mathrm{cm^2/GeV^2}]$")
     plt.legend()
@@ -230,7 +239,51 @@ def main():
     fig2 = fig_dir / "minerva_hydrogen_ratio_data_over_model.pdf"
     plt.savefig(fig2)
     print("Figura:", fig2)
+    return [fig1, fig2]
+
+
+# -----------------------
+# Main
+# -----------------------
+def main():
+    args = parse_args()
+    raw_dir = default_raw_dir()
+    proc_dir = PROJECT_ROOT / "data" / "processed" / "minerva_hydrogen"
+    proc_dir.mkdir(parents=True, exist_ok=True)
+
+    # ---- params for the model ----
+    params = {"MA": args.MA, "MV2": args.MV2, "vector_ff": args.vector_ff}
+    flux_bands = [float(x) for x in args.flux_bands.split(",")] if args.flux_nuisances else None
+    res = compute_comparison(raw_dir, params, migration=args.migration, migration_normalize=args.migration_normalize,
+                             flux_bands=flux_bands, flux_sigma=args.flux_sigma)
+
+    ndof = len(res["data"])
+    print("chi2 =", float(res["chi2"]))
+    print("chi2/ndof =", float(res["chi2"] / ndof))
+    if "chi2_reco" in res:
+        print("chi2 (reco) =", float(res["chi2_reco"]))
+        print("chi2/ndof (reco) =", float(res["chi2_reco"] / ndof))
+    if "chi2_profiled" in res:
+        print("chi2 (flujo perfilado) =", float(res["chi2_profiled"]))
+        print("nuisances de flujo =", np.round(res["flux_theta"], 4), "±", np.round(res["flux_theta_err"], 4))
+
+    # ---- SAVE TABLE ----
+    out = pd.read_csv(raw_dir / "hydrogen_xsec.csv")
+    out.columns = [c.strip() for c in out.columns]
+    out["model"] = res["model"]
+    out["residual"] = res["data"] - res["model"]
+    if "model_profiled" in res:
+        out["model_profiled"] = res["model_profiled"]
+    if "model_reco" in res:
+        out["model_reco"] = res["model_reco"]
+        out["residual_reco"] = res["data"] - res["model_reco"]
+    out_path = proc_dir / "comparison_bins.csv"
+    out.to_csv(out_path, index=False)
+    print("Guardado:", out_path)
+
+    # ---- PLOT ----
+    render_comparison(res)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
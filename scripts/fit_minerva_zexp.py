@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 19:40:18 2026
+
+@author: User
+"""
+
+# scripts/fit_minerva_zexp.py
+# z-expansion fit of F_A to the MINERvA hydrogen dσ/dQ² (folded quadratic form).
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from minerva.inputs import load_flux, load_xsec_bins, load_cov
+from minerva.convergence import fold_defaults
+from minerva.zexp_fit import build_zexp_form, save_zexp_form, fit_zexp, zexp_prediction
+from ccqe_hydrogen_xsec import FA_zexp, _FA_dipole
+
+
+def main():
+    out_path = PROJECT_ROOT / "data" / "processed" / "minerva_hydrogen" / "zexp_form_gkex.npz"
+    params = {"MV2": 0.71, "vector_ff": "gkex"}
+
+    q2_low, q2_high, data = load_xsec_bins()
+    cov = load_cov(len(data))
+    flux_E, flux_phi = load_flux()
+
+    t0 = time.perf_counter()
+    form = build_zexp_form(q2_low, q2_high, flux_E, flux_phi, params, n_free=4, **fold_defaults())
+    t1 = time.perf_counter()
+    save_zexp_form(form, out_path)
+    print(f"Forma cuadrática plegada: {t1 - t0:.2f} s -> {out_path}")
+
+    res = fit_zexp(form, data, cov)
+    t2 = time.perf_counter()
+    print(f"Ajuste: {res['n_eval']} evaluaciones en {1e3 * (t2 - t1):.1f} ms  (success={res['success']})")
+    print(f"chi2 = {res['chi2_data']:.3f}  (+prior: {res['chi2']:.3f})  ndof = {res['ndof']}")
+    err = np.sqrt(np.diag(res["cov_free"]))
+    for k, (a, e) in enumerate(zip(res["free"], err), start=1):
+        print(f"  a_{k} = {a:+.4f} ± {e:.4f}")
+
+    Q2 = np.array([0.0, 0.25, 0.5, 1.0, 2.0])
+    print("Q2       FA_zexp    FA_dipole(MA=1)")
+    for q, fz, fd in zip(Q2, FA_zexp(Q2, res["coeffs"]), _FA_dipole(Q2, 1.00)):
+        print(f"{q:5.2f}  {fz:+.4f}    {fd:+.4f}")
+
+    pred = zexp_prediction(form, res["free"])
+    for lo, hi, d, p in zip(q2_low, q2_high, data, pred):
+        print(f"[{lo:.3f},{hi:.3f}]  data={d:.4f}  zexp={p:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
 
-from ccqe_contraction import contraction_lep_had  # usa tu función ya implementada en src
+from ccqe_contraction import contraction_lep_had, contraction_lep_had_nu_nubar  # usa tu función ya implementada en src
 
 import numpy as np
 import matplotlib.pyplot as plt
@@ -19,23 +19,8 @@ GEV2_TO_CM2 = 0.389379e-27  # 1 GeV^-2 -> cm^2
 
 
 # ---------- Form factors (Galster + axial dipole + pion pole) ----------
-def G_D(Q2_abs, MV=0.843):
-    return 1.0 / (1.0 + Q2_abs / MV**2)**2
-
-def sachs_galster(Q2_abs):
-    mu_p = 2.79284734463
-    mu_n = -1.91304273
-    tau = Q2_abs / (4*M**2)
-
-    GD = G_D(Q2_abs)
-    GEp = GD
-    GMp = mu_p * GD
-    GMn = mu_n * GD
-
-    lam = 5.6
-    xi_n = 1.0 / (1.0 + lam*tau)
-    GEn = -mu_n * tau * GD * xi_n
-    return GEp, GMp, GEn, GMn
+# Galster / GKeX / dipolo axial vienen del registro de src/form_factors.py
+from form_factors import resolve_vector_ff, axial_dipole as GA_dipole
 
 def F1F2_from_GE_GM(GE, GM, Q2_abs):
     tau = Q2_abs / (4*M**2)
@@ -48,20 +33,15 @@ def isovector_F1F2_from_sachs(GEp, GMp, GEn, GMn, Q2_abs):
     F1n, F2n = F1F2_from_GE_GM(GEn, GMn, Q2_abs)
     return (F1p - F1n), (F2p - F2n)
 
-def GA_dipole(Q2_abs, MA=1.03, gA=1.267):
-    return gA / (1.0 + Q2_abs/MA**2)**2
-
 def FP_pionpole(Q2_abs, GA, mpi=0.13957):
     return (2*M**2 * GA) / (mpi**2 + Q2_abs)
 
-def vector_form_factors(Q2_abs, model="galster"):
-    if model == "galster":
-        GEp, GMp, GEn, GMn = sachs_galster(Q2_abs)
-        return isovector_F1F2_from_sachs(GEp, GMp, GEn, GMn, Q2_abs)
-    
-    elif model == "gkex":
-     from form_factors_gkex import sachs_gkex
-    GEp, GMp, GEn, GMn = sachs_gkex(Q2_abs, M=M)
+def vector_sachs(model="galster"):
+    """Q2 -> (GEp, GMp, GEn, GMn) del registro; resolver una vez y pasarlo como sachs= en los bucles."""
+    return resolve_vector_ff(model, M=M)
+
+def vector_form_factors(Q2_abs, model="galster", sachs=None):
+    GEp, GMp, GEn, GMn = (sachs if sachs is not None else vector_sachs(model))(Q2_abs)
     return isovector_F1F2_from_sachs(GEp, GMp, GEn, GMn, Q2_abs)
 
 
@@ -90,7 +70,7 @@ def f_rec(Ev, El, cos_th):
 
 
 # ---------- Sección eficaz (2.84) ----------
-def dsigma_dOmega(Ev, cos_th, vector_model="galster", MA=1.03, is_antinu=False):
+def dsigma_dOmega(Ev, cos_th, vector_model="galster", MA=1.03, is_antinu=False, sachs=None):
     El = solve_El(Ev, cos_th)
     if El is None:
         return 0.0
@@ -99,7 +79,7 @@ def dsigma_dOmega(Ev, cos_th, vector_model="galster", MA=1.03, is_antinu=False):
     Q2 = q2_abs(Ev, El, cos_th)
     frec = f_rec(Ev, El, cos_th)
 
-    F1V, F2V = vector_form_factors(Q2, model=vector_model)
+    F1V, F2V = vector_form_factors(Q2, model=vector_model, sachs=sachs)
     GA = GA_dipole(Q2, MA=MA)
     FP = FP_pionpole(Q2, GA)
 
@@ -109,60 +89,96 @@ def dsigma_dOmega(Ev, cos_th, vector_model="galster", MA=1.03, is_antinu=False):
     pref = (GF**2 * cosC**2) / (4*np.pi**2)
     return pref * (kl/Ev) * (1.0/frec) * X
 
-def main():
-    Ev = 1.0  # GeV
+
+def dsigma_dOmega_nu_nubar(Ev, cos_th, vector_model="galster", MA=1.03, sachs=None):
+    """
+    (dσ/dΩ_ν, dσ/dΩ_ν̄, suma, diferencia ν - ν̄) con una sola cinemática y una
+    sola evaluación de factores de forma. sachs: vector_sachs(vector_model) ya resuelto.
+    """
+    El = solve_El(Ev, cos_th)
+    if El is None:
+        return 0.0, 0.0, 0.0, 0.0
+
+    kl = np.sqrt(El**2 - m_mu**2)
+    Q2 = q2_abs(Ev, El, cos_th)
+    frec = f_rec(Ev, El, cos_th)
+
+    F1V, F2V = vector_form_factors(Q2, model=vector_model, sachs=sachs)
+    GA = GA_dipole(Q2, MA=MA)
+    FP = FP_pionpole(Q2, GA)
+
+    X_nu, X_nubar = contraction_lep_had_nu_nubar(Q2, Ev, El, cos_th, M, m_mu, F1V, F2V, GA, FP)
+
+    norm = (GF**2 * cosC**2) / (4*np.pi**2) * (kl/Ev) * (1.0/frec)
+    nu, nubar = norm * X_nu, norm * X_nubar
+    return nu, nubar, nu + nubar, nu - nubar
+
+def compute_fig4_1(Ev=1.0, MA_values=(1.03, 1.35)):
+    """Curvas dσ/dΩ(θ) de la figura 4.1 (cm²/sr): Galster con MA_ref y GKeX con MA_ref y MA_alt."""
     thetas = np.linspace(0.0, np.pi, 181)
     coss = np.cos(thetas)
 
     # --- curvas: Galster y (si existe) GKeX ---
-    y_red = np.array([
-        dsigma_dOmega(Ev, c, vector_model="galster", MA=1.03, is_antinu=False)
+    MA_ref, MA_alt = MA_values
+    out = {"theta_deg": thetas * 180 / np.pi}
+    galster = vector_sachs("galster")
+    out["galster"] = np.array([
+        dsigma_dOmega(Ev, c, vector_model="galster", MA=MA_ref, is_antinu=False, sachs=galster)
         for c in coss
     ]) * GEV2_TO_CM2
 
     # Intentamos GKeX: si aún no lo has implementado, no rompe el script
-    y_blue = None
-    y_green = None
     try:
-        y_blue = np.array([
-            dsigma_dOmega(Ev, c, vector_model="gkex", MA=1.03, is_antinu=False)
+        gkex = vector_sachs("gkex")
+        out["gkex_ref"] = np.array([
+            dsigma_dOmega(Ev, c, vector_model="gkex", MA=MA_ref, is_antinu=False, sachs=gkex)
             for c in coss
         ]) * GEV2_TO_CM2
 
-        y_green = np.array([
-            dsigma_dOmega(Ev, c, vector_model="gkex", MA=1.35, is_antinu=False)
+        out["gkex_alt"] = np.array([
+            dsigma_dOmega(Ev, c, vector_model="gkex", MA=MA_alt, is_antinu=False, sachs=gkex)
             for c in coss
         ]) * GEV2_TO_CM2
 
     except NotImplementedError:
         print("GKeX aún no implementado: se plotea solo Galster.")
+    return out
+
+
+def render_fig4_1(curves, outdir=None, MA_values=(1.03, 1.35)):
+    """Dibuja y guarda fig_4_1.pdf a partir de compute_fig4_1; devuelve [ruta]."""
+    MA_ref, MA_alt = MA_values
 
     # --- plot ---
     plt.figure()
-    plt.plot(thetas * 180 / np.pi, y_red, label="Galster (MA=1.03)")
+    plt.plot(curves["theta_deg"], curves["galster"], label=f"Galster (MA={MA_ref:g})")
 
-    if y_blue is not None:
-        plt.plot(thetas * 180 / np.pi, y_blue, "--", label="GKeX (MA=1.03)")
+    if "gkex_ref" in curves:
+        plt.plot(curves["theta_deg"], curves["gkex_ref"], "--", label=f"GKeX (MA={MA_ref:g})")
 
-    if y_green is not None:
-        plt.plot(thetas * 180 / np.pi, y_green, label="GKeX (MA=1.35)")
+    if "gkex_alt" in curves:
+        plt.plot(curves["theta_deg"], curves["gkex_alt"], label=f"GKeX (MA={MA_alt:g})")
 
     plt.xlabel(r'$\theta_\mu$ [deg]')
     plt.ylabel(r'$d\sigma/d\Omega$ [cm$^2$/sr]')
     plt.legend()
     plt.tight_layout()
 
-    # --- guardado robusto (ruta absoluta) ---
-    from pathlib import Path
-    outdir = Path(r"C:\Users\User\Documents\tfgmcr\results\figures")
+    # --- guardado (results/figures del proyecto salvo que se indique otra carpeta) ---
+    outdir = Path(outdir) if outdir is not None else Path(__file__).resolve().parents[1] / "results" / "figures"
     outdir.mkdir(parents=True, exist_ok=True)
     outfile = outdir / "fig_4_1.pdf"
     print("saving to:", outfile)
     plt.savefig(outfile)
+    return [outfile]
+
 
-    plt.show()
+def main(Ev=1.0, MA_values=(1.03, 1.35), outdir=None, show=True):
+    render_fig4_1(compute_fig4_1(Ev, MA_values), outdir, MA_values)
 
+    if show:
+        plt.show()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
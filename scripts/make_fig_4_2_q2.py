@@ -19,16 +19,17 @@ sys.path.append(str(ROOT / "scripts"))  # para importar make_fig4_1.py
 
 # Importamos lo ya implementado y funcionando en tu make_fig4_1.py
 # Ajusta el nombre si tu archivo se llama distinto
-from make_fig4_1 import dsigma_dOmega, solve_El, q2_abs, GEV2_TO_CM2
+from make_fig4_1 import dsigma_dOmega, solve_El, q2_abs, vector_sachs, GEV2_TO_CM2
 
 
 def dsdo_vs_theta(Ev, vector_model, MA, is_antinu=False, npts=721):
     """Devuelve (theta_deg, dsdo_cm2sr) para un Ev fijo."""
     thetas = np.linspace(0.0, np.pi, npts)
     coss = np.cos(thetas)
+    sachs = vector_sachs(vector_model)
 
     dsdo = np.array([
-        np.real(dsigma_dOmega(Ev, c, vector_model=vector_model, MA=MA, is_antinu=is_antinu))
+        np.real(dsigma_dOmega(Ev, c, vector_model=vector_model, MA=MA, is_antinu=is_antinu, sachs=sachs))
         for c in coss
     ]) * GEV2_TO_CM2
 
@@ -43,6 +44,7 @@ def dsdo_vs_q2(Ev, vector_model, MA, is_antinu=False, npts=721):
     thetas = np.linspace(0.0, np.pi, npts)
     coss = np.cos(thetas)
 
+    sachs = vector_sachs(vector_model)
     Q2_list = []
     dsdo_list = []
 
@@ -52,7 +54,7 @@ def dsdo_vs_q2(Ev, vector_model, MA, is_antinu=False, npts=721):
             continue
 
         Q2 = q2_abs(Ev, El, c)  # |Q^2|
-        dsdo = np.real(dsigma_dOmega(Ev, c, vector_model=vector_model, MA=MA, is_antinu=is_antinu))
+        dsdo = np.real(dsigma_dOmega(Ev, c, vector_model=vector_model, MA=MA, is_antinu=is_antinu, sachs=sachs))
 
         if np.isfinite(Q2) and np.isfinite(dsdo) and Q2 > 0:
             Q2_list.append(Q2)
@@ -65,24 +67,40 @@ def dsdo_vs_q2(Ev, vector_model, MA, is_antinu=False, npts=721):
     return Q2v[idx], dsdo[idx]
 
 
-def main():
-    outdir = ROOT / "results" / "figures"
-    outdir.mkdir(parents=True, exist_ok=True)
+# Energías como en la figura de Guillermo
+EV_LIST = (0.5, 1.0, 1.5)
+
+# Curvas: (label, vector_model, MA, linestyle)
+CURVES = (
+    ("Galster", "galster", 1.03, "-"),
+    ("GKeX",    "gkex",    1.03, "--"),
+    (r"GKeX ($M_A=1.35$ GeV)", "gkex", 1.35, "-"),
+)
+
+
+def compute_fig4_2(Ev_list=EV_LIST, models=tuple((v, MA) for _, v, MA, _ in CURVES), npts=721):
+    """
+    Curvas de la figura 4.2 para cada (Ev, modelo): arrays "q2_i_j", "dsdo_q2_i_j",
+    "theta_i_j", "dsdo_th_i_j" (i = índice de energía, j = índice de curva).
+    """
+    out = {}
+    for i, Ev in enumerate(Ev_list):
+        for j, (vmodel, MA) in enumerate(models):
+            out[f"q2_{i}_{j}"], out[f"dsdo_q2_{i}_{j}"] = dsdo_vs_q2(Ev, vmodel, MA, is_antinu=False, npts=npts)
+            out[f"theta_{i}_{j}"], out[f"dsdo_th_{i}_{j}"] = dsdo_vs_theta(Ev, vmodel, MA, is_antinu=False, npts=npts)
+    return out
 
-    # Energías como en la figura de Guillermo
-    Ev_list = [0.5, 1.0, 1.5]
 
-    # Curvas: (label, vector_model, MA, linestyle)
-    curves = [
-        ("Galster", "galster", 1.03, "-"),
-        ("GKeX",    "gkex",    1.03, "--"),
-        (r"GKeX ($M_A=1.35$ GeV)", "gkex", 1.35, "-"),
-    ]
+def render_fig4_2(curves, outdir=None, Ev_list=EV_LIST, styles=tuple((label, ls) for label, _, _, ls in CURVES)):
+    """Dibuja y guarda fig_4_2_like_guillermo.pdf a partir de compute_fig4_2; devuelve [ruta]."""
+    outdir = Path(outdir) if outdir is not None else ROOT / "results" / "figures"
+    outdir.mkdir(parents=True, exist_ok=True)
 
     fig, axes = plt.subplots(
         nrows=len(Ev_list), ncols=2,
         figsize=(10, 9),
-        sharey="row"
+        sharey="row",
+        squeeze=False,
     )
 
     for i, Ev in enumerate(Ev_list):
@@ -90,18 +108,16 @@ def main():
         ax_th = axes[i, 1]
 
         # --- columna izquierda: dσ/dΩ vs |Q^2| ---
-        for label, vmodel, MA, ls in curves:
-            Q2, dsdo = dsdo_vs_q2(Ev, vmodel, MA, is_antinu=False, npts=721)
-            ax_q2.plot(Q2, dsdo, ls, label=label)
+        for j, (label, ls) in enumerate(styles):
+            ax_q2.plot(curves[f"q2_{i}_{j}"], curves[f"dsdo_q2_{i}_{j}"], ls, label=label)
 
         ax_q2.set_title(rf"$E_\nu = {Ev:.1f}\ \mathrm{{GeV}}$")
         ax_q2.set_xlabel(r"$|Q^2|\ (\mathrm{GeV}^2)$")
         ax_q2.grid(True, alpha=0.3)
 
         # --- columna derecha: dσ/dΩ vs θ ---
-        for label, vmodel, MA, ls in curves:
-            th_deg, dsdo = dsdo_vs_theta(Ev, vmodel, MA, is_antinu=False, npts=721)
-            ax_th.plot(th_deg, dsdo, ls, label=label)
+        for j, (label, ls) in enumerate(styles):
+            ax_th.plot(curves[f"theta_{i}_{j}"], curves[f"dsdo_th_{i}_{j}"], ls, label=label)
 
         ax_th.set_title(rf"$E_\nu = {Ev:.1f}\ \mathrm{{GeV}}$")
         ax_th.set_xlabel(r"$\theta_\mu\ (\mathrm{deg})$")
@@ -117,8 +133,13 @@ def main():
     outfile = outdir / "fig_4_2_like_guillermo.pdf"
     fig.savefig(outfile)
     print("Saved:", outfile)
+    return [outfile]
+
+
+def main():
+    render_fig4_2(compute_fig4_2())
     plt.show()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
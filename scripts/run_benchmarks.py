@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 21:48:09 2026
+
+@author: User
+"""
+
+# scripts/run_benchmarks.py
+# Benchmarks of the hot paths: throughput (evaluations/s) and wall time per call.
+#
+# Every run is appended to results/benchmarks/history.jsonl and compared with
+# results/benchmarks/baseline.json (written on the first run or with
+# --update-baseline). The exit status is 1 when a benchmark is slower than its
+# baseline by more than --threshold (relative) or has no baseline yet ("sin
+# referencia": a new hot path must be recorded before it can gate), so it can
+# gate a change:
+#
+#   python scripts/run_benchmarks.py                    # compare
+#   python scripts/run_benchmarks.py --update-baseline  # accept current timings
+#   python scripts/run_benchmarks.py -k flux            # only names containing "flux"
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+sys.path.insert(0, str(SRC_DIR))
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from form_factors_gkex import sachs_gkex
+from ccqe_hydrogen_xsec import (
+    dsigma_dQ2_numubar_p,
+    dsigma_dQ2_numubar_p_array,
+    dsigma_dQ2_point_callable,
+    sachs_provider,
+)
+from ccqe_contraction import contraction_lep_had
+from ccqe_curves import curve_theta
+from scripts.make_fig4_1 import solve_El, dsigma_dOmega, vector_sachs, M, m_mu
+from minerva.inputs import load_flux, load_xsec_bins
+from minerva.flux_folding import flux_folded_binned_xsec
+from minerva.convergence import fold_defaults
+
+BENCH_DIR = PROJECT_ROOT / "results" / "benchmarks"
+HISTORY_PATH = BENCH_DIR / "history.jsonl"
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+
+
+# -----------------------
+# Benchmarks: name -> (call, evaluations per call)
+# -----------------------
+def _bench_sachs_gkex():
+    Q2 = np.linspace(0.0, 3.0, 200)
+    return (lambda: [sachs_gkex(float(q)) for q in Q2]), len(Q2)
+
+
+def _bench_dsigma_dQ2_numubar_p():
+    Ev = np.linspace(1.0, 10.0, 20)
+    Q2 = np.linspace(0.05, 2.0, 10)
+    pts = [(float(e), float(q)) for e in Ev for q in Q2]
+    sachs = sachs_provider(0.71, "gkex")
+    return (lambda: [dsigma_dQ2_numubar_p(e, q, 1.0, 0.71, "gkex", sachs=sachs) for e, q in pts]), len(pts)
+
+
+def _bench_contraction_lep_had():
+    rng = np.random.default_rng(1)
+    pts = [(float(q), 2.0, 1.5, float(c)) for q, c in zip(rng.uniform(0.05, 1.0, 1000), rng.uniform(-1, 1, 1000))]
+    return (
+        lambda: [contraction_lep_had(q, Ev, El, c, M, m_mu, 0.9, 3.0, -1.1, 20.0, is_antinu=True) for q, Ev, El, c in pts]
+    ), len(pts)
+
+
+def _bench_solve_El():
+    coss = np.cos(np.linspace(0.0, np.pi, 200))
+    return (lambda: [solve_El(1.0, float(c)) for c in coss]), len(coss)
+
+
+def _bench_dsigma_dOmega():
+    coss = np.cos(np.linspace(0.0, np.pi, 200))
+    sachs = vector_sachs("gkex")
+    return (lambda: [dsigma_dOmega(1.0, float(c), vector_model="gkex", MA=1.03, sachs=sachs) for c in coss]), len(coss)
+
+
+def _bench_curve_theta():
+    npts = 361
+    return (lambda: curve_theta(1.0, vector_model="gkex", MA=1.03, npts=npts)), npts
+
+
+def _minerva_inputs():
+    q2_low, q2_high, _ = load_xsec_bins()
+    flux_E, flux_phi = load_flux()
+    return q2_low, q2_high, flux_E, flux_phi
+
+
+def _bench_flux_folded_loop():
+    """Scalar loop with the historical settings (nQ2=80, Ev_max=20)."""
+    q2_low, q2_high, flux_E, flux_phi = _minerva_inputs()
+    params = {"MA": 1.00, "MV2": 0.71, "vector_ff": "gkex"}
+    model = dsigma_dQ2_point_callable(params)
+
+    n_flux = int(np.sum((flux_E > 0) & (flux_E < 20.0) & (flux_phi > 0)))
+    return (
+        lambda: flux_folded_binned_xsec(q2_low, q2_high, flux_E, flux_phi, model, params, nQ2=80, Ev_max=20.0)
+    ), len(q2_low) * 80 * n_flux
+
+
+def _bench_flux_folded_defaults():
+    """Vectorized fold with the converged settings (fold_defaults)."""
+    q2_low, q2_high, flux_E, flux_phi = _minerva_inputs()
+    params = {"MA": 1.00, "MV2": 0.71, "vector_ff": "gkex"}
+    fold = fold_defaults()
+
+    def model(Ev, Q2, p):
+        return dsigma_dQ2_numubar_p_array(Ev, Q2, p["MA"], p["MV2"], p["vector_ff"])
+
+    if fold["nE"] is None:
+        n_E = int(np.sum((flux_E > 0) & (flux_E < fold["Ev_max"]) & (flux_phi > 0)))
+    else:
+        n_E = fold["nE"]
+
+    def call():
+        return flux_folded_binned_xsec(q2_low, q2_high, flux_E, flux_phi, model, params, **fold)
+    return call, len(q2_low) * fold["nQ2"] * n_E
+
+
+BENCHMARKS = {
+    "sachs_gkex": _bench_sachs_gkex,
+    "dsigma_dQ2_numubar_p": _bench_dsigma_dQ2_numubar_p,
+    "contraction_lep_had": _bench_contraction_lep_had,
+    "solve_El": _bench_solve_El,
+    "dsigma_dOmega": _bench_dsigma_dOmega,
+    "curve_theta": _bench_curve_theta,
+    "flux_folded_binned_xsec_loop": _bench_flux_folded_loop,
+    "flux_folded_binned_xsec_defaults": _bench_flux_folded_defaults,
+}
+
+
+def time_call(call, min_time: float = 0.2, repeat: int = 5) -> float:
+    """Best wall time per call over `repeat` rounds of >= min_time each (one warm-up call)."""
+    t0 = time.perf_counter()
+    call()
+    first = time.perf_counter() - t0
+    if first >= min_time:
+        # slow paths (the scalar fold): the warm-up counts, plus one more call
+        t0 = time.perf_counter()
+        call()
+        return float(min(first, time.perf_counter() - t0))
+
+    best = np.inf
+    for _ in range(repeat):
+        n = 0
+        t0 = time.perf_counter()
+        while True:
+            call()
+            n += 1
+            dt = time.perf_counter() - t0
+            if dt >= min_time:
+                break
+        best = min(best, dt / n)
+    return float(best)
+
+
+def _git_rev() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or "unknown"
+    except Exception:
+        return "unknown"
+
+
+def run_benchmarks(names, min_time: float, repeat: int) -> dict:
+    results = {}
+    for name in names:
+        call, n_evals = BENCHMARKS[name]()
+        t = time_call(call, min_time=min_time, repeat=repeat)
+        results[name] = {"wall_time_s": t, "n_evals": int(n_evals), "evals_per_s": n_evals / t}
+        print(f"{name:34s} {1e3 * t:10.3f} ms   {n_evals / t:12.4g} eval/s")
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> tuple[list[str], list[str]]:
+    """(names whose wall time exceeds the baseline by more than threshold, names with no baseline)."""
+    slow, missing = [], []
+    for name, r in results.items():
+        if name not in baseline:
+            print(f"{name:34s} sin referencia")
+            missing.append(name)
+            continue
+        ratio = r["wall_time_s"] / baseline[name]["wall_time_s"]
+        mark = "REGRESIÓN" if ratio > 1.0 + threshold else ""
+        print(f"{name:34s} x{ratio:6.3f} frente a la referencia {mark}")
+        if mark:
+            slow.append(name)
+    return slow, missing
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmarks de los caminos críticos.")
+    ap.add_argument("-k", default="", help="solo benchmarks cuyo nombre contiene este texto")
+    ap.add_argument("--threshold", type=float, default=0.25, help="regresión relativa tolerada")
+    ap.add_argument("--min-time", type=float, default=0.2)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--update-baseline", action="store_true")
+    args = ap.parse_args()
+
+    names = [n for n in BENCHMARKS if args.k in n]
+    results = run_benchmarks(names, args.min_time, args.repeat)
+
+    BENCH_DIR.mkdir(parents=True, exist_ok=True)
+    record = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git": _git_rev(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.node(),
+        "results": results,
+    }
+    with HISTORY_PATH.open("a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    if args.update_baseline or not baseline:
+        baseline.update(results)
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2))
+        print("Referencia guardada:", BASELINE_PATH)
+        return 0
+
+    slow, missing = compare(results, baseline, args.threshold)
+    if slow:
+        print(f"{len(slow)} benchmark(s) más lentos que la referencia en > {100 * args.threshold:.0f}%: {slow}")
+    if missing:
+        print(f"{len(missing)} benchmark(s) sin referencia: {missing} (guárdala con --update-baseline)")
+    return 1 if slow or missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 23:52:40 2026
+
+@author: User
+"""
+
+# scripts/run_campaign.py
+# Runs a campaign file (TOML/YAML) on a local worker pool; results in results/tables/<campaign>/.
+#
+#   python scripts/run_campaign.py campaigns/minerva_hydrogen_ma_scan.toml --workers 8
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from minerva.campaign import TABLES_DIR, collect_results, expand_jobs, load_campaign, run_campaign
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Ejecuta una campaña de predicciones plegadas con el flujo.")
+    ap.add_argument("campaign", type=Path, help="fichero de campaña (.toml o .yaml)")
+    ap.add_argument("--workers", type=int, default=None, help="procesos (por defecto: 'workers' de la campaña)")
+    ap.add_argument("--out-dir", type=Path, default=TABLES_DIR)
+    ap.add_argument("--force", action="store_true", help="recalcula también los trabajos ya hechos")
+    ap.add_argument("--dry-run", action="store_true", help="solo lista los trabajos")
+    args = ap.parse_args()
+
+    camp = load_campaign(args.campaign)
+    if args.dry_run:
+        for job in expand_jobs(camp):
+            print(job["id"], job["dataset"]["name"], job["params"], job["settings"])
+        return
+
+    run_campaign(camp, out_dir=args.out_dir, workers=args.workers, force=args.force)
+    summary, preds = collect_results(camp, out_dir=args.out_dir)
+    print("Guardado:", summary)
+    print("Guardado:", preds)
+
+
+if __name__ == "__main__":
+    main()
@@ -26,7 +26,7 @@ def contraction_lep_had(Q2_abs, Ev, El, cos_th, M, ml, F1V, F2V, GA, FP, is_anti
     Implementa exactamente tu captura para  η~_{μν} H~^{μν}.
     OJO: para antineutrino, el término con w3 cambia de signo.
     """
-    kl = np.sqrt(max(El**2 - ml**2, 0.0))
+    kl = np.sqrt(np.maximum(El**2 - ml**2, 0.0))
 
     w1, w2, w3, w4, w5 = wi_from_formfactors(Q2_abs, M, F1V, F2V, GA, FP)
 
@@ -42,4 +42,25 @@ def contraction_lep_had(Q2_abs, Ev, El, cos_th, M, ml, F1V, F2V, GA, FP, is_anti
         +      w4*(ml**2)*Ev*A \
         - (w5/M)*Ev*(ml**2)
 
-    return X
\ No newline at end of file
+    return X
+
+
+def contraction_lep_had_nu_nubar(Q2_abs, Ev, El, cos_th, M, ml, F1V, F2V, GA, FP):
+    """
+    contraction_lep_had para ν y ν̄ a la vez: los w_i se evalúan una sola vez y
+    solo el término w3 cambia de signo. Devuelve (X_nu, X_nubar).
+    """
+    kl = np.sqrt(np.maximum(El**2 - ml**2, 0.0))
+
+    w1, w2, w3, w4, w5 = wi_from_formfactors(Q2_abs, M, F1V, F2V, GA, FP)
+
+    A = (El - kl*cos_th)
+    B = (El + kl*cos_th)
+
+    X_sym = 2.0*w1*Ev*A \
+        +      w2*Ev*B \
+        +      w4*(ml**2)*Ev*A \
+        - (w5/M)*Ev*(ml**2)
+    X_w3 = (w3/M)*Ev*((Ev+El)*A - ml**2)
+
+    return X_sym + X_w3, X_sym - X_w3
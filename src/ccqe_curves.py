@@ -13,14 +13,45 @@ import numpy as np
 # - solve_El(Ev, cos_th)
 # - q2_abs(Ev, El, cos_th)
 # - GEV2_TO_CM2
-from scripts.make_fig4_1 import dsigma_dOmega, solve_El, q2_abs, GEV2_TO_CM2
+from scripts.make_fig4_1 import (
+    GEV2_TO_CM2,
+    FP_pionpole,
+    GA_dipole,
+    M,
+    contraction_lep_had,
+    dsigma_dOmega,
+    dsigma_dOmega_nu_nubar,
+    GF,
+    cosC,
+    m_mu,
+    q2_abs,
+    solve_El,
+    vector_form_factors,
+    vector_sachs,
+)
+
+# Eν grid of the explorer slider (0.2-3.0 GeV in 0.05 steps)
+EV_GRID = np.round(np.arange(0.2, 3.0 + 1e-9, 0.05), 2)
 
 
 def curve_theta(Ev, vector_model="gkex", MA=1.03, is_antinu=False, npts=361):
     thetas = np.linspace(0.0, np.pi, npts)
     coss = np.cos(thetas)
+    sachs = vector_sachs(vector_model)
     y = np.array([
-        np.real(dsigma_dOmega(Ev, c, vector_model=vector_model, MA=MA, is_antinu=is_antinu))
+        np.real(dsigma_dOmega(Ev, c, vector_model=vector_model, MA=MA, is_antinu=is_antinu, sachs=sachs))
+        for c in coss
+    ]) * GEV2_TO_CM2
+    return thetas * 180/np.pi, y
+
+
+def curve_theta_nu_nubar(Ev, vector_model="gkex", MA=1.03, npts=361):
+    """theta_deg y dσ/dΩ con columnas (ν, ν̄, suma, ν - ν̄), en una sola pasada."""
+    thetas = np.linspace(0.0, np.pi, npts)
+    coss = np.cos(thetas)
+    sachs = vector_sachs(vector_model)
+    y = np.array([
+        np.real(dsigma_dOmega_nu_nubar(Ev, c, vector_model=vector_model, MA=MA, sachs=sachs))
         for c in coss
     ]) * GEV2_TO_CM2
     return thetas * 180/np.pi, y
@@ -30,13 +61,14 @@ def curve_q2_reparam(Ev, vector_model="gkex", MA=1.03, is_antinu=False, npts=721
     thetas = np.linspace(0.0, np.pi, npts)
     coss = np.cos(thetas)
 
+    sachs = vector_sachs(vector_model)
     Q2_list, y_list = [], []
     for c in coss:
         El = solve_El(Ev, c)
         if El is None:
             continue
         Q2 = q2_abs(Ev, El, c)
-        y = np.real(dsigma_dOmega(Ev, c, vector_model=vector_model, MA=MA, is_antinu=is_antinu))
+        y = np.real(dsigma_dOmega(Ev, c, vector_model=vector_model, MA=MA, is_antinu=is_antinu, sachs=sachs))
         if np.isfinite(Q2) and np.isfinite(y) and Q2 > 0:
             Q2_list.append(Q2)
             y_list.append(y)
@@ -44,4 +76,87 @@ def curve_q2_reparam(Ev, vector_model="gkex", MA=1.03, is_antinu=False, npts=721
     Q2 = np.array(Q2_list)
     y = np.array(y_list) * GEV2_TO_CM2
     idx = np.argsort(Q2)
-    return Q2[idx], y[idx]
\ No newline at end of file
+    return Q2[idx], y[idx]
+
+
+# -----------------------
+# Vectorized kernel and the (Eν, θ) surface
+# -----------------------
+def solve_El_array(Ev, cos_th):
+    """
+    Closed-form solve_El on arrays: the QE condition 2M(Ev - El) = |Q²| squared
+    into a quadratic in El, keeping the root of the unsquared equation inside
+    (m_mu, Ev + M). NaN where there is none.
+    """
+    Ev, c = np.broadcast_arrays(np.asarray(Ev, dtype=float), np.asarray(cos_th, dtype=float))
+    a = Ev + M
+    b = M * Ev + 0.5 * m_mu**2
+    # Ev c kl = El a - b  ->  (a² - Ev²c²) El² - 2ab El + b² + Ev²c² m² = 0
+    A = a * a - (Ev * c) ** 2
+    disc = (a * b) ** 2 - A * (b * b + (Ev * c * m_mu) ** 2)
+    # disc -> 0 at θ = 90° (single root El = b/a); keep it through round-off
+    sq = np.sqrt(np.where(disc >= -1e-12 * (a * b) ** 2, np.maximum(disc, 0.0), np.nan))
+
+    # The squared equation also holds the root of the mirror angle (-c). A root
+    # solves the unsquared one if it is closer to Ev c kl = El a - b than to
+    # -Ev c kl = El a - b (up to round-off, for the tie at θ = 90° where both
+    # roots coincide); no tolerance on √disc, which is only round-off there.
+    El = np.full(Ev.shape, np.nan)
+    best = np.full(Ev.shape, np.inf)
+    for sign in (1.0, -1.0):
+        root = (a * b + sign * sq) / A
+        kl = np.sqrt(np.maximum(root * root - m_mu**2, 0.0))
+        with np.errstate(invalid="ignore"):
+            res = np.abs(Ev * c * kl - (root * a - b))
+            ok = (root > m_mu) & (root < Ev + M) & (res <= np.abs(Ev * c * kl + (root * a - b)) + 1e-12 * root * a) & (res < best)
+        El = np.where(ok, root, El)
+        best = np.where(ok, res, best)
+    return El
+
+
+def dsigma_dOmega_array(Ev, cos_th, vector_model="gkex", MA=1.03, is_antinu=False):
+    """Vectorized dsigma_dOmega (real part, GeV⁻²/sr); 0 where there is no QE solution."""
+    Ev, c = np.broadcast_arrays(np.asarray(Ev, dtype=float), np.asarray(cos_th, dtype=float))
+    El = solve_El_array(Ev, c)
+    ok = np.isfinite(El)
+    El = np.where(ok, El, m_mu + 1.0)
+
+    kl = np.sqrt(El**2 - m_mu**2)
+    Q2 = 2 * Ev * (El - kl * c) - m_mu**2
+    frec = 1.0 + Ev * (kl - El * c) / (M * kl)
+
+    F1V, F2V = vector_form_factors(Q2, model=vector_model)
+    GA = GA_dipole(Q2, MA=MA)
+    FP = FP_pionpole(Q2, GA)
+    X = contraction_lep_had(Q2, Ev, El, c, M, m_mu, F1V, F2V, GA, FP, is_antinu=is_antinu)
+
+    pref = (GF**2 * cosC**2) / (4 * np.pi**2)
+    return np.where(ok, np.real(pref * (kl / Ev) * (1.0 / frec) * X), 0.0)
+
+
+def dsdo_surface(vector_model="gkex", MA=1.03, is_antinu=False, Ev_grid=EV_GRID, npts=721):
+    """
+    dσ/dΩ(Eν, θ) in cm²/sr on Ev_grid × linspace(0, π, npts), one vectorized
+    pass. Returns (Ev_grid, theta_deg, dsdo[nEv, nθ], Q2[nEv, nθ]) with Q2 = |Q²|
+    (NaN where there is no QE solution).
+    """
+    Ev = np.asarray(Ev_grid, dtype=float)
+    thetas = np.linspace(0.0, np.pi, npts)
+    c = np.cos(thetas)[None, :]
+    El = solve_El_array(Ev[:, None], c)
+    kl = np.sqrt(np.maximum(El**2 - m_mu**2, 0.0))
+    Q2 = 2 * Ev[:, None] * (El - kl * c) - m_mu**2
+    dsdo = dsigma_dOmega_array(Ev[:, None], c, vector_model=vector_model, MA=MA, is_antinu=is_antinu) * GEV2_TO_CM2
+    return Ev, thetas * 180 / np.pi, dsdo, Q2
+
+
+def surface_slice(Ev_grid, surface, Ev):
+    """Row of a (nEv, ...) surface at Ev: exact on the grid, linear in Eν in between."""
+    Ev_grid = np.asarray(Ev_grid, dtype=float)
+    i = int(np.clip(np.searchsorted(Ev_grid, Ev) - 1, 0, len(Ev_grid) - 2))
+    t = float(np.clip((Ev - Ev_grid[i]) / (Ev_grid[i + 1] - Ev_grid[i]), 0.0, 1.0))
+    if np.isclose(t, 0.0):
+        return surface[i]
+    if np.isclose(t, 1.0):
+        return surface[i + 1]
+    return (1.0 - t) * surface[i] + t * surface[i + 1]
@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 00:41:15 2026
+
+@author: User
+"""
+
+# src/figure_build.py
+# Make-like build of the thesis figures (scripts/build_figures.py).
+#
+# Each figure is a Target with two stages:
+#
+#   compute(**params)                 -> dict of numpy arrays   (the physics, slow)
+#   render(arrays, outdir, **style)   -> list of written files  (matplotlib, fast)
+#
+# The compute key hashes the contents of the target's input files (source
+# modules, data CSVs, settings JSON), its params and the source of the compute
+# side only: the compute function and, transitively, the project functions and
+# scalar constants it refers to by name (_compute_sources). The module holding
+# compute is not hashed whole, so a script that also defines render and its
+# labels is recomputed only when a kernel changes. The arrays are cached as
+# <cache>/<name>-<key>.npz, so changing only the plot style re-renders without
+# recomputing. The render key adds the style; a stamp file per target records
+# the last render key and the outputs, and a target is rebuilt only when its
+# key changed or an output is missing. Stale targets are computed and then
+# rendered on a process pool, independent figures in parallel, and the
+# outputs are copied to the thesis figures/ directory.
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+FIG_DIR = PROJECT_ROOT / "results" / "figures"
+CACHE_DIR = PROJECT_ROOT / "results" / "figure_cache"
+THESIS_FIG_DIR = (
+    PROJECT_ROOT
+    / "Estudio_de_la_estructura_axial_del_nucleón_en_interacciones_con_neutrinos_y_antineutrinos"
+    / "figures"
+)
+
+
+@dataclass(frozen=True)
+class Target:
+    name: str
+    compute: Callable[..., dict]
+    render: Callable[..., list]
+    outputs: tuple[str, ...]                   # file names written by render into outdir
+    inputs: tuple[Path, ...] = ()              # source modules, data files, settings
+    params: dict = field(default_factory=dict)  # compute kwargs (JSON-serialisable)
+    style: dict = field(default_factory=dict)   # render kwargs (JSON-serialisable)
+
+
+def _hash_files(h, paths) -> None:
+    for p in sorted({Path(p).resolve() for p in paths}):
+        h.update(str(p.relative_to(PROJECT_ROOT) if p.is_relative_to(PROJECT_ROOT) else p).encode())
+        h.update(p.read_bytes() if p.exists() else b"<missing>")
+
+
+def _json(obj) -> str:
+    return json.dumps(obj, sort_keys=True, default=str)
+
+
+def _project_file(obj) -> Path | None:
+    try:
+        p = Path(inspect.getfile(obj)).resolve()
+    except (TypeError, OSError):
+        return None
+    return p if p.is_relative_to(PROJECT_ROOT) else None
+
+
+def _code_names(code) -> set[str]:
+    names = set(code.co_names)
+    for c in code.co_consts:
+        if inspect.iscode(c):
+            names |= _code_names(c)
+    return names
+
+
+def _compute_sources(fn, skip_files=()) -> list[str]:
+    """
+    Source of fn and of every project function it reaches through global
+    names, plus the repr of the scalar constants it reads (M, GF, ...).
+    Functions and modules in skip_files are hashed whole as inputs instead.
+    """
+    skip = {Path(p).resolve() for p in skip_files}
+    out, seen, stack = [], set(), [fn]
+    while stack:
+        f = inspect.unwrap(stack.pop())
+        if id(f) in seen or not inspect.isfunction(f):
+            continue
+        seen.add(id(f))
+        try:
+            out.append(f"{f.__module__}.{f.__qualname__}:{inspect.getsource(f)}")
+        except OSError:
+            out.append(f"{f.__module__}.{f.__qualname__}:{f.__code__.co_code.hex()}")
+        for name in sorted(_code_names(f.__code__)):
+            if name not in f.__globals__:
+                continue
+            obj = f.__globals__[name]
+            if isinstance(obj, (bool, int, float, complex, str)):
+                out.append(f"{f.__module__}.{name}={obj!r}")
+                continue
+            src = _project_file(obj)
+            if src is None or src in skip:
+                continue
+            if inspect.ismodule(obj):
+                out.append(f"{name}:{src.read_text(encoding='utf-8')}")
+            else:
+                stack.append(obj)
+    return out
+
+
+def compute_key(t: Target) -> str:
+    h = hashlib.blake2b(digest_size=12)
+    h.update(f"{t.compute.__module__}.{t.compute.__qualname__}".encode())
+    _hash_files(h, t.inputs)
+    for s in _compute_sources(t.compute, t.inputs):
+        h.update(s.encode())
+    h.update(_json(t.params).encode())
+    return h.hexdigest()
+
+
+def render_key(t: Target, ckey: str) -> str:
+    h = hashlib.blake2b(digest_size=12)
+    h.update(f"{ckey}|{t.render.__module__}.{t.render.__qualname__}".encode())
+    _hash_files(h, [inspect.getfile(t.render)])
+    h.update(_json(t.style).encode())
+    h.update(_json(list(t.outputs)).encode())
+    return h.hexdigest()
+
+
+def _cache_path(t: Target, ckey: str, cache_dir: Path) -> Path:
+    return Path(cache_dir) / f"{t.name}-{ckey}.npz"
+
+
+def _stamp_path(t: Target, cache_dir: Path) -> Path:
+    return Path(cache_dir) / f"{t.name}.stamp.json"
+
+
+def status(t: Target, outdir: Path = FIG_DIR, cache_dir: Path = CACHE_DIR) -> dict:
+    """{"compute": key, "render": key, "cached": arrays on disk, "stale": needs render}."""
+    ckey = compute_key(t)
+    rkey = render_key(t, ckey)
+    stamp = _stamp_path(t, cache_dir)
+    last = json.loads(stamp.read_text()) if stamp.exists() else {}
+    outputs_ok = all((Path(outdir) / o).exists() for o in t.outputs)
+    return {
+        "compute": ckey,
+        "render": rkey,
+        "cached": _cache_path(t, ckey, cache_dir).exists(),
+        "stale": last.get("render") != rkey or not outputs_ok,
+    }
+
+
+def _compute_task(t: Target, ckey: str, cache_dir: Path) -> float:
+    t0 = time.perf_counter()
+    arrays = t.compute(**t.params)
+    path = _cache_path(t, ckey, cache_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp.npz")
+    np.savez(tmp, **{k: np.asarray(v) for k, v in arrays.items()})
+    tmp.replace(path)
+    # older arrays of this target are unreachable now
+    for old in Path(cache_dir).glob(f"{t.name}-*.npz"):
+        if old != path:
+            old.unlink()
+    return time.perf_counter() - t0
+
+
+def _render_task(t: Target, ckey: str, rkey: str, outdir: Path, cache_dir: Path) -> float:
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    t0 = time.perf_counter()
+    with np.load(_cache_path(t, ckey, cache_dir)) as z:
+        arrays = {k: z[k] for k in z.files}
+    t.render(arrays, outdir, **t.style)
+    plt.close("all")
+    missing = [o for o in t.outputs if not (Path(outdir) / o).exists()]
+    if missing:
+        raise RuntimeError(f"{t.name}: render no ha escrito {missing} en {outdir}")
+    _stamp_path(t, cache_dir).write_text(json.dumps({"compute": ckey, "render": rkey, "outputs": list(t.outputs)}, indent=2))
+    return time.perf_counter() - t0
+
+
+def _run_stage(fn, tasks: list[tuple], jobs: int) -> list:
+    if jobs <= 1 or len(tasks) <= 1:
+        return [fn(*a) for a in tasks]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+        return [f.result() for f in [pool.submit(fn, *a) for a in tasks]]
+
+
+def sync_to_thesis(targets, outdir: Path = FIG_DIR, thesis_dir: Path = THESIS_FIG_DIR) -> list[Path]:
+    """Copies the outputs that are missing or different in the thesis figures/ directory."""
+    copied = []
+    thesis_dir = Path(thesis_dir)
+    thesis_dir.mkdir(parents=True, exist_ok=True)
+    for t in targets:
+        for o in t.outputs:
+            src, dst = Path(outdir) / o, thesis_dir / o
+            if src.exists() and (not dst.exists() or dst.read_bytes() != src.read_bytes()):
+                shutil.copy2(src, dst)
+                copied.append(dst)
+    return copied
+
+
+def build(
+    targets,
+    outdir: Path = FIG_DIR,
+    cache_dir: Path = CACHE_DIR,
+    thesis_dir: Path | None = THESIS_FIG_DIR,
+    jobs: int = 1,
+    force: bool = False,
+    log=print,
+) -> dict:
+    """
+    Computes and renders the stale targets; returns {name: "ok" | "rendered" | "built"}.
+    force=True recomputes and re-renders everything.
+    """
+    outdir, cache_dir = Path(outdir), Path(cache_dir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    st = {t.name: status(t, outdir, cache_dir) for t in targets}
+    to_compute = [t for t in targets if force or not st[t.name]["cached"]]
+    to_render = [t for t in targets if force or st[t.name]["stale"] or t in to_compute]
+
+    result = {t.name: "ok" for t in targets}
+    log(f"{len(targets)} figuras: {len(to_compute)} por calcular, {len(to_render)} por dibujar.")
+
+    times = _run_stage(_compute_task, [(t, st[t.name]["compute"], cache_dir) for t in to_compute], jobs)
+    for t, dt in zip(to_compute, times):
+        log(f"  calculado {t.name} ({dt:.1f} s)")
+        result[t.name] = "built"
+
+    times = _run_stage(
+        _render_task,
+        [(t, st[t.name]["compute"], st[t.name]["render"], outdir, cache_dir) for t in to_render],
+        jobs,
+    )
+    for t, dt in zip(to_render, times):
+        log(f"  dibujado {t.name} ({dt:.1f} s) -> {', '.join(t.outputs)}")
+        if result[t.name] == "ok":
+            result[t.name] = "rendered"
+
+    if thesis_dir is not None:
+        for p in sync_to_thesis(targets, outdir, thesis_dir):
+            log(f"  copiado a la tesis: {p.name}")
+    return result
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 18:05:12 2026
+
+@author: User
+"""
+
+# src/form_factors.py
+# Registry of vector (Sachs) and axial form-factor providers.
+#
+# Every provider is array-in / array-out: f(Q2, **params) with Q2 = |Q^2| [GeV^2]
+# a float or ndarray, and outputs with the shape of Q2:
+#   vector: (GEp, GMp, GEn, GMn)
+#   axial : FA
+# resolve_vector_ff / resolve_axial_ff look the name up and bind the
+# parameters once (cached); the returned callable is what goes in hot loops.
+from __future__ import annotations
+
+import inspect
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from typing import Callable
+
+import numpy as np
+
+from form_factors_gkex import sachs_gkex
+
+
+@dataclass(frozen=True)
+class FormFactorProvider:
+    name: str
+    func: Callable
+    params: tuple[str, ...]       # keyword parameters the provider accepts
+    dipole_scaled: bool = False   # all outputs ∝ G_D(MV2) -> d/dMV2 = F * dlnG_D/dMV2
+
+
+VECTOR_FF: dict[str, FormFactorProvider] = {}
+AXIAL_FF: dict[str, FormFactorProvider] = {}
+
+
+def _register(table: dict, name: str, dipole_scaled: bool = False):
+    def deco(func):
+        params = tuple(p for p in inspect.signature(func).parameters if p != "Q2")
+        table[name] = FormFactorProvider(name=name, func=func, params=params, dipole_scaled=dipole_scaled)
+        return func
+    return deco
+
+
+def register_vector_ff(name: str, dipole_scaled: bool = False):
+    """Decorator: func(Q2, **params) -> (GEp, GMp, GEn, GMn)."""
+    return _register(VECTOR_FF, name, dipole_scaled)
+
+
+def register_axial_ff(name: str):
+    """Decorator: func(Q2, **params) -> FA."""
+    return _register(AXIAL_FF, name)
+
+
+def _lookup(table: dict, name: str, kind: str) -> FormFactorProvider:
+    key = name.lower().strip()
+    if key not in table:
+        raise ValueError(f"Modelo {kind} '{name}' desconocido. Disponibles: {sorted(table)}")
+    return table[key]
+
+
+def vector_ff_provider(name: str) -> FormFactorProvider:
+    return _lookup(VECTOR_FF, name, "vectorial")
+
+
+def axial_ff_provider(name: str) -> FormFactorProvider:
+    return _lookup(AXIAL_FF, name, "axial")
+
+
+@lru_cache(maxsize=256)
+def _resolve(kind: str, name: str, items: tuple) -> Callable:
+    prov = vector_ff_provider(name) if kind == "vector" else axial_ff_provider(name)
+    # parameters the provider does not use are dropped (e.g. MV2 for GKex)
+    return partial(prov.func, **{k: v for k, v in items if k in prov.params})
+
+
+def resolve_vector_ff(name: str, **params) -> Callable:
+    """Q2 -> (GEp, GMp, GEn, GMn) with params bound; unused params are ignored."""
+    return _resolve("vector", name, tuple(sorted(params.items())))
+
+
+def resolve_axial_ff(name: str, **params) -> Callable:
+    """Q2 -> FA with params bound; unused params are ignored."""
+    return _resolve("axial", name, tuple(sorted(params.items())))
+
+
+# -----------------------
+# Vector providers
+# -----------------------
+def dipole_GD(Q2, MV2: float = 0.71):
+    return 1.0 / (1.0 + Q2 / MV2) ** 2
+
+
+@register_vector_ff("dipole", dipole_scaled=True)
+def sachs_dipole(Q2, MV2: float = 0.71, mu_p: float = 2.793, mu_n: float = -1.913):
+    GD = dipole_GD(Q2, MV2)
+    return GD, mu_p * GD, 0.0 * GD, mu_n * GD
+
+
+@register_vector_ff("galster", dipole_scaled=True)
+def sachs_galster(
+    Q2,
+    MV2: float = 0.843 ** 2,
+    mu_p: float = 2.79284734463,
+    mu_n: float = -1.91304273,
+    M: float = 0.939565,
+    lam: float = 5.6,
+):
+    tau = Q2 / (4 * M**2)
+    GD = dipole_GD(Q2, MV2)
+    xi_n = 1.0 / (1.0 + lam * tau)
+    return GD, mu_p * GD, -mu_n * tau * GD * xi_n, mu_n * GD
+
+
+@register_vector_ff("gkex")
+def sachs_gkex_array(Q2, M: float = 0.939565):
+    return sachs_gkex(Q2, M=M)
+
+
+# -----------------------
+# Axial providers
+# -----------------------
+@register_axial_ff("dipole")
+def axial_dipole(Q2, MA: float = 1.03, gA: float = 1.267):
+    return gA / (1.0 + Q2 / MA**2) ** 2
+
+
+# z-expansion (Bhattacharya, Hill, Paz 2011; Meyer et al. 2016):
+#   FA(Q²) = Σ_k a_k z^k,   z = (√(tcut+Q²) - √(tcut-t0)) / (√(tcut+Q²) + √(tcut-t0))
+# with FA(0) = gA and the sum rules Σ_k k^n a_k = 0 (n = 0..3), which make
+# FA fall like 1/Q⁴. With kmax = n_free + 4 the free coefficients are a_1..a_n_free.
+ZEXP_TCUT = 9.0 * 0.13957 ** 2   # 9 m_pi² [GeV²]
+ZEXP_T0 = -0.28                  # [GeV²]
+ZEXP_N_SUM_RULES = 4
+
+
+def zexp_z(Q2, tcut: float = ZEXP_TCUT, t0: float = ZEXP_T0):
+    a = np.sqrt(tcut + np.asarray(Q2, dtype=float))
+    b = np.sqrt(tcut - t0)
+    return (a - b) / (a + b)
+
+
+def zexp_coefficients(free, gA: float = 1.267, tcut: float = ZEXP_TCUT, t0: float = ZEXP_T0) -> np.ndarray:
+    """a_0..a_kmax from the free a_1..a_n (kmax = n + 4), FA(0) = gA and the sum rules."""
+    free = np.asarray(free, dtype=float)
+    n = len(free)
+    kmax = n + ZEXP_N_SUM_RULES
+    k = np.arange(kmax + 1, dtype=float)
+
+    # constraint rows: FA(0) = gA, then Σ k^m a_k = 0 for m = 0..3
+    C = np.vstack([zexp_z(0.0, tcut, t0) ** k] + [k ** m for m in range(ZEXP_N_SUM_RULES)])
+    rhs = np.zeros(ZEXP_N_SUM_RULES + 1)
+    rhs[0] = gA
+
+    free_idx = np.arange(1, n + 1)
+    fixed_idx = np.concatenate([[0], np.arange(n + 1, kmax + 1)])
+    a = np.zeros(kmax + 1)
+    a[free_idx] = free
+    a[fixed_idx] = np.linalg.solve(C[:, fixed_idx], rhs - C[:, free_idx] @ free)
+    return a
+
+
+def zexp_affine_map(n_free: int, gA: float = 1.267, tcut: float = ZEXP_TCUT, t0: float = ZEXP_T0):
+    """(a0, N) with a = a0 + N @ free for every free vector (the constraints are linear)."""
+    a0 = zexp_coefficients(np.zeros(n_free), gA, tcut, t0)
+    N = np.column_stack([zexp_coefficients(e, gA, tcut, t0) - a0 for e in np.eye(n_free)])
+    return a0, N
+
+
+@register_axial_ff("zexp")
+def axial_zexp(Q2, coeffs: tuple = (), tcut: float = ZEXP_TCUT, t0: float = ZEXP_T0):
+    """FA from the full coefficient list a_0..a_kmax (e.g. from zexp_coefficients)."""
+    return np.polynomial.polynomial.polyval(zexp_z(Q2, tcut, t0), np.asarray(coeffs, dtype=float))
+
+
+def dlnGD_dMV2(Q2, MV2: float):
+    """d ln G_D / d MV2, for the dipole-scaled providers."""
+    Q2 = np.asarray(Q2, dtype=float)
+    return 2.0 * (Q2 / (MV2 * MV2)) / (1.0 + Q2 / MV2)
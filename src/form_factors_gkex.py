@@ -51,9 +51,8 @@ def _qtilde2(Q2: float, LambdaD: float, LambdaQCD: float) -> float:
     \tilde{Q}^2 = Q^2 * ln[(LambdaD^2 + Q^2)/LambdaQCD^2] / ln[LambdaD^2/LambdaQCD^2]
     Eq. (7) bottom line in Lomon 2002 paper.  (We use positive Q2 = |Q^2|.)
     """
-    # protect logs at Q2=0
-    if Q2 <= 0.0:
-        return 0.0
+    # protect logs at Q2=0 (Q2<=0 -> 0); np.maximum keeps it array-safe
+    Q2 = np.maximum(Q2, 0.0)
     num = np.log((LambdaD**2 + Q2) / (LambdaQCD**2))
     den = np.log((LambdaD**2) / (LambdaQCD**2))
     return Q2 * (num / den)
@@ -82,9 +81,8 @@ def _F1_phi(Q2: float, Lambda1: float, Lambda2: float, LambdaD: float, LambdaQCD
     F1^phi(Q^2) = F1^alpha(Q^2) * (Q^2/(Lambda1^2 + Q^2))^{1.5}, with F1^phi(0)=0
     Eq. (7) (third line) in Lomon 2002.
     """
-    if Q2 <= 0.0:
-        return 0.0
     base = _F1_alpha(Q2, Lambda1, Lambda2, LambdaD, LambdaQCD)
+    Q2 = np.maximum(Q2, 0.0)  # Q2<=0 -> 0, array-safe
     return base * (Q2 / (Lambda1**2 + Q2))**1.5
 
 
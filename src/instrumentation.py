@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 22:10:26 2026
+
+@author: User
+"""
+
+# src/instrumentation.py
+# Opt-in counters and stage timers for the cross-section and folding code.
+#
+# Disabled by default: instrumented code only checks the module flag ENABLED
+# (tic() returns 0.0 and toc()/count() return at once), so the cost when off is
+# a global lookup per call. Usage:
+#
+#   with instrumented() as rep:
+#       flux_folded_binned_xsec(...)
+#   print(format_report(rep.report()))
+#
+# Stage names are dotted ("fold.kinematics", "xsec.vector_ff"); times of nested
+# stages are also included in their parents (e.g. "xsec.*" inside "fold.xsec").
+from __future__ import annotations
+
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+ENABLED = False
+
+_counts: dict[str, int] = defaultdict(int)
+_times: dict[str, float] = defaultdict(float)
+_calls: dict[str, int] = defaultdict(int)
+
+
+def enable(reset_stats: bool = True) -> None:
+    global ENABLED
+    if reset_stats:
+        reset()
+    ENABLED = True
+
+
+def disable() -> None:
+    global ENABLED
+    ENABLED = False
+
+
+def reset() -> None:
+    _counts.clear()
+    _times.clear()
+    _calls.clear()
+
+
+def tic() -> float:
+    return time.perf_counter() if ENABLED else 0.0
+
+
+def toc(stage: str, t0: float) -> float:
+    """Adds the time since t0 (from tic) to stage; returns the new tic, so stages can be chained."""
+    if not ENABLED:
+        return 0.0
+    t = time.perf_counter()
+    _times[stage] += t - t0
+    _calls[stage] += 1
+    return t
+
+
+def count(name: str, n: int = 1) -> None:
+    if ENABLED:
+        _counts[name] += int(n)
+
+
+def report() -> dict:
+    """{"counts": {name: n}, "stages": {stage: {"time_s", "calls"}}} of what was recorded."""
+    return {
+        "counts": dict(sorted(_counts.items())),
+        "stages": {k: {"time_s": _times[k], "calls": _calls[k]} for k in sorted(_times)},
+    }
+
+
+def format_report(rep: dict) -> str:
+    lines = [f"{'etapa':28s} {'tiempo [ms]':>12s} {'llamadas':>10s}"]
+    for k, v in rep["stages"].items():
+        lines.append(f"{k:28s} {1e3 * v['time_s']:12.3f} {v['calls']:10d}")
+    lines.append(f"{'contador':28s} {'n':>12s}")
+    for k, n in rep["counts"].items():
+        lines.append(f"{k:28s} {n:12d}")
+    return "\n".join(lines)
+
+
+class _Recorder:
+    def __init__(self):
+        self._report = None
+
+    def report(self) -> dict:
+        return report() if self._report is None else self._report
+
+
+@contextmanager
+def instrumented(reset_stats: bool = True):
+    """Enables instrumentation inside the block; rep.report() has the result (also after exit)."""
+    was = ENABLED
+    enable(reset_stats)
+    rec = _Recorder()
+    try:
+        yield rec
+    finally:
+        rec._report = report()
+        if not was:
+            disable()
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 22:41:52 2026
+
+@author: User
+"""
+
+# src/minerva/batch.py
+# Flux-folded MINERvA predictions for many parameter sets at once.
+#
+# dσ/dQ² = Σ_k c_k(Eν, Q²) m_k(FA, F1V, xiF2V) and the form factors depend on
+# Q² only. Every fold (flux-point trapezoid or Eν quadrature) evaluates the
+# cross section on a Q² grid shared by all Eν nodes, so the kinematics, cuts
+# and Eν integral can be done once for the LS coefficients:
+#
+#   C_k[bin, q] = w_q / (Φ ΔQ²) Σ_E w_E φ(E) acc(E, Q²_q) c_k(E, Q²_q)
+#
+# and the prediction of a parameter set is Σ_{q,k} C_k[bin, q] m_k[bin, q].
+# Vector form factors are evaluated once per (model, MV2) group, FA once per MA.
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from ccqe_hydrogen_xsec import N_LS_TERMS, F1V_xiF2V_array, _FA_dipole, ls_coefficients, ls_monomials
+from form_factors import vector_ff_provider
+from minerva.flux_folding import (
+    accepted_energy_interval,
+    energy_quadrature,
+    flux_shape,
+    muon_kinematics_array,
+    passes_minos_cuts_array,
+)
+
+# default memory budget for the chunked temporaries [bytes]
+MEMORY_BUDGET = 256 * 2**20
+
+
+@dataclass(frozen=True)
+class FoldedCoefficients:
+    q2_grid: np.ndarray   # (nbins, nQ2)
+    C: np.ndarray         # (nbins, nQ2, N_LS_TERMS), weights and normalisation included
+
+
+def _as_param_list(params) -> list[dict]:
+    """List of dicts, or a dict of equal-length sequences (e.g. {"MA": [...], "vector_ff": "gkex"})."""
+    if isinstance(params, dict):
+        n = max((len(v) for v in params.values() if np.ndim(v) == 1), default=1)
+        return [{k: (v[i] if np.ndim(v) == 1 else v) for k, v in params.items()} for i in range(n)]
+    return [dict(p) for p in params]
+
+
+def _trapezoid_weights(x: np.ndarray) -> np.ndarray:
+    """w with Σ w f = np.trapezoid(f, x) along the last axis of x."""
+    dx = np.diff(x, axis=-1)
+    w = np.zeros_like(x)
+    w[..., :-1] += 0.5 * dx
+    w[..., 1:] += 0.5 * dx
+    return w
+
+
+def folded_ls_coefficients(
+    q2_low: np.ndarray,
+    q2_high: np.ndarray,
+    flux_E: np.ndarray,
+    flux_phi: np.ndarray,
+    nQ2: int = 80,
+    Ev_max: float = 20.0,
+    nE: int | None = None,
+    flux_kind: str = "linear",
+    memory_budget: int = MEMORY_BUDGET,
+) -> FoldedCoefficients:
+    """
+    Kinematics, cuts and the Eν integral of the LS coefficients, with the same
+    rules as flux_folded_binned_xsec (nE=None: trapezoid over the flux points;
+    nE=int: Eν quadrature). Temporaries are chunked over Eν (trapezoid) or bins
+    (quadrature) to stay within memory_budget bytes.
+    """
+    q2_low = np.asarray(q2_low, dtype=float)
+    q2_high = np.asarray(q2_high, dtype=float)
+    nbins = len(q2_low)
+    t = np.linspace(0.0, 1.0, nQ2)
+    q2_grid = q2_low[:, None] + (q2_high - q2_low)[:, None] * t[None, :]     # (nbins, nQ2)
+    w_q = _trapezoid_weights(q2_grid)
+
+    shape = flux_shape(flux_E, flux_phi, kind=flux_kind if nE is not None else "linear", Ev_max=Ev_max)
+    C = np.zeros((nbins, nQ2, N_LS_TERMS))
+    bytes_per_point = 8 * (2 * N_LS_TERMS + 8)
+
+    if nE is None:
+        flux_E = np.asarray(flux_E, dtype=float)
+        flux_phi = np.asarray(flux_phi, dtype=float)
+        m = (flux_E > 0.0) & (flux_E < Ev_max) & np.isfinite(flux_phi) & (flux_phi > 0.0)
+        E, phi = flux_E[m], flux_phi[m]
+        w_E = _trapezoid_weights(E) * phi
+        step = max(1, int(memory_budget // (bytes_per_point * nbins * nQ2)))
+        for s in range(0, len(E), step):
+            Ev = E[s:s + step][None, :, None]
+            Q2 = q2_grid[:, None, :]
+            E_mu, cos_th = muon_kinematics_array(Ev, Q2)
+            acc = passes_minos_cuts_array(E_mu, cos_th)
+            c = ls_coefficients(Ev, Q2)                                      # (nbins, nE, nQ2, 6)
+            C += np.einsum("e,beq,beqk->bqk", w_E[s:s + step], acc, c)
+    else:
+        step = max(1, int(memory_budget // (bytes_per_point * nQ2 * nE)))
+        for s in range(0, nbins, step):
+            Q2 = q2_grid[s:s + step]
+            E_a, E_b = accepted_energy_interval(Q2, shape.edges[0], shape.edges[-1])
+            nodes, W = energy_quadrature(shape, E_a, E_b, nE)                # (b, nQ2, nE)
+            c = ls_coefficients(nodes, Q2[..., None])
+            C[s:s + step] = np.einsum("bqj,bqjk->bqk", W, c)
+
+    C *= (w_q / (shape.total * (q2_high - q2_low)[:, None]))[..., None]
+    return FoldedCoefficients(q2_grid=q2_grid, C=C)
+
+
+def _vector_key(p: dict) -> tuple[str, float | None]:
+    vector_ff = str(p.get("vector_ff", "gkex")).lower().strip()
+    uses_MV2 = "MV2" in vector_ff_provider(vector_ff).params
+    return vector_ff, (float(p.get("MV2", 0.71)) if uses_MV2 else None)
+
+
+def batch_predictions_from_coefficients(
+    folded: FoldedCoefficients,
+    params,
+    memory_budget: int = MEMORY_BUDGET,
+) -> np.ndarray:
+    """(n_params, nbins) <dσ/dQ²> [1e-38 cm²/GeV²] from folded LS coefficients."""
+    params_list = _as_param_list(params)
+    Q2 = folded.q2_grid
+    out = np.zeros((len(params_list), Q2.shape[0]))
+
+    vector_cache: dict = {}
+    axial_cache: dict = {}
+    step = max(1, int(memory_budget // (8 * N_LS_TERMS * Q2.size)))
+    for s in range(0, len(params_list), step):
+        chunk = params_list[s:s + step]
+        m = np.empty((len(chunk),) + Q2.shape + (N_LS_TERMS,))
+        for i, p in enumerate(chunk):
+            key = _vector_key(p)
+            if key not in vector_cache:
+                vector_cache[key] = F1V_xiF2V_array(Q2, 0.71 if key[1] is None else key[1], key[0])
+            MA = float(p.get("MA", 1.00))
+            if MA not in axial_cache:
+                axial_cache[MA] = _FA_dipole(Q2, MA)
+            m[i] = ls_monomials(axial_cache[MA], *vector_cache[key])
+        out[s:s + step] = np.einsum("bqk,pbqk->pb", folded.C, m)
+    return out
+
+
+def batch_predictions(
+    q2_low: np.ndarray,
+    q2_high: np.ndarray,
+    flux_E: np.ndarray,
+    flux_phi: np.ndarray,
+    params,
+    nQ2: int = 80,
+    Ev_max: float = 20.0,
+    nE: int | None = None,
+    flux_kind: str = "linear",
+    memory_budget: int = MEMORY_BUDGET,
+) -> np.ndarray:
+    """
+    flux_folded_binned_xsec with the LS model for every parameter set in params
+    (list of {"MA", "MV2", "vector_ff"} dicts, or a dict of sequences).
+    Returns (n_params, nbins).
+    """
+    folded = folded_ls_coefficients(
+        q2_low, q2_high, flux_E, flux_phi, nQ2=nQ2, Ev_max=Ev_max, nE=nE, flux_kind=flux_kind,
+        memory_budget=memory_budget,
+    )
+    return batch_predictions_from_coefficients(folded, params, memory_budget=memory_budget)
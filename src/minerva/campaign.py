@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 23:31:08 2026
+
+@author: User
+"""
+
+# src/minerva/campaign.py
+# Campaign files: datasets × models × parameter grids -> flux-folded predictions and χ².
+#
+# A campaign (TOML, or YAML if PyYAML is installed) looks like
+#
+#   name = "ma_scan"
+#   workers = 4
+#   [settings]                      # numerical settings (default: fold_defaults())
+#   nQ2 = 40
+#   [[datasets]]
+#   name = "minerva_hydrogen"       # paths relative to the project root,
+#   xsec = "refs/minerva_hydrogen/hydrogen_xsec.csv"   # omitted -> minerva.inputs defaults
+#   [[models]]
+#   vector_ff = "gkex"
+#   grid = { MA = [0.9, 1.0, 1.1] }
+#
+# Every (dataset, model, grid point) is one job, identified by a hash of its
+# inputs; its result is written to results/tables/<campaign>/<job_id>.json and
+# existing results are skipped, so an interrupted or extended campaign only
+# runs what is missing. collect_results writes summary.csv and predictions.csv.
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import tomllib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from minerva.convergence import fold_defaults
+from minerva.fitting import dsigma_dQ2_model
+from minerva.flux_folding import flux_folded_binned_xsec_multi
+from minerva.inputs import load_cov, load_flux, load_xsec_bins
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+TABLES_DIR = PROJECT_ROOT / "results" / "tables"
+
+MODEL_KEYS = ("MA", "MV2", "vector_ff")
+
+
+def load_campaign(path: Path) -> dict:
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() == ".toml":
+        camp = tomllib.loads(text)
+    elif path.suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as e:
+            raise ImportError("Para campañas YAML instala PyYAML (pip install pyyaml) o usa TOML.") from e
+        camp = yaml.safe_load(text)
+    else:
+        raise ValueError(f"Formato de campaña no soportado: {path.suffix} (usa .toml o .yaml).")
+
+    camp.setdefault("name", path.stem)
+    if not camp.get("datasets"):
+        camp["datasets"] = [{"name": "minerva_hydrogen"}]
+    if not camp.get("models"):
+        raise ValueError("La campaña no define ningún modelo ([[models]]).")
+    return camp
+
+
+def _resolve_path(p: str | None) -> str | None:
+    if p is None:
+        return None
+    p = Path(p)
+    return str(p if p.is_absolute() else PROJECT_ROOT / p)
+
+
+def expand_jobs(camp: dict) -> list[dict]:
+    """One job per (dataset, model, grid point): {"id", "dataset", "params", "settings"}."""
+    settings = dict(fold_defaults(), **camp.get("settings", {}))
+    jobs = []
+    for ds in camp["datasets"]:
+        dataset = {
+            "name": ds.get("name", "minerva_hydrogen"),
+            "xsec": ds.get("xsec"),
+            "cov": ds.get("cov"),
+            "flux": ds.get("flux"),
+        }
+        for model in camp["models"]:
+            base = {k: v for k, v in model.items() if k != "grid"}
+            grid = model.get("grid", {})
+            keys = list(grid)
+            for values in itertools.product(*(np.atleast_1d(grid[k]).tolist() for k in keys)):
+                params = dict(base, **dict(zip(keys, values)))
+                unknown = set(params) - set(MODEL_KEYS)
+                if unknown:
+                    raise ValueError(f"Parámetros de modelo desconocidos: {sorted(unknown)}")
+                job = {"dataset": dataset, "params": params, "settings": settings}
+                key = json.dumps(job, sort_keys=True)
+                job["id"] = hashlib.sha1(key.encode()).hexdigest()[:12]
+                jobs.append(job)
+    return jobs
+
+
+def job_path(camp: dict, job: dict, out_dir: Path = TABLES_DIR) -> Path:
+    return Path(out_dir) / camp["name"] / f"{job['id']}.json"
+
+
+def run_job(job: dict) -> dict:
+    """Prediction per bin and χ² of one job (process-pool friendly)."""
+    ds, params, settings = job["dataset"], job["params"], job["settings"]
+    q2_low, q2_high, data = load_xsec_bins(_resolve_path(ds["xsec"]))
+    cov = load_cov(len(data), _resolve_path(ds["cov"]))
+    flux_E, flux_phi = load_flux(_resolve_path(ds["flux"]))
+
+    pred = flux_folded_binned_xsec_multi(
+        q2_low, q2_high, flux_E, flux_phi,
+        lambda Ev, Q2, p: np.asarray(dsigma_dQ2_model(Ev, Q2, p))[..., None], params,
+        nQ2=int(settings["nQ2"]), Ev_max=float(settings["Ev_max"]),
+        nE=None if settings.get("nE") is None else int(settings["nE"]),
+    )[:, 0]
+    r = data - pred
+    chi2 = float(r @ np.linalg.solve(cov, r))
+    return dict(job, q2_low=q2_low.tolist(), q2_high=q2_high.tolist(), data=data.tolist(),
+                pred=np.asarray(pred).tolist(), chi2=chi2, ndof=int(len(data)))
+
+
+def run_campaign(
+    camp: dict,
+    out_dir: Path = TABLES_DIR,
+    workers: int | None = None,
+    force: bool = False,
+    log=print,
+) -> list[Path]:
+    """Runs the missing jobs of a campaign on a local process pool; returns the result files."""
+    jobs = expand_jobs(camp)
+    todo = [j for j in jobs if force or not job_path(camp, j, out_dir).exists()]
+    log(f"Campaña '{camp['name']}': {len(jobs)} trabajos, {len(jobs) - len(todo)} ya hechos, {len(todo)} por hacer.")
+
+    workers = int(workers or camp.get("workers", 1))
+    paths = []
+
+    def save(res: dict) -> None:
+        p = job_path(camp, res, out_dir)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(json.dumps(res, indent=2))
+        paths.append(p)
+        log(f"  {res['id']}  {res['dataset']['name']}  {res['params']}  chi2={res['chi2']:.3f}")
+
+    if workers <= 1:
+        for job in todo:
+            save(run_job(job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for fut in as_completed([pool.submit(run_job, job) for job in todo]):
+                save(fut.result())
+    return paths
+
+
+def collect_results(camp: dict, out_dir: Path = TABLES_DIR) -> tuple[Path, Path]:
+    """summary.csv (one row per job) and predictions.csv (one row per job and bin) of the campaign."""
+    rows, pred_rows = [], []
+    for job in expand_jobs(camp):
+        p = job_path(camp, job, out_dir)
+        if not p.exists():
+            continue
+        res = json.loads(p.read_text())
+        base = {"job_id": res["id"], "dataset": res["dataset"]["name"]}
+        base.update({k: res["params"].get(k) for k in MODEL_KEYS})
+        rows.append(dict(base, chi2=res["chi2"], ndof=res["ndof"], **{f"set_{k}": v for k, v in res["settings"].items()}))
+        for lo, hi, d, m in zip(res["q2_low"], res["q2_high"], res["data"], res["pred"]):
+            pred_rows.append(dict(base, Q2low=lo, Q2high=hi, data=d, model=m))
+
+    camp_dir = Path(out_dir) / camp["name"]
+    camp_dir.mkdir(parents=True, exist_ok=True)
+    summary, preds = camp_dir / "summary.csv", camp_dir / "predictions.csv"
+    pd.DataFrame(rows).to_csv(summary, index=False)
+    pd.DataFrame(pred_rows).to_csv(preds, index=False)
+    return summary, preds
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 21:05:33 2026
+
+@author: User
+"""
+
+# src/minerva/convergence.py
+# Convergence of the flux-folded MINERvA bins in the numerical settings.
+#
+# flux_folded_binned_xsec has three knobs: nQ2 (trapezoid points per bin),
+# nE (Eν quadrature order; None = trapezoid over the flux points) and Ev_max
+# (flux truncation). convergence_sweep evaluates every combination, measures
+# the per-bin relative change against a reference fold finer than all of
+# them, times each one, and recommend_settings picks the cheapest that meets
+# a tolerance. The recommendation is stored in FOLD_SETTINGS_PATH and read by
+# the apps and scripts through fold_defaults().
+from __future__ import annotations
+
+import itertools
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from minerva.fitting import dsigma_dQ2_model
+from minerva.flux_folding import flux_folded_binned_xsec_multi
+
+FOLD_SETTINGS_PATH = Path(__file__).resolve().parents[2] / "data" / "processed" / "minerva_hydrogen" / "fold_settings.json"
+
+# used when no recommendation has been stored yet (the historical defaults)
+DEFAULT_FOLD_SETTINGS = {"nQ2": 80, "nE": None, "Ev_max": 20.0}
+
+NQ2_VALUES = (10, 20, 30, 40, 60, 80, 100, 120, 140)
+NE_VALUES = (None, 3, 4, 6)
+EV_MAX_VALUES = (5.0, 10.0, 15.0, 20.0, 25.0, 30.0, 40.0)
+
+
+def _fold(q2_low, q2_high, flux_E, flux_phi, params, nQ2, nE, Ev_max) -> np.ndarray:
+    def func(Ev, Q2, p):
+        return np.asarray(dsigma_dQ2_model(Ev, Q2, p))[..., None]
+
+    return flux_folded_binned_xsec_multi(
+        q2_low, q2_high, flux_E, flux_phi, func, params, nQ2=nQ2, Ev_max=Ev_max, nE=nE
+    )[:, 0]
+
+
+def convergence_sweep(
+    q2_low: np.ndarray,
+    q2_high: np.ndarray,
+    flux_E: np.ndarray,
+    flux_phi: np.ndarray,
+    params: dict,
+    nQ2_values=NQ2_VALUES,
+    nE_values=NE_VALUES,
+    Ev_max_values=EV_MAX_VALUES,
+    repeat: int = 3,
+) -> dict:
+    """
+    Folds the bins for every (nQ2, nE, Ev_max) and compares with the reference
+    (2 × max nQ2, highest quadrature order, max Ev_max).
+
+    Returns {"reference": {...settings, "pred"}, "rows": [...]}, one row per
+    setting with "rel_change" (per bin), "max_rel_change" and "wall_time_s"
+    (best of `repeat`).
+    """
+    orders = [n for n in nE_values if n is not None]
+    ref_settings = {
+        "nQ2": 2 * int(max(nQ2_values)),
+        "nE": max(orders) if orders else None,
+        "Ev_max": float(max(Ev_max_values)),
+    }
+    ref = _fold(q2_low, q2_high, flux_E, flux_phi, params, **ref_settings)
+
+    rows = []
+    for nQ2, nE, Ev_max in itertools.product(nQ2_values, nE_values, Ev_max_values):
+        times = []
+        for _ in range(max(1, repeat)):
+            t0 = time.perf_counter()
+            pred = _fold(q2_low, q2_high, flux_E, flux_phi, params, int(nQ2), nE, float(Ev_max))
+            times.append(time.perf_counter() - t0)
+        rel = np.abs(pred - ref) / np.where(np.abs(ref) > 0, np.abs(ref), 1.0)
+        rows.append({
+            "nQ2": int(nQ2),
+            "nE": nE,
+            "Ev_max": float(Ev_max),
+            "rel_change": rel.tolist(),
+            "max_rel_change": float(rel.max()),
+            "wall_time_s": float(min(times)),
+        })
+
+    return {"reference": dict(ref_settings, pred=ref.tolist()), "params": dict(params), "rows": rows}
+
+
+def recommend_settings(sweep: dict, tol: float = 1e-3) -> dict:
+    """Cheapest (wall time) setting of a sweep whose max per-bin relative change is <= tol."""
+    ok = [r for r in sweep["rows"] if r["max_rel_change"] <= tol]
+    if not ok:
+        raise ValueError(f"Ningún ajuste numérico alcanza la tolerancia {tol:g}; amplía el barrido.")
+    best = min(ok, key=lambda r: r["wall_time_s"])
+    return {
+        "nQ2": best["nQ2"],
+        "nE": best["nE"],
+        "Ev_max": best["Ev_max"],
+        "tol": float(tol),
+        "max_rel_change": best["max_rel_change"],
+        "wall_time_s": best["wall_time_s"],
+        "reference": {k: v for k, v in sweep["reference"].items() if k != "pred"},
+        "params": sweep.get("params", {}),
+    }
+
+
+def save_fold_settings(settings: dict, path: Path = FOLD_SETTINGS_PATH) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(settings, indent=2))
+    return path
+
+
+def fold_defaults(path: Path = FOLD_SETTINGS_PATH) -> dict:
+    """{"nQ2", "nE", "Ev_max"} from the stored recommendation (DEFAULT_FOLD_SETTINGS if none)."""
+    path = Path(path)
+    if not path.exists():
+        return dict(DEFAULT_FOLD_SETTINGS)
+    d = json.loads(path.read_text())
+    return {
+        "nQ2": int(d.get("nQ2", DEFAULT_FOLD_SETTINGS["nQ2"])),
+        "nE": None if d.get("nE") is None else int(d["nE"]),
+        "Ev_max": float(d.get("Ev_max", DEFAULT_FOLD_SETTINGS["Ev_max"])),
+    }
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 09:14:36 2026
+
+@author: User
+"""
+
+# src/minerva/cut_histogram.py
+# Flux-folded cross section histogrammed in (Q², Eμ, θμ), for muon-cut scans.
+#
+# passes_minos_cuts fixes 1.5 < Eμ < 20 GeV and θμ < 20°; changing them means
+# refolding. Here the cross section is folded once, without cuts, into
+#
+#   H[q, e, t] = (1/Φ_tot) ∫ dE φ(E) ∫_{Q² cell q} dQ² dσ/dQ²(E, Q²)
+#                × [Eμ(E,Q²) in cell e] × [θμ(E,Q²) in cell t]
+#
+# (Eν cells with the exact flux integral, sampled at their midpoints; nsub
+# midpoints per Q² cell). At fixed Q², Eν fixes both Eμ and θμ, so every Q²
+# row is a curve in the (Eμ, θμ) plane and H is stored sparse (COO). The
+# prediction for a rectangular cut set is the sum of the (Eμ, θμ) sub-block,
+# cumulated in Q² and differenced at the bin edges (linear inside a Q² cell).
+# Cut values are snapped to the nearest histogram edges.
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from minerva.flux_folding import flux_moments, flux_shape, muon_kinematics_array
+
+# default memory budget for the chunked (Q², Eν) temporaries [bytes]
+MEMORY_BUDGET = 256 * 2**20
+
+# MINOS-like selection of passes_minos_cuts
+MINOS_CUTS = {"E_mu_min": 1.5, "E_mu_max": 20.0, "theta_min_deg": 0.0, "theta_max_deg": 20.0}
+
+
+@dataclass(frozen=True)
+class MuonHistogram:
+    q2_edges: np.ndarray      # (nq+1,) [GeV²]
+    emu_edges: np.ndarray     # (ne+1,) [GeV]
+    theta_edges: np.ndarray   # (nt+1,) [deg]
+    iq: np.ndarray            # (nnz,) cell indices of the non-empty cells
+    ie: np.ndarray
+    it: np.ndarray
+    w: np.ndarray             # (nnz,) cell contents [1e-38 cm²]
+
+
+def default_edges(q2_max: float = 6.0, Ev_max: float = 20.0, q2_bin_edges=None):
+    """(q2_edges, emu_edges, theta_edges): 0.01 GeV², 0.25 GeV and 1° cells (θ > 45° in one cell)."""
+    q2_edges = np.linspace(0.0, q2_max, int(round(q2_max / 0.01)) + 1)
+    if q2_bin_edges is not None:
+        q2_edges = np.union1d(q2_edges, np.asarray(q2_bin_edges, dtype=float))
+    emu_edges = np.arange(0.0, Ev_max + 0.25, 0.25)
+    theta_edges = np.concatenate([np.arange(0.0, 46.0, 1.0), [180.0]])
+    return q2_edges, emu_edges, theta_edges
+
+
+def fold_muon_histogram(
+    flux_E,
+    flux_phi,
+    dsigma_dQ2_callable,
+    params: dict,
+    q2_edges=None,
+    emu_edges=None,
+    theta_edges=None,
+    Ev_max: float = 20.0,
+    dE: float = 0.02,
+    nsub: int = 4,
+    flux_kind: str = "linear",
+    memory_budget: int = MEMORY_BUDGET,
+) -> MuonHistogram:
+    """
+    Folds dσ/dQ² (vectorized callable, as in flux_folded_binned_xsec) into the
+    (Q², Eμ, θμ) histogram; default edges from default_edges(Ev_max=Ev_max).
+    """
+    d_q2, d_emu, d_th = default_edges(Ev_max=Ev_max)
+    q2_edges = np.asarray(d_q2 if q2_edges is None else q2_edges, dtype=float)
+    emu_edges = np.asarray(d_emu if emu_edges is None else emu_edges, dtype=float)
+    theta_edges = np.asarray(d_th if theta_edges is None else theta_edges, dtype=float)
+    nq, ne, nt = len(q2_edges) - 1, len(emu_edges) - 1, len(theta_edges) - 1
+
+    shape = flux_shape(flux_E, flux_phi, kind=flux_kind, Ev_max=Ev_max)
+    E0, E1 = shape.edges[0], shape.edges[-1]
+    E_edges = np.union1d(np.linspace(E0, E1, max(int(np.ceil((E1 - E0) / dE)), 1) + 1), shape.edges)
+    E_mid = 0.5 * (E_edges[1:] + E_edges[:-1])
+    w_E = np.diff(flux_moments(shape, E_edges, [0])[:, 0]) / shape.total      # (nEcells,)
+
+    # nsub midpoints per Q² cell
+    u = (np.arange(nsub) + 0.5) / nsub
+    dq = np.diff(q2_edges)
+    q2_s = (q2_edges[:-1, None] + dq[:, None] * u).ravel()
+    w_q = np.repeat(dq / nsub, nsub)
+    iq_s = np.repeat(np.arange(nq), nsub)
+
+    H = np.zeros(nq * ne * nt)
+    chunk = max(1, int(memory_budget // (8 * 12 * len(E_mid))))
+    for s in range(0, len(q2_s), chunk):
+        Q2 = q2_s[s:s + chunk, None]
+        E_mu, cos_th = muon_kinematics_array(E_mid[None, :], Q2)
+        ok = np.isfinite(E_mu)
+        theta = np.degrees(np.arccos(np.clip(np.where(ok, cos_th, 1.0), -1.0, 1.0)))
+        ie = np.searchsorted(emu_edges, E_mu, side="right") - 1
+        it = np.searchsorted(theta_edges, theta, side="right") - 1
+        ok &= (ie >= 0) & (ie < ne) & (it >= 0) & (it < nt)
+
+        vals = np.asarray(dsigma_dQ2_callable(E_mid[None, :], Q2, params), dtype=float)
+        vals = np.broadcast_to(vals, ok.shape)
+        wgt = vals[ok] * (w_q[s:s + chunk, None] * w_E[None, :])[ok]
+        idx = (np.broadcast_to(iq_s[s:s + chunk, None], ok.shape)[ok] * ne + ie[ok]) * nt + it[ok]
+        H += np.bincount(idx, weights=wgt, minlength=H.size)
+
+    nz = np.flatnonzero(H)
+    iq, rem = np.divmod(nz, ne * nt)
+    ie, it = np.divmod(rem, nt)
+    return MuonHistogram(
+        q2_edges=q2_edges, emu_edges=emu_edges, theta_edges=theta_edges,
+        iq=iq.astype(np.int32), ie=ie.astype(np.int32), it=it.astype(np.int32), w=H[nz],
+    )
+
+
+def snap_cuts(hist: MuonHistogram, E_mu_min: float, E_mu_max: float,
+              theta_min_deg: float = 0.0, theta_max_deg: float = 20.0) -> dict:
+    """Cut values actually applied: each one moved to the nearest histogram edge."""
+    def nearest(edges, x):
+        return float(edges[np.argmin(np.abs(edges - x))])
+
+    return {
+        "E_mu_min": nearest(hist.emu_edges, E_mu_min),
+        "E_mu_max": nearest(hist.emu_edges, E_mu_max),
+        "theta_min_deg": nearest(hist.theta_edges, theta_min_deg),
+        "theta_max_deg": nearest(hist.theta_edges, theta_max_deg),
+    }
+
+
+def cut_prediction(
+    hist: MuonHistogram,
+    q2_low,
+    q2_high,
+    E_mu_min: float = MINOS_CUTS["E_mu_min"],
+    E_mu_max: float = MINOS_CUTS["E_mu_max"],
+    theta_min_deg: float = MINOS_CUTS["theta_min_deg"],
+    theta_max_deg: float = MINOS_CUTS["theta_max_deg"],
+) -> np.ndarray:
+    """Bin averages <dσ/dQ²> [1e-38 cm²/GeV²] with E_mu_min < Eμ < E_mu_max and theta_min < θμ < theta_max."""
+    c = snap_cuts(hist, E_mu_min, E_mu_max, theta_min_deg, theta_max_deg)
+    e0, e1 = np.searchsorted(hist.emu_edges, [c["E_mu_min"], c["E_mu_max"]])
+    t0, t1 = np.searchsorted(hist.theta_edges, [c["theta_min_deg"], c["theta_max_deg"]])
+    sel = (hist.ie >= e0) & (hist.ie < e1) & (hist.it >= t0) & (hist.it < t1)
+    per_q = np.bincount(hist.iq[sel], weights=hist.w[sel], minlength=len(hist.q2_edges) - 1)
+
+    q2_low = np.asarray(q2_low, dtype=float)
+    q2_high = np.asarray(q2_high, dtype=float)
+    if np.any(q2_low < hist.q2_edges[0]) or np.any(q2_high > hist.q2_edges[-1]):
+        raise ValueError(f"Bins fuera del histograma [{hist.q2_edges[0]:g}, {hist.q2_edges[-1]:g}] GeV².")
+    F = np.concatenate([[0.0], np.cumsum(per_q)])
+    return (np.interp(q2_high, hist.q2_edges, F) - np.interp(q2_low, hist.q2_edges, F)) / (q2_high - q2_low)
+
+
+def save_muon_histogram(hist: MuonHistogram, path: Path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(path, **{k: getattr(hist, k) for k in MuonHistogram.__dataclass_fields__})
+    return path
+
+
+def load_muon_histogram(path: Path) -> MuonHistogram:
+    with np.load(path) as z:
+        return MuonHistogram(**{k: z[k] for k in MuonHistogram.__dataclass_fields__})
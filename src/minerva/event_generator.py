@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 11:40:55 2026
+
+@author: User
+"""
+
+# src/minerva/event_generator.py
+# Flux-weighted CCQE event generator for \bar{nu}_mu p -> mu^+ n.
+#
+# The rate density  phi(E) * dσ/dQ2(E,Q2)  is tabulated once on a grid in
+# (E, u) with u = (Q2 - Q2_min(E)) / (Q2_max(E) - Q2_min(E)) in [0,1], so the
+# grid follows the physical Q2 range at each energy. The cells of that grid
+# go into a single Walker/Vose alias table; drawing an event is then O(1):
+# pick a cell, place E uniformly inside its flux bin and u with the linear
+# (trapezoid) density of the cell, and compute the muon/neutron kinematics
+# in vectorized batches.
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from minerva.flux_folding import MP, MN, M_MU, omega_of_Q2, q2_limits, muon_kinematics_array, flux_bin_edges
+
+EVENT_DTYPE = np.dtype([
+    ("Ev", "<f8"),        # GeV
+    ("Q2", "<f8"),        # GeV^2
+    ("E_mu", "<f8"),      # GeV
+    ("theta_mu", "<f8"),  # rad
+    ("p_n", "<f8"),       # GeV
+])
+
+# \bar{nu}_mu p -> mu^+ n threshold (proton at rest)
+EV_THRESHOLD = ((MN + M_MU) ** 2 - MP * MP) / (2.0 * MP)
+
+
+@dataclass(frozen=True)
+class SamplingTable:
+    E_lo: np.ndarray       # (nE,) lower edge of each flux bin
+    E_hi: np.ndarray       # (nE,) upper edge
+    u_nodes: np.ndarray    # (nU,) nodes in [0,1]
+    f_lo: np.ndarray       # (nE*(nU-1),) dσ/du at the lower node of each cell
+    f_hi: np.ndarray       # (nE*(nU-1),) dσ/du at the upper node of each cell
+    prob: np.ndarray       # alias acceptance probabilities
+    alias: np.ndarray      # alias indices
+    sigma_avg: float       # flux-averaged total σ [1e-38 cm²]
+    params: dict = field(default_factory=dict)
+
+
+def _alias_table(p: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Vose's alias method for a normalised probability vector p."""
+    n = len(p)
+    q = p * n
+    prob = np.ones(n, dtype=float)
+    alias = np.arange(n, dtype=np.int64)
+    small = [i for i in range(n) if q[i] < 1.0]
+    large = [i for i in range(n) if q[i] >= 1.0]
+    while small and large:
+        s = small.pop()
+        l = large.pop()
+        prob[s] = q[s]
+        alias[s] = l
+        q[l] = (q[l] + q[s]) - 1.0
+        (small if q[l] < 1.0 else large).append(l)
+    # leftovers are 1 up to rounding
+    return prob, alias
+
+
+def build_sampling_table(
+    flux_E: np.ndarray,
+    flux_phi: np.ndarray,
+    dsigma_dQ2_callable,
+    params: dict,
+    nU: int = 200,
+    Ev_max: float = 20.0,
+) -> SamplingTable:
+    """
+    Tabulates phi(E) ΔE dσ/du on the (flux bin, u) grid and builds the alias table.
+    dsigma_dQ2_callable(Ev, Q2, params) -> [1e-38 cm²/GeV²], as in flux_folded_binned_xsec.
+    """
+    flux_E = np.asarray(flux_E, dtype=float)
+    flux_phi = np.asarray(flux_phi, dtype=float)
+
+    m = (flux_E > 0.0) & (flux_E < Ev_max) & np.isfinite(flux_phi) & (flux_phi > 0.0)
+    E = flux_E[m]
+    phi = flux_phi[m]
+    if len(E) < 5:
+        raise ValueError("Flujo vacío/mal leído. Revisa el CSV del flujo y sus columnas.")
+
+    lo, hi = flux_bin_edges(E)
+    phi_tot = float(np.sum(phi * (hi - lo)))
+
+    keep = E > EV_THRESHOLD
+    E, phi, lo, hi = E[keep], phi[keep], np.maximum(lo[keep], EV_THRESHOLD), hi[keep]
+
+    u = np.linspace(0.0, 1.0, nU)
+    Q2_min, Q2_max = q2_limits(E)
+    span = Q2_max - Q2_min
+
+    # dσ/du = dσ/dQ2 * (Q2_max - Q2_min), one-off cost nE * nU evaluations
+    f = np.empty((len(E), nU), dtype=float)
+    for i, Ev in enumerate(E):
+        for k, uk in enumerate(u):
+            f[i, k] = float(dsigma_dQ2_callable(float(Ev), float(Q2_min[i] + uk * span[i]), params))
+    f = np.clip(f, 0.0, None) * span[:, None]
+
+    du = np.diff(u)
+    cell = 0.5 * (f[:, 1:] + f[:, :-1]) * du[None, :]
+    w = (phi * (hi - lo))[:, None] * cell
+    w_tot = float(w.sum())
+    if w_tot <= 0:
+        raise ValueError("Tasa de sucesos nula: revisa el flujo y los parámetros del modelo.")
+
+    prob, alias = _alias_table(w.ravel() / w_tot)
+
+    return SamplingTable(
+        E_lo=lo,
+        E_hi=hi,
+        u_nodes=u,
+        f_lo=f[:, :-1].ravel(),
+        f_hi=f[:, 1:].ravel(),
+        prob=prob,
+        alias=alias,
+        sigma_avg=w_tot / phi_tot,
+        params=dict(params),
+    )
+
+
+def _linear_in_cell(r: np.ndarray, f0: np.ndarray, f1: np.ndarray) -> np.ndarray:
+    """Inverse CDF on [0,1] for the density ∝ f0 + (f1 - f0) x."""
+    d = f1 - f0
+    flat = np.abs(d) <= 1e-9 * np.maximum(np.abs(f0) + np.abs(f1), 1e-300)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x = (np.sqrt(f0 * f0 + r * (f1 * f1 - f0 * f0)) - f0) / d
+    return np.clip(np.where(flat, r, x), 0.0, 1.0)
+
+
+def sample_events(table: SamplingTable, n: int, rng=None) -> np.ndarray:
+    """Draws n events as a structured array with EVENT_DTYPE."""
+    rng = np.random.default_rng(rng)
+    n_cells = len(table.prob)
+    n_u = len(table.u_nodes) - 1
+
+    k = rng.integers(0, n_cells, n)
+    k = np.where(rng.random(n) < table.prob[k], k, table.alias[k])
+    iE, iu = np.divmod(k, n_u)
+
+    Ev = table.E_lo[iE] + rng.random(n) * (table.E_hi[iE] - table.E_lo[iE])
+    x = _linear_in_cell(rng.random(n), table.f_lo[k], table.f_hi[k])
+    u = table.u_nodes[iu] + x * (table.u_nodes[iu + 1] - table.u_nodes[iu])
+
+    Q2_min, Q2_max = q2_limits(Ev)
+    Q2 = Q2_min + u * (Q2_max - Q2_min)
+
+    E_mu = Ev - omega_of_Q2(Q2)
+    _, cos_th = muon_kinematics_array(Ev, Q2)
+    # rounding at the Q2 edges can push |cos| just above 1
+    cos_th = np.where(np.isnan(cos_th), np.where(u > 0.5, -1.0, 1.0), cos_th)
+
+    E_n = MP + (Ev - E_mu)
+    out = np.empty(n, dtype=EVENT_DTYPE)
+    out["Ev"] = Ev
+    out["Q2"] = Q2
+    out["E_mu"] = E_mu
+    out["theta_mu"] = np.arccos(cos_th)
+    out["p_n"] = np.sqrt(np.maximum(E_n * E_n - MN * MN, 0.0))
+    return out
+
+
+def write_events(
+    path: Path,
+    table: SamplingTable,
+    n_events: int,
+    chunk_size: int = 1_000_000,
+    seed: int | None = None,
+) -> Path:
+    """
+    Streams n_events to a .npy file in chunks (memory-mapped, never all in RAM),
+    plus a JSON sidecar with the normalisation and generation settings.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=EVENT_DTYPE, shape=(n_events,))
+    for start in range(0, n_events, chunk_size):
+        stop = min(start + chunk_size, n_events)
+        out[start:stop] = sample_events(table, stop - start, rng)
+    out.flush()
+    del out
+
+    meta = {
+        "n_events": int(n_events),
+        "sigma_flux_avg_1e38_cm2": float(table.sigma_avg),
+        "params": table.params,
+        "n_flux_bins": int(len(table.E_lo)),
+        "nU": int(len(table.u_nodes)),
+        "Ev_range": [float(table.E_lo[0]), float(table.E_hi[-1])],
+        "seed": seed,
+        "fields": {"Ev": "GeV", "Q2": "GeV^2", "E_mu": "GeV", "theta_mu": "rad", "p_n": "GeV"},
+    }
+    path.with_suffix(".json").write_text(json.dumps(meta, indent=2))
+    return path
+
+
+def load_events(path: Path) -> tuple[np.ndarray, dict]:
+    """Memory-mapped events + metadata written by write_events."""
+    path = Path(path)
+    events = np.load(path, mmap_mode="r")
+    meta_path = path.with_suffix(".json")
+    meta = json.loads(meta_path.read_text()) if meta_path.exists() else {}
+    return events, meta
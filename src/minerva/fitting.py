@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 17:10:45 2026
+
+@author: User
+"""
+
+# src/minerva/fitting.py
+# χ² and its analytic gradient in (MA, MV2) for the MINERvA hydrogen bins.
+#
+# dσ/dQ² and its derivatives come from dsigma_dQ2_numubar_p_array(grad=True),
+# folded in one pass by flux_folded_binned_xsec(grad=True), so one folding
+# gives both χ² and ∇χ²:
+#
+#   χ² = rᵀ V⁻¹ r,   r = pred - data,   ∂χ²/∂θ_j = 2 (∂pred/∂θ_j)ᵀ V⁻¹ r
+from __future__ import annotations
+
+import numpy as np
+
+from ccqe_hydrogen_xsec import dsigma_dQ2_numubar_p_array
+from minerva.flux_folding import flux_folded_binned_xsec
+
+# order of the gradient components returned by dsigma_dQ2_numubar_p_array(grad=True)
+FIT_PARAMS = ("MA", "MV2")
+
+
+def _params(p: dict) -> tuple[float, float, str]:
+    return float(p.get("MA", 1.00)), float(p.get("MV2", 0.71)), str(p.get("vector_ff", "gkex"))
+
+
+def dsigma_dQ2_model(Ev, Q2, params: dict, grad: bool = False):
+    """Array callable for flux_folded_binned_xsec; grad=True adds d/d(MA, MV2)."""
+    MA, MV2, vector_ff = _params(params)
+    return dsigma_dQ2_numubar_p_array(Ev, Q2, MA=MA, MV2=MV2, vector_ff=vector_ff, grad=grad)
+
+
+def chi2_and_grad(data: np.ndarray, pred: np.ndarray, dpred: np.ndarray, cov: np.ndarray) -> tuple[float, np.ndarray]:
+    """χ² and ∂χ²/∂θ from predictions and their Jacobian dpred (nbins, n_par)."""
+    r = np.asarray(pred, dtype=float) - np.asarray(data, dtype=float)
+    Vr = np.linalg.solve(cov, r)
+    return float(r @ Vr), 2.0 * np.asarray(dpred, dtype=float).T @ Vr
+
+
+def folded_chi2_and_grad(
+    params: dict,
+    q2_low: np.ndarray,
+    q2_high: np.ndarray,
+    data: np.ndarray,
+    cov: np.ndarray,
+    flux_E: np.ndarray,
+    flux_phi: np.ndarray,
+    nQ2: int = 80,
+    Ev_max: float = 20.0,
+) -> tuple[float, np.ndarray, np.ndarray]:
+    """One folding -> (χ², ∂χ²/∂(MA, MV2), pred)."""
+    pred, dpred = flux_folded_binned_xsec(
+        q2_low, q2_high, flux_E, flux_phi, dsigma_dQ2_model, params, nQ2=nQ2, Ev_max=Ev_max, grad=True
+    )
+    chi2, g = chi2_and_grad(data, pred, dpred, cov)
+    return chi2, g, pred
+
+
+def fit_form_factor_masses(
+    q2_low: np.ndarray,
+    q2_high: np.ndarray,
+    data: np.ndarray,
+    cov: np.ndarray,
+    flux_E: np.ndarray,
+    flux_phi: np.ndarray,
+    params0: dict,
+    free: tuple[str, ...] = ("MA",),
+    bounds: dict | None = None,
+    nQ2: int = 80,
+    Ev_max: float = 20.0,
+) -> dict:
+    """
+    Minimises χ² in the free parameters (subset of FIT_PARAMS) with L-BFGS-B and
+    the analytic gradient. MV2 only matters for the vector models that take it
+    (dipole, Galster; not GKex).
+
+    Returns {"params", "chi2", "ndof", "n_eval", "success", "message"}.
+    """
+    from scipy.optimize import minimize
+
+    bounds = dict({"MA": (0.3, 3.0), "MV2": (0.2, 2.0)}, **(bounds or {}))
+    idx = [FIT_PARAMS.index(name) for name in free]
+    n_eval = 0
+
+    def objective(x):
+        nonlocal n_eval
+        n_eval += 1
+        p = dict(params0, **{name: float(v) for name, v in zip(free, x)})
+        chi2, g, _ = folded_chi2_and_grad(p, q2_low, q2_high, data, cov, flux_E, flux_phi, nQ2, Ev_max)
+        return chi2, g[idx]
+
+    x0 = [float(params0.get(name, 1.00 if name == "MA" else 0.71)) for name in free]
+    res = minimize(objective, x0, jac=True, method="L-BFGS-B", bounds=[bounds[name] for name in free])
+
+    return {
+        "params": dict(params0, **{name: float(v) for name, v in zip(free, res.x)}),
+        "chi2": float(res.fun),
+        "ndof": int(len(data) - len(free)),
+        "n_eval": n_eval,
+        "success": bool(res.success),
+        "message": str(res.message),
+    }
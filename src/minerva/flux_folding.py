@@ -7,8 +7,13 @@ Created on Wed Mar  4 18:02:35 2026
 
 # src/minerva/flux_folding.py
 from __future__ import annotations
+
+from dataclasses import dataclass
+
 import numpy as np
 
+import instrumentation as _inst
+
 # --- masses (GeV) ---
 MP = 0.9382720813
 MN = 0.9395654133
@@ -51,6 +56,54 @@ def passes_minos_cuts(E_mu: float | None, cos_th: float | None) -> bool:
     return (1.5 < E_mu < 20.0) and (theta < 20.0 * DEG)
 
 
+def q2_limits(Ev, Mp: float = MP, Mn: float = MN, m_mu: float = M_MU):
+    """
+    Physical range (Q2_min, Q2_max) for \bar{nu}_mu p -> mu^+ n with the proton at rest,
+    from the CM-frame kinematics. Vectorized in Ev; NaN below threshold.
+    """
+    Ev = np.asarray(Ev, dtype=float)
+    s = Mp * Mp + 2.0 * Mp * Ev
+    rs = np.sqrt(s)
+    Ek_cm = (s - Mp * Mp) / (2.0 * rs)
+    El_cm = (s + m_mu * m_mu - Mn * Mn) / (2.0 * rs)
+    above = rs > (Mn + m_mu)
+    pl_cm = np.sqrt(np.where(above, El_cm * El_cm - m_mu * m_mu, np.nan))
+    Q2_min = 2.0 * Ek_cm * (El_cm - pl_cm) - m_mu * m_mu
+    Q2_max = 2.0 * Ek_cm * (El_cm + pl_cm) - m_mu * m_mu
+    return Q2_min, Q2_max
+
+
+def muon_kinematics_array(Ev, Q2, Mp: float = MP, Mn: float = MN, m_mu: float = M_MU):
+    """
+    Vectorized muon_kinematics: arrays (E_mu, cos(theta_mu)) broadcast over (Ev, Q2).
+    Unphysical points are NaN instead of None.
+    """
+    Ev = np.asarray(Ev, dtype=float)
+    Q2 = np.asarray(Q2, dtype=float)
+    E_mu = Ev - omega_of_Q2(Q2, Mp=Mp, Mn=Mn)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p_mu = np.sqrt(np.where(E_mu > m_mu, E_mu * E_mu - m_mu * m_mu, np.nan))
+        cos_th = (Ev * E_mu - 0.5 * (Q2 + m_mu * m_mu)) / (Ev * p_mu)
+    bad = ~np.isfinite(cos_th) | (cos_th < -1.0) | (cos_th > 1.0)
+    return np.where(bad, np.nan, E_mu), np.where(bad, np.nan, cos_th)
+
+
+def passes_minos_cuts_array(E_mu, cos_th) -> np.ndarray:
+    """Vectorized passes_minos_cuts (NaN kinematics never pass)."""
+    E_mu = np.asarray(E_mu, dtype=float)
+    cos_th = np.asarray(cos_th, dtype=float)
+    with np.errstate(invalid="ignore"):
+        return (E_mu > 1.5) & (E_mu < 20.0) & (cos_th > np.cos(20.0 * DEG))
+
+
+def flux_bin_edges(E: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Bin edges for flux values given at bin centres (midpoints, mirrored at the ends)."""
+    mid = 0.5 * (E[1:] + E[:-1])
+    lo = np.concatenate([[E[0] - (mid[0] - E[0])], mid])
+    hi = np.concatenate([mid, [E[-1] + (E[-1] - mid[-1])]])
+    return lo, hi
+
+
 def flux_folded_binned_xsec(
     q2_low: np.ndarray,
     q2_high: np.ndarray,
@@ -60,14 +113,43 @@ def flux_folded_binned_xsec(
     params: dict,
     nQ2: int = 80,
     Ev_max: float = 20.0,
-) -> np.ndarray:
+    grad: bool = False,
+    nE: int | None = None,
+    flux_kind: str = "linear",
+    n_workers: int | None = None,
+    split: str = "bin",
+):
     """
     Flux-folded and cut-applied bin-averaged <dσ/dQ2>:
 
       pred_bin = (1/ΔQ2) * (1/Φ_tot) ∫ dE φ(E) ∫_{bin} dQ2 [dσ/dQ2(E,Q2)] * cuts
 
+    grad=True: returns (preds, dpreds) with dpreds[bin, j] the derivative wrt the
+    j-th model parameter. The callable is then evaluated once on the whole
+    (bin, E, Q2) grid as dsigma_dQ2_callable(E, Q2, params, grad=True) and must
+    return (values, gradients[..., n_par]) (e.g. dsigma_dQ2_numubar_p_array).
+
+    nE=None: the Eν integral is a trapezoid over the flux points (one cross-section
+    evaluation per flux point). nE=int: Eν quadrature with nE nodes per Q2 point
+    inside the accepted Eν range, integrated exactly against the flux taken as
+    piecewise linear (flux_kind="linear") or a histogram ("hist"); see
+    _fold_quadrature. The callable must then accept arrays.
+
+    n_workers > 1: process-pool backend (minerva.parallel), splitting by bins
+    (split="bin") or by chunks of flux points (split="energy", trapezoid rule,
+    vectorized callable). The callable must be picklable.
+
+    To fold once and evaluate several binnings, see cumulative_folded_xsec.
+
     NOTE: uses np.trapezoid (NumPy 2.x safe).
     """
+    if n_workers is not None and n_workers > 1:
+        from minerva.parallel import parallel_fold
+        return parallel_fold(
+            q2_low, q2_high, flux_E, flux_phi, dsigma_dQ2_callable, params, n_workers=n_workers, split=split,
+            nQ2=nQ2, Ev_max=Ev_max, grad=grad, nE=nE, flux_kind=flux_kind,
+        )
+
     # integration helper (NumPy 2.x)
     trap = np.trapezoid
 
@@ -84,7 +166,21 @@ def flux_folded_binned_xsec(
     if phi_tot <= 0:
         raise ValueError("Normalización de flujo <=0. Revisa el CSV del flujo.")
 
+    if grad or nE is not None:
+        if grad:
+            func = _grad_func(dsigma_dQ2_callable, params)
+        else:
+            def func(Ev, Q2):
+                return np.asarray(dsigma_dQ2_callable(Ev, Q2, params))[..., None]
+        if nE is None:
+            out = _fold_on_grid(q2_low, q2_high, E, phi, phi_tot, func, nQ2)
+        else:
+            shape = flux_shape(flux_E, flux_phi, kind=flux_kind, Ev_max=Ev_max)
+            out = _fold_quadrature(q2_low, q2_high, shape, func, nQ2, nE)
+        return (out[:, 0], out[:, 1:]) if grad else out[:, 0]
+
     preds = np.zeros(len(q2_low), dtype=float)
+    n_acc = 0
 
     for i, (lo, hi) in enumerate(zip(q2_low, q2_high)):
         lo = float(lo)
@@ -96,16 +192,423 @@ def flux_folded_binned_xsec(
             vals = np.zeros_like(q2_grid)
 
             for k, Q2 in enumerate(q2_grid):
+                t_inst = _inst.tic()
                 E_mu, cos_th = muon_kinematics(float(Ev), float(Q2))
+                t_inst = _inst.toc("fold.kinematics", t_inst)
                 if not passes_minos_cuts(E_mu, cos_th):
                     vals[k] = 0.0
+                    _inst.toc("fold.cuts", t_inst)
                 else:
+                    t_inst = _inst.toc("fold.cuts", t_inst)
+                    n_acc += 1
                     vals[k] = float(dsigma_dQ2_callable(float(Ev), float(Q2), params))
+                    _inst.toc("fold.xsec", t_inst)
 
+            t_inst = _inst.tic()
             int_Q2 = trap(vals, q2_grid)
             integrand_E[j] = w_flux * int_Q2
+            _inst.toc("fold.integration", t_inst)
 
         num = trap(integrand_E, E)
         preds[i] = (num / phi_tot) / (hi - lo)
 
-    return preds
\ No newline at end of file
+    if _inst.ENABLED:
+        n_pts = len(q2_low) * len(E) * nQ2
+        _inst.count("fold.points", n_pts)
+        _inst.count("fold.accepted", n_acc)
+        _inst.count("fold.rejected", n_pts - n_acc)
+    return preds
+
+
+def _fold_on_grid(q2_low, q2_high, E, phi, phi_tot, func, nQ2):
+    """
+    Vectorized fold of func(Ev, Q2) -> (..., n_out) over the (bin, E, Q2) grid,
+    with the same trapezoid rules as the loop in flux_folded_binned_xsec.
+    Returns (nbins, n_out).
+    """
+    trap = np.trapezoid
+    q2_low = np.asarray(q2_low, dtype=float)
+    q2_high = np.asarray(q2_high, dtype=float)
+
+    t = np.linspace(0.0, 1.0, nQ2)
+    q2_grid = q2_low[:, None] + (q2_high - q2_low)[:, None] * t[None, :]   # (nbins, nQ2)
+    Q2 = q2_grid[:, None, :]
+    Ev = E[None, :, None]
+
+    t_inst = _inst.tic()
+    E_mu, cos_th = muon_kinematics_array(Ev, Q2)
+    t_inst = _inst.toc("fold.kinematics", t_inst)
+    acc = passes_minos_cuts_array(E_mu, cos_th)
+    t_inst = _inst.toc("fold.cuts", t_inst)
+    vals = np.where(acc[..., None], func(Ev, Q2), 0.0)                    # (nbins, nE, nQ2, n_out)
+    t_inst = _inst.toc("fold.xsec", t_inst)
+
+    # Q2 trapezoid on each bin's grid, then E trapezoid weighted by the flux
+    int_Q2 = trap(vals, q2_grid[:, None, :, None], axis=-2)               # (nbins, nE, n_out)
+    num = trap(phi[None, :, None] * int_Q2, E, axis=-2)                   # (nbins, n_out)
+    _inst.toc("fold.integration", t_inst)
+    if _inst.ENABLED:
+        n_acc = int(np.count_nonzero(acc))
+        _inst.count("fold.points", acc.size)
+        _inst.count("fold.accepted", n_acc)
+        _inst.count("fold.rejected", acc.size - n_acc)
+    return num / phi_tot / (q2_high - q2_low)[:, None]
+
+
+def _grad_func(dsigma_dQ2_callable, params):
+    """func(Ev, Q2) -> (..., 1 + n_par): values and derivatives stacked, for the grid folds."""
+    def func(Ev, Q2):
+        vals, dvals = dsigma_dQ2_callable(Ev, Q2, params, grad=True)
+        return np.concatenate([np.asarray(vals)[..., None], dvals], axis=-1)
+    return func
+
+
+def flux_folded_binned_xsec_multi(
+    q2_low: np.ndarray,
+    q2_high: np.ndarray,
+    flux_E: np.ndarray,
+    flux_phi: np.ndarray,
+    dsigma_dQ2_callable,
+    params: dict,
+    nQ2: int = 80,
+    Ev_max: float = 20.0,
+    nE: int | None = None,
+    flux_kind: str = "linear",
+) -> np.ndarray:
+    """
+    flux_folded_binned_xsec for a vectorized callable returning several cross
+    sections at once, dsigma_dQ2_callable(E, Q2, params) -> (..., n_out)
+    (e.g. the fused ν/ν̄ kernel). Returns (nbins, n_out). nE / flux_kind as in
+    flux_folded_binned_xsec.
+
+    Every column shares one acceptance: the muon kinematics and MINOS cuts of
+    \\bar{ν}_μ p -> μ^+ n (muon_kinematics_array, accepted_energy_interval). For
+    the ν column of the fused kernel (ν_μ n -> μ^- p, Mp <-> Mn) this is a
+    same-kinematics approximation: Eμ shifts by ~(Mn² - Mp²)/M ≈ 2.6 MeV, which
+    moves the MINERvA bins by up to ~1.3e-3.
+    """
+    flux_E = np.asarray(flux_E, dtype=float)
+    flux_phi = np.asarray(flux_phi, dtype=float)
+
+    m = (flux_E > 0.0) & (flux_E < Ev_max) & np.isfinite(flux_phi) & (flux_phi > 0.0)
+    E = flux_E[m]
+    phi = flux_phi[m]
+    if len(E) < 5:
+        raise ValueError("Flujo vacío/mal leído. Revisa el CSV del flujo y sus columnas.")
+
+    phi_tot = np.trapezoid(phi, E)
+    if phi_tot <= 0:
+        raise ValueError("Normalización de flujo <=0. Revisa el CSV del flujo.")
+
+    def func(Ev, Q2):
+        return dsigma_dQ2_callable(Ev, Q2, params)
+
+    if nE is not None:
+        return _fold_quadrature(q2_low, q2_high, flux_shape(flux_E, flux_phi, flux_kind, Ev_max), func, nQ2, nE)
+    return _fold_on_grid(q2_low, q2_high, E, phi, phi_tot, func, nQ2)
+
+
+# -----------------------
+# Flux shapes and the Eν quadrature
+# -----------------------
+# At fixed Q2 the LS cross section is pref/E² × (quadratic in E), so
+# E² dσ/dQ2 is a low-order polynomial in E. _fold_quadrature evaluates dσ/dQ2
+# at nE Chebyshev-Lobatto nodes inside the accepted Eν interval of every Q2
+# point, interpolates E² dσ/dQ2 with a polynomial, and integrates φ(E)/E² ×
+# polynomial exactly against the flux shape (closed-form moments). For LS
+# models nE >= 3 is exact in Eν; the only remaining difference to the flux-point
+# trapezoid is that rule's own error at the cut edges.
+@dataclass(frozen=True)
+class FluxShape:
+    edges: np.ndarray   # (n+1,) segment boundaries [GeV]
+    alpha: np.ndarray   # (n,) φ(E) = alpha + beta E on each segment
+    beta: np.ndarray    # (n,)
+    total: float        # ∫ φ dE
+    kind: str
+
+
+def flux_shape(flux_E, flux_phi, kind: str = "linear", Ev_max: float = 20.0) -> FluxShape:
+    """
+    kind="linear": φ piecewise linear between the flux points (∫φ = trapezoid).
+    kind="hist"  : φ constant in bins centred on the flux points (flux_bin_edges).
+    Same point selection as flux_folded_binned_xsec.
+    """
+    flux_E = np.asarray(flux_E, dtype=float)
+    flux_phi = np.asarray(flux_phi, dtype=float)
+    m = (flux_E > 0.0) & (flux_E < Ev_max) & np.isfinite(flux_phi) & (flux_phi > 0.0)
+    E = flux_E[m]
+    phi = flux_phi[m]
+    if len(E) < 5:
+        raise ValueError("Flujo vacío/mal leído. Revisa el CSV del flujo y sus columnas.")
+
+    if kind == "linear":
+        dE = np.diff(E)
+        # repeated energies (rounding in the CSV) are zero-width segments: a step in φ
+        beta = np.divide(np.diff(phi), dE, out=np.zeros_like(dE), where=dE > 0)
+        alpha = phi[:-1] - beta * E[:-1]
+        return FluxShape(edges=E, alpha=alpha, beta=beta, total=float(np.trapezoid(phi, E)), kind=kind)
+    if kind == "hist":
+        lo, hi = flux_bin_edges(E)
+        lo[0] = max(lo[0], 0.5 * E[0])  # keep E > 0 for the E^-2 moments
+        edges = np.concatenate([lo, [hi[-1]]])
+        return FluxShape(edges=edges, alpha=phi.copy(), beta=np.zeros_like(phi),
+                         total=float(np.sum(phi * (hi - lo))), kind=kind)
+    raise ValueError("flux_kind debe ser 'linear' o 'hist'.")
+
+
+def _antideriv_power(E, p: int):
+    """∫ E^p dE."""
+    return np.log(E) if p == -1 else E ** (p + 1) / (p + 1)
+
+
+def flux_moments(shape: FluxShape, x, powers) -> np.ndarray:
+    """Cumulative ∫_{E_min}^{x} φ(E) E^p dE for each p in powers, shape x.shape + (len(powers),)."""
+    edges = shape.edges
+    n = len(edges) - 1
+    x = np.clip(np.asarray(x, dtype=float), edges[0], edges[-1])
+    s = np.clip(np.searchsorted(edges, x, side="right") - 1, 0, n - 1)
+    a, b = shape.alpha[s], shape.beta[s]
+
+    out = np.empty(x.shape + (len(powers),), dtype=float)
+    for i, p in enumerate(powers):
+        P0 = _antideriv_power(edges, p)
+        P1 = _antideriv_power(edges, p + 1)
+        seg = shape.alpha * (P0[1:] - P0[:-1]) + shape.beta * (P1[1:] - P1[:-1])
+        C = np.concatenate([[0.0], np.cumsum(seg)])
+        out[..., i] = C[s] + a * (_antideriv_power(x, p) - P0[s]) + b * (_antideriv_power(x, p + 1) - P1[s])
+    return out
+
+
+def accepted_energy_interval(Q2, E_lo: float, E_hi: float, n_iter: int = 60):
+    """
+    [E_a, E_b] of neutrino energies passing passes_minos_cuts at fixed Q2, within
+    [E_lo, E_hi]. E_mu = Ev - omega gives the E_mu bounds directly; the angle
+    cut is monotonic in Ev at fixed Q2 (forward as Ev grows) and is bisected.
+    Empty intervals have E_b <= E_a.
+    """
+    Q2 = np.asarray(Q2, dtype=float)
+    w = omega_of_Q2(Q2)
+    a = np.maximum(E_lo, 1.5 + w)
+    b = np.minimum(E_hi, 20.0 + w)
+    cos_max = np.cos(20.0 * DEG)
+
+    def forward(Ev):
+        _, cos_th = muon_kinematics_array(Ev, Q2)
+        with np.errstate(invalid="ignore"):
+            return cos_th > cos_max
+
+    ok_a = forward(a)
+    ok_b = forward(b)
+    lo, hi = a.copy(), b.copy()
+    for _ in range(n_iter):
+        mid = 0.5 * (lo + hi)
+        ok = forward(mid)
+        hi = np.where(ok, mid, hi)
+        lo = np.where(ok, lo, mid)
+    E_a = np.where(ok_a, a, hi)
+    return E_a, np.where(ok_b, b, E_a)
+
+
+def energy_quadrature(shape: FluxShape, E_a, E_b, nE: int):
+    """
+    Nodes (..., nE) in [E_a, E_b] and weights W such that
+    Σ_j W_j f(E_j) = ∫_{E_a}^{E_b} φ(E) f(E) dE exactly when E² f(E) is a
+    polynomial of degree < nE.
+    """
+    if nE < 3:
+        raise ValueError("nE >= 3 (E² dσ/dQ2 es cuadrático en Eν).")
+    E_a = np.asarray(E_a, dtype=float)
+    E_b = np.asarray(E_b, dtype=float)
+    empty = ~(E_b > E_a)
+    E_b = np.where(empty, E_a + 1.0, E_b)
+
+    u = 0.5 * (1.0 - np.cos(np.pi * np.arange(nE) / (nE - 1)))
+    nodes = E_a[..., None] + (E_b - E_a)[..., None] * u
+
+    # monomials in y = E / E_b (well conditioned on [E_a/E_b, 1])
+    k = np.arange(nE)
+    powers = k - 2
+    mom = flux_moments(shape, E_b, powers) - flux_moments(shape, E_a, powers)
+    mom = mom / E_b[..., None] ** k
+    Vt = np.swapaxes((nodes / E_b[..., None])[..., :, None] ** k, -1, -2)   # (..., k, j)
+    w = np.linalg.solve(Vt, mom[..., None])[..., 0]
+    W = np.where(empty[..., None], 0.0, w * nodes * nodes)
+    return nodes, W
+
+
+def _fold_quadrature(q2_low, q2_high, shape: FluxShape, func, nQ2: int, nE: int):
+    """
+    Fold of func(Ev, Q2) -> (..., n_out) with the Eν quadrature: nbins × nQ2 × nE
+    evaluations (trapezoid in Q2 as in the loop). Returns (nbins, n_out).
+    """
+    q2_low = np.asarray(q2_low, dtype=float)
+    q2_high = np.asarray(q2_high, dtype=float)
+
+    t = np.linspace(0.0, 1.0, nQ2)
+    q2_grid = q2_low[:, None] + (q2_high - q2_low)[:, None] * t[None, :]   # (nbins, nQ2)
+
+    t_inst = _inst.tic()
+    E_a, E_b = accepted_energy_interval(q2_grid, shape.edges[0], shape.edges[-1])
+    t_inst = _inst.toc("fold.cuts", t_inst)
+    nodes, W = energy_quadrature(shape, E_a, E_b, nE)                      # (nbins, nQ2, nE)
+    t_inst = _inst.toc("fold.quadrature_weights", t_inst)
+
+    vals = np.asarray(func(nodes, q2_grid[..., None]))                     # (nbins, nQ2, nE, n_out)
+    t_inst = _inst.toc("fold.xsec", t_inst)
+    int_E = np.einsum("bqj,bqjo->bqo", W, vals)
+    num = np.trapezoid(int_E, q2_grid[..., None], axis=1)
+    _inst.toc("fold.integration", t_inst)
+    if _inst.ENABLED:
+        n_acc = int(np.count_nonzero(E_b > E_a))
+        _inst.count("fold.points", E_a.size)
+        _inst.count("fold.accepted", n_acc)
+        _inst.count("fold.rejected", E_a.size - n_acc)
+        _inst.count("fold.xsec_evals", nodes.size)
+    return num / shape.total / (q2_high - q2_low)[:, None]
+
+
+# -----------------------
+# Cumulative fold (rebinnable prediction)
+# -----------------------
+# The flux-averaged, cut-applied density
+#
+#   f(Q2) = (1/Φ_tot) ∫ dE φ(E) [dσ/dQ2(E,Q2)] * cuts
+#
+# is evaluated once on a fine Q2 grid and integrated cumulatively,
+# F(Q2) = ∫_{Q2_0}^{Q2} f. The bin average of any binning is then
+# (F(hi) - F(lo)) / (hi - lo), with f linear between the grid nodes (the
+# trapezoid rule of the per-bin folds). Adjacent bins share the edge value
+# instead of refolding it. On q2_grid=bin_q2_grid(q2_low, q2_high, nQ2) each
+# bin is the trapezoid on its own linspace and rebin_cumulative reproduces
+# flux_folded_binned_xsec to round-off. On the default grid (2001 uniform nodes
+# on [0, 10] GeV² plus the MINERvA edges) the 15 bins agree with a
+# 400-point-per-bin fold to 2.7e-5 with the Eν quadrature (nE=3) and to 2.1e-4
+# with the trapezoid over the flux points (nE=None).
+@dataclass(frozen=True)
+class CumulativeFold:
+    q2: np.ndarray        # (n,) Q2 nodes [GeV²]
+    density: np.ndarray   # (n, n_out) f(Q2) at the nodes
+    cum: np.ndarray       # (n, n_out) F(Q2) at the nodes
+    grad: bool            # n_out = 1 + n_par (values, derivatives) if True
+
+
+def cumulative_folded_xsec(
+    flux_E: np.ndarray,
+    flux_phi: np.ndarray,
+    dsigma_dQ2_callable,
+    params: dict,
+    q2_min: float = 0.0,
+    q2_max: float = 10.0,
+    nQ2: int = 2001,
+    edges=None,
+    q2_grid=None,
+    Ev_max: float = 20.0,
+    grad: bool = False,
+    nE: int | None = None,
+    flux_kind: str = "linear",
+) -> CumulativeFold:
+    """
+    Cumulative flux-folded integral on a fine Q2 grid; use rebin_cumulative for
+    the bin averages of any set of edges inside [q2_min, q2_max].
+
+    Grid: nQ2 uniform nodes on [q2_min, q2_max] plus the given bin edges, or
+    q2_grid (sorted, e.g. bin_q2_grid) as is. nE / flux_kind / grad as in flux_folded_binned_xsec
+    (vectorized callable): nE=None is the trapezoid over the flux points,
+    nE=int the Eν quadrature.
+    """
+    if q2_grid is None:
+        q2_grid = np.linspace(q2_min, q2_max, nQ2)
+        if edges is not None:
+            q2_grid = np.union1d(q2_grid, np.asarray(edges, dtype=float))
+    q2 = np.asarray(q2_grid, dtype=float)
+    if q2.ndim != 1 or len(q2) < 2 or np.any(np.diff(q2) <= 0):
+        raise ValueError("q2_grid debe ser creciente y tener al menos 2 nodos.")
+
+    if grad:
+        func = _grad_func(dsigma_dQ2_callable, params)
+    else:
+        def func(Ev, Q2):
+            return np.asarray(dsigma_dQ2_callable(Ev, Q2, params))[..., None]
+
+    if nE is None:
+        flux_E = np.asarray(flux_E, dtype=float)
+        flux_phi = np.asarray(flux_phi, dtype=float)
+        m = (flux_E > 0.0) & (flux_E < Ev_max) & np.isfinite(flux_phi) & (flux_phi > 0.0)
+        E = flux_E[m]
+        phi = flux_phi[m]
+        if len(E) < 5:
+            raise ValueError("Flujo vacío/mal leído. Revisa el CSV del flujo y sus columnas.")
+        phi_tot = np.trapezoid(phi, E)
+        if phi_tot <= 0:
+            raise ValueError("Normalización de flujo <=0. Revisa el CSV del flujo.")
+
+        Ev = E[:, None]
+        Q2 = q2[None, :]
+        t_inst = _inst.tic()
+        E_mu, cos_th = muon_kinematics_array(Ev, Q2)
+        t_inst = _inst.toc("fold.kinematics", t_inst)
+        acc = passes_minos_cuts_array(E_mu, cos_th)
+        t_inst = _inst.toc("fold.cuts", t_inst)
+        vals = np.where(acc[..., None], func(Ev, Q2), 0.0)                 # (nE, nQ2, n_out)
+        t_inst = _inst.toc("fold.xsec", t_inst)
+        density = np.trapezoid(phi[:, None, None] * vals, E, axis=0) / phi_tot
+        n_pts, n_acc = acc.size, int(np.count_nonzero(acc))
+    else:
+        shape = flux_shape(flux_E, flux_phi, kind=flux_kind, Ev_max=Ev_max)
+        t_inst = _inst.tic()
+        E_a, E_b = accepted_energy_interval(q2, shape.edges[0], shape.edges[-1])
+        t_inst = _inst.toc("fold.cuts", t_inst)
+        nodes, W = energy_quadrature(shape, E_a, E_b, nE)                 # (nQ2, nE)
+        t_inst = _inst.toc("fold.quadrature_weights", t_inst)
+        vals = np.asarray(func(nodes, q2[:, None]))                       # (nQ2, nE, n_out)
+        t_inst = _inst.toc("fold.xsec", t_inst)
+        density = np.einsum("qj,qjo->qo", W, vals) / shape.total
+        n_pts, n_acc = E_a.size, int(np.count_nonzero(E_b > E_a))
+
+    h = np.diff(q2)[:, None]
+    cum = np.concatenate([np.zeros((1, density.shape[1])),
+                          np.cumsum(0.5 * h * (density[1:] + density[:-1]), axis=0)])
+    _inst.toc("fold.integration", t_inst)
+    if _inst.ENABLED:
+        _inst.count("fold.points", n_pts)
+        _inst.count("fold.accepted", n_acc)
+        _inst.count("fold.rejected", n_pts - n_acc)
+    return CumulativeFold(q2=q2, density=density, cum=cum, grad=grad)
+
+
+def bin_q2_grid(q2_low, q2_high, nQ2: int) -> np.ndarray:
+    """
+    Union of the per-bin linspace(lo, hi, nQ2) grids of flux_folded_binned_xsec
+    (shared edges once): as q2_grid, rebin_cumulative reproduces the per-bin fold.
+    """
+    t = np.linspace(0.0, 1.0, nQ2)
+    q2_low = np.asarray(q2_low, dtype=float)
+    q2_high = np.asarray(q2_high, dtype=float)
+    grid = q2_low[:, None] + (q2_high - q2_low)[:, None] * t[None, :]
+    grid[:, -1] = q2_high   # exact, so a shared edge is a single node
+    return np.unique(grid)
+
+
+def cumulative_at(cf: CumulativeFold, x) -> np.ndarray:
+    """F(x) with f linear between the nodes, shape x.shape + (n_out,)."""
+    x = np.asarray(x, dtype=float)
+    if np.any(x < cf.q2[0]) or np.any(x > cf.q2[-1]):
+        raise ValueError(f"Bordes fuera de la rejilla fina [{cf.q2[0]:g}, {cf.q2[-1]:g}] GeV².")
+    i = np.clip(np.searchsorted(cf.q2, x, side="right") - 1, 0, len(cf.q2) - 2)
+    h = (cf.q2[i + 1] - cf.q2[i])[..., None]
+    d = (x - cf.q2[i])[..., None]
+    f0, f1 = cf.density[i], cf.density[i + 1]
+    return cf.cum[i] + f0 * d + (f1 - f0) * d * d / (2.0 * h)
+
+
+def rebin_cumulative(cf: CumulativeFold, q2_low, q2_high):
+    """
+    Bin averages <dσ/dQ2> = (F(hi) - F(lo)) / (hi - lo); same return value as
+    flux_folded_binned_xsec (preds, or (preds, dpreds) if cf.grad).
+    """
+    q2_low = np.asarray(q2_low, dtype=float)
+    q2_high = np.asarray(q2_high, dtype=float)
+    if np.any(q2_high <= q2_low):
+        raise ValueError("Cada bin debe cumplir q2_high > q2_low (bin de anchura nula o invertido).")
+    out = (cumulative_at(cf, q2_high) - cumulative_at(cf, q2_low)) / (q2_high - q2_low)[:, None]
+    return (out[:, 0], out[:, 1:]) if cf.grad else out[:, 0]
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 11:26:03 2026
+
+@author: User
+"""
+
+# src/minerva/flux_response.py
+# Flux-bin response matrix of the folded prediction and analytic profiling of
+# flux-shape nuisances.
+#
+# The flux is φ(E) = Σ_k φ_k h_k(E) on fixed flux energies (h_k: hat functions
+# for flux_kind="linear", bin indicators for "hist"), so the folded
+# prediction is linear in the flux values up to the normalisation:
+#
+#   pred_b(φ) = (R φ)_b / (n · φ),   R[b, k] = (1/ΔQ²_b) ∫_b dQ² ∫ dE h_k acc dσ/dQ²,
+#                                    n_k = ∫ h_k dE
+#
+# Same rules as flux_folded_binned_xsec: nE=None is the trapezoid over the flux
+# points (R[b, k] = w_k ∫ acc dσ/dQ²(E_k) / ΔQ², n_k = w_k), nE=int the Eν
+# quadrature with the moments taken against each basis function. A new flux
+# shape on the same energies is then a matrix-vector product.
+#
+# Flux-shape nuisances: φ(θ) = φ0 (1 + Σ_j θ_j s_j(E)) with θ ~ N(0, diag σ²).
+# Linearising pred around θ, pred ≈ p + J δθ with
+#   J[:, j] = (R (φ0 s_j) - p (n · φ0 s_j)) / (n · φ(θ)),
+# the minimum of χ² = rᵀV⁻¹r + θᵀS⁻¹θ is a small linear solve; a few
+# Gauss-Newton steps absorb the curvature from the normalisation.
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from minerva.flux_folding import (
+    _antideriv_power,
+    accepted_energy_interval,
+    flux_bin_edges,
+    muon_kinematics_array,
+    passes_minos_cuts_array,
+)
+
+
+@dataclass(frozen=True)
+class FluxResponse:
+    E: np.ndarray      # (nflux,) flux energies the basis is built on [GeV]
+    R: np.ndarray      # (nbins, nflux) unnormalised response
+    norm: np.ndarray   # (nflux,) ∫ h_k dE
+    kind: str
+
+
+def _trapezoid_weights(x: np.ndarray) -> np.ndarray:
+    dx = np.diff(x)
+    w = np.zeros_like(x)
+    w[:-1] += 0.5 * dx
+    w[1:] += 0.5 * dx
+    return w
+
+
+def _power_integrals(lo, hi, powers) -> np.ndarray:
+    """∫_lo^hi E^p dE for each p, shape lo.shape + (len(powers),); zero where hi <= lo."""
+    ok = hi > lo
+    hi = np.where(ok, hi, 1.0)
+    lo = np.where(ok, lo, 1.0)
+    out = np.stack([_antideriv_power(hi, p) - _antideriv_power(lo, p) for p in powers], axis=-1)
+    return np.where(ok[..., None], out, 0.0)
+
+
+def _basis_moments(E: np.ndarray, kind: str, E_a, E_b, powers) -> np.ndarray:
+    """∫_{E_a}^{E_b} h_k(E) E^p dE, shape E_a.shape + (nflux, len(powers))."""
+    E_a = np.asarray(E_a, dtype=float)[..., None]
+    E_b = np.asarray(E_b, dtype=float)[..., None]
+    n = len(E)
+    if kind == "hist":
+        lo, hi = flux_bin_edges(E)
+        lo[0] = max(lo[0], 0.5 * E[0])  # as flux_shape: keep E > 0 for the E^-2 moments
+        return _power_integrals(np.maximum(E_a, lo), np.minimum(E_b, hi), powers)
+    if kind != "linear":
+        raise ValueError("flux_kind debe ser 'linear' o 'hist'.")
+
+    # segment s = [E_s, E_s+1] carries the falling half of h_s and the rising half of h_s+1
+    E0, E1 = E[:-1], E[1:]
+    dE = E1 - E0
+    P = _power_integrals(np.maximum(E_a, E0), np.minimum(E_b, E1), powers)              # (..., nseg, np)
+    P1 = _power_integrals(np.maximum(E_a, E0), np.minimum(E_b, E1), [p + 1 for p in powers])
+    inv = np.divide(1.0, dE, out=np.zeros_like(dE), where=dE > 0)[:, None]
+    fall = (E1[:, None] * P - P1) * inv
+    rise = (P1 - E0[:, None] * P) * inv
+    out = np.zeros(E_a.shape[:-1] + (n, len(powers)))
+    out[..., :-1, :] += fall
+    out[..., 1:, :] += rise
+    return out
+
+
+def flux_response_matrix(
+    q2_low,
+    q2_high,
+    flux_E,
+    dsigma_dQ2_callable,
+    params: dict,
+    nQ2: int = 80,
+    Ev_max: float = 20.0,
+    nE: int | None = None,
+    flux_kind: str = "linear",
+) -> FluxResponse:
+    """
+    Response of the binned <dσ/dQ²> to the flux values at the energies flux_E
+    (those in (0, Ev_max)); vectorized callable as in flux_folded_binned_xsec.
+    fold_flux_response(resp, phi) reproduces flux_folded_binned_xsec for a flux
+    that is positive at all of these energies.
+    """
+    q2_low = np.asarray(q2_low, dtype=float)
+    q2_high = np.asarray(q2_high, dtype=float)
+    flux_E = np.asarray(flux_E, dtype=float)
+    E = flux_E[(flux_E > 0.0) & (flux_E < Ev_max)]
+    if len(E) < 5:
+        raise ValueError("Flujo vacío/mal leído. Revisa el CSV del flujo y sus columnas.")
+
+    t = np.linspace(0.0, 1.0, nQ2)
+    q2_grid = q2_low[:, None] + (q2_high - q2_low)[:, None] * t[None, :]     # (nbins, nQ2)
+    dq = np.diff(q2_grid, axis=1)
+    w_q = np.zeros_like(q2_grid)
+    w_q[:, :-1] += 0.5 * dq
+    w_q[:, 1:] += 0.5 * dq
+    w_q /= (q2_high - q2_low)[:, None]
+
+    if nE is None:
+        Ev = E[None, :, None]
+        Q2 = q2_grid[:, None, :]
+        E_mu, cos_th = muon_kinematics_array(Ev, Q2)
+        acc = passes_minos_cuts_array(E_mu, cos_th)
+        vals = np.where(acc, np.asarray(dsigma_dQ2_callable(Ev, Q2, params)), 0.0)   # (nbins, nflux, nQ2)
+        norm = _trapezoid_weights(E)
+        R = np.einsum("bq,beq->be", w_q, vals) * norm
+        return FluxResponse(E=E, R=R, norm=norm, kind="linear")
+
+    if nE < 3:
+        raise ValueError("nE >= 3 (E² dσ/dQ2 es cuadrático en Eν).")
+    if flux_kind == "hist":
+        lo, hi = flux_bin_edges(E)
+        lo[0] = max(lo[0], 0.5 * E[0])
+        E_lo, E_hi, norm = lo[0], hi[-1], hi - lo
+    else:
+        E_lo, E_hi, norm = E[0], E[-1], _trapezoid_weights(E)
+
+    # nodes and Lagrange weights as in energy_quadrature, moments per basis function
+    E_a, E_b = accepted_energy_interval(q2_grid, E_lo, E_hi)
+    empty = ~(E_b > E_a)
+    E_b = np.where(empty, E_a + 1.0, E_b)
+    u = 0.5 * (1.0 - np.cos(np.pi * np.arange(nE) / (nE - 1)))
+    nodes = E_a[..., None] + (E_b - E_a)[..., None] * u                        # (nbins, nQ2, nE)
+    k = np.arange(nE)
+    mom = _basis_moments(E, flux_kind, E_a, E_b, list(k - 2))                  # (nbins, nQ2, nflux, nE)
+    mom = np.where(empty[..., None, None], 0.0, mom / E_b[..., None, None] ** k)
+    Vt = np.swapaxes((nodes / E_b[..., None])[..., :, None] ** k, -1, -2)     # (nbins, nQ2, k, j)
+    Vinv = np.linalg.inv(Vt)                                                  # w = Vt⁻¹ mom
+    W = np.einsum("bqjk,bqek->bqej", Vinv, mom) * (nodes * nodes)[:, :, None, :]
+
+    vals = np.asarray(dsigma_dQ2_callable(nodes, q2_grid[..., None], params))  # (nbins, nQ2, nE)
+    R = np.einsum("bq,bqej,bqj->be", w_q, W, vals)
+    return FluxResponse(E=E, R=R, norm=norm, kind=flux_kind)
+
+
+def fold_flux_response(resp: FluxResponse, flux_phi) -> np.ndarray:
+    """<dσ/dQ²> per bin for flux values at resp.E: R φ / (n · φ)."""
+    phi = np.asarray(flux_phi, dtype=float)
+    tot = resp.norm @ phi
+    if tot <= 0:
+        raise ValueError("Normalización de flujo <=0. Revisa el CSV del flujo.")
+    return resp.R @ phi / tot
+
+
+def energy_band_templates(E, band_edges) -> np.ndarray:
+    """(nbands, nflux) fractional shape templates: s_j(E) = 1 inside Eν band j."""
+    E = np.asarray(E, dtype=float)
+    band_edges = np.asarray(band_edges, dtype=float)
+    j = np.searchsorted(band_edges, E, side="right") - 1
+    return (j[None, :] == np.arange(len(band_edges) - 1)[:, None]).astype(float)
+
+
+def profile_flux_nuisances(
+    resp: FluxResponse,
+    flux_phi,
+    data,
+    cov,
+    templates,
+    sigma,
+    n_iter: int = 3,
+) -> dict:
+    """
+    χ² with the flux-shape nuisances φ = φ0 (1 + Σ_j θ_j s_j) profiled under the
+    priors θ_j ~ N(0, σ_j²). templates: (n_nuis, nflux); sigma: scalar or (n_nuis,).
+
+    Returns {"chi2" (profiled, prior term included), "chi2_nominal", "theta",
+    "theta_err" (from the profiled curvature), "pred", "pred_nominal"}.
+    """
+    phi0 = np.asarray(flux_phi, dtype=float)
+    data = np.asarray(data, dtype=float)
+    S = np.atleast_2d(np.asarray(templates, dtype=float)) * phi0[None, :]    # (n_nuis, nflux)
+    n_nuis = S.shape[0]
+    sig = np.broadcast_to(np.asarray(sigma, dtype=float), (n_nuis,))
+    Vinv = np.linalg.inv(cov)
+
+    def chi2_at(theta):
+        pred = fold_flux_response(resp, phi0 + theta @ S)
+        r = data - pred
+        return float(r @ Vinv @ r + np.sum((theta / sig) ** 2)), pred
+
+    pred_nominal = fold_flux_response(resp, phi0)
+    r0 = data - pred_nominal
+    theta = np.zeros(n_nuis)
+    H = np.diag(1.0 / sig**2)
+    for _ in range(max(int(n_iter), 1)):
+        phi = phi0 + theta @ S
+        tot = resp.norm @ phi
+        pred = resp.R @ phi / tot
+        J = (resp.R @ S.T - np.outer(pred, S @ resp.norm)) / tot               # (nbins, n_nuis)
+        H = J.T @ Vinv @ J + np.diag(1.0 / sig**2)
+        g = J.T @ Vinv @ (data - pred) - theta / sig**2
+        theta = theta + np.linalg.solve(H, g)
+
+    chi2, pred = chi2_at(theta)
+    return {
+        "chi2": chi2,
+        "chi2_nominal": float(r0 @ Vinv @ r0),
+        "theta": theta,
+        "theta_err": np.sqrt(np.diag(np.linalg.inv(H))),
+        "pred": pred,
+        "pred_nominal": pred_nominal,
+    }
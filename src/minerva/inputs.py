@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 11:02:17 2026
+
+@author: User
+"""
+
+# src/minerva/inputs.py
+# Readers for the MINERvA hydrogen release (bins + xsec, covariance, flux).
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REFS_DIR = Path(__file__).resolve().parents[2] / "refs" / "minerva_hydrogen"
+FLUX_CSV = "flux_rhc_numubar_nueconstrained.csv"
+
+# Typical MINERvA release: xsec numbers in 1e-38, cov in 1e-80 -> scale 1e-4
+COV_SCALE = 1e-4
+
+
+def find_col(df: pd.DataFrame, candidates: list[str]) -> str:
+    cols = list(df.columns)
+    strip_map = {c.strip(): c for c in cols}
+
+    # exact
+    for cand in candidates:
+        if cand in strip_map:
+            return strip_map[cand]
+
+    # exact lower
+    lower_exact = {c.strip().lower(): c for c in cols}
+    for cand in candidates:
+        cl = cand.strip().lower()
+        if cl in lower_exact:
+            return lower_exact[cl]
+
+    # substring
+    cols_low = [(c, c.strip().lower()) for c in cols]
+    for cand in candidates:
+        cl = cand.strip().lower()
+        for orig, low in cols_low:
+            if cl in low:
+                return orig
+
+    raise KeyError(f"No encuentro columnas {candidates}. Tengo: {list(df.columns)}")
+
+
+def pick_flux_col(df: pd.DataFrame) -> str:
+    for c in df.columns:
+        if c.strip().lower().startswith("flux("):
+            return c
+    return find_col(df, ["flux", "phi"])
+
+
+def read_cov_matrix(path: Path, n: int) -> np.ndarray:
+    V = pd.read_csv(path, header=None).to_numpy(dtype=float)
+
+    # common cases: extra index column/row
+    if V.shape == (n, n + 1):
+        V = V[:, 1:]
+    if V.shape == (n + 1, n + 1):
+        V = V[1:, 1:]
+    if V.shape != (n, n):
+        raise ValueError(f"Covarianza con forma {V.shape}, esperaba {(n, n)}. Revisa {Path(path).name}.")
+    return V
+
+
+def load_flux(path: Path | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """Returns (flux_E, flux_phi) from a flux CSV (default: the RHC numubar flux)."""
+    path = Path(path) if path is not None else REFS_DIR / FLUX_CSV
+    flux = pd.read_csv(path)
+    flux.columns = [c.strip() for c in flux.columns]
+    col_E = find_col(flux, ["Energy(GeV)", "Energy", "E", "enu"])
+    col_phi = pick_flux_col(flux)
+    return flux[col_E].to_numpy(float), flux[col_phi].to_numpy(float)
+
+
+def load_xsec_bins(path: Path | None = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Returns (q2_low, q2_high, data) from hydrogen_xsec.csv."""
+    path = Path(path) if path is not None else REFS_DIR / "hydrogen_xsec.csv"
+    xsec = pd.read_csv(path)
+    xsec.columns = [c.strip() for c in xsec.columns]
+    col_q2lo = find_col(xsec, ["Q2low", "Q2Low", "Q2_low"])
+    col_q2hi = find_col(xsec, ["Q2High", "Q2high", "Q2_hi", "Q2_high"])
+    col_xsec = find_col(xsec, ["xsec", "XSec", "dsigma", "dsigdq2", "dsigma_dQ2"])
+    return (
+        xsec[col_q2lo].to_numpy(float),
+        xsec[col_q2hi].to_numpy(float),
+        xsec[col_xsec].to_numpy(float),
+    )
+
+
+def load_cov(n: int, path: Path | None = None) -> np.ndarray:
+    """Total covariance in the same units as the xsec column (COV_SCALE applied)."""
+    path = Path(path) if path is not None else REFS_DIR / "cov_tot.csv"
+    return read_cov_matrix(path, n) * COV_SCALE
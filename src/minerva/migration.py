@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 20:15:04 2026
+
+@author: User
+"""
+
+# src/minerva/migration.py
+# Forward folding of truth-level predictions through a reco-vs-true migration matrix.
+#
+#   N_reco[r] = Σ_t M[r, t] N_true[t],   N = <dσ/dQ²> ΔQ²   (bin-integrated σ)
+#
+# M[r, t] = P(reco bin r | true bin t), efficiency included (columns sum to <= 1).
+# The truth predictions are made by the folding engine directly in the true
+# binning of the matrix, for a whole batch of parameter sets at once, and the
+# smearing of the batch is a single matrix product.
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from minerva.flux_folding import flux_folded_binned_xsec_multi
+
+
+@dataclass(frozen=True)
+class MigrationMatrix:
+    matrix: np.ndarray       # (n_reco, n_true), P(reco | true)
+    true_edges: np.ndarray   # (n_true + 1,)
+    reco_edges: np.ndarray   # (n_reco + 1,)
+    meta: dict = field(default_factory=dict)
+
+    @property
+    def true_low(self) -> np.ndarray:
+        return self.true_edges[:-1]
+
+    @property
+    def true_high(self) -> np.ndarray:
+        return self.true_edges[1:]
+
+
+def _edges(edges, n: int, what: str) -> np.ndarray:
+    edges = np.asarray(edges, dtype=float)
+    if edges.shape != (n + 1,) or np.any(np.diff(edges) <= 0):
+        raise ValueError(f"Bordes {what} inválidos: esperaba {n + 1} valores crecientes.")
+    return edges
+
+
+def load_migration(
+    path: Path,
+    reco_edges=None,
+    true_edges=None,
+    normalize: bool = False,
+) -> MigrationMatrix:
+    """
+    Reads a migration matrix (rows = reco bins, columns = true bins).
+
+    .npz : arrays "matrix" (or "M"), and optionally "true_edges", "reco_edges".
+    .csv : numeric matrix, no header (an index row/column like in the covariance
+           files is dropped); edges must come from the arguments.
+
+    Edges given as arguments override the file. Without true edges the true
+    binning is taken equal to the reco binning (square matrix).
+    normalize=True divides each column by its sum (file holds event counts).
+    """
+    path = Path(path)
+    meta = {"source": path.name}
+    if path.suffix.lower() == ".npz":
+        d = np.load(path)
+        M = d["matrix"] if "matrix" in d.files else d["M"]
+        if true_edges is None and "true_edges" in d.files:
+            true_edges = d["true_edges"]
+        if reco_edges is None and "reco_edges" in d.files:
+            reco_edges = d["reco_edges"]
+    else:
+        M = pd.read_csv(path, header=None).to_numpy(dtype=float)
+        n_reco = len(reco_edges) - 1 if reco_edges is not None else None
+        n_true = len(true_edges) - 1 if true_edges is not None else None
+        if n_reco is not None and M.shape[0] == n_reco + 1:
+            M = M[1:, :]
+        if n_true is not None and M.shape[1] == n_true + 1:
+            M = M[:, 1:]
+
+    M = np.asarray(M, dtype=float)
+    if reco_edges is None:
+        raise ValueError("Faltan los bordes reco de la matriz de migración.")
+    reco_edges = _edges(reco_edges, M.shape[0], "reco")
+    true_edges = _edges(reco_edges if true_edges is None else true_edges, M.shape[1], "true")
+
+    if normalize:
+        col = M.sum(axis=0)
+        M = np.divide(M, col, out=np.zeros_like(M), where=col > 0)
+        meta["normalized"] = True
+
+    return MigrationMatrix(matrix=M, true_edges=true_edges, reco_edges=reco_edges, meta=meta)
+
+
+def truth_predictions(
+    migration: MigrationMatrix,
+    flux_E: np.ndarray,
+    flux_phi: np.ndarray,
+    dsigma_dQ2_array_callable,
+    params_list: list[dict],
+    nQ2: int = 20,
+    Ev_max: float = 20.0,
+    nE: int | None = None,
+    flux_kind: str = "linear",
+) -> np.ndarray:
+    """
+    <dσ/dQ²> in the true bins of the matrix for every parameter set, shape
+    (n_params, n_true), from one pass of the folding engine.
+    dsigma_dQ2_array_callable(Ev, Q2, params) must be vectorized. The true bins
+    are usually fine, so nQ2 points per bin can be fewer than for the data bins.
+    nE / flux_kind as in flux_folded_binned_xsec; pass the settings of the data
+    fold (fold_defaults) so reco vs truth differs only by the smearing.
+    """
+    def stacked(Ev, Q2, _):
+        return np.stack([dsigma_dQ2_array_callable(Ev, Q2, p) for p in params_list], axis=-1)
+
+    out = flux_folded_binned_xsec_multi(
+        migration.true_low, migration.true_high, flux_E, flux_phi, stacked, {},
+        nQ2=nQ2, Ev_max=Ev_max, nE=nE, flux_kind=flux_kind,
+    )
+    return out.T
+
+
+def forward_fold(migration: MigrationMatrix, pred_true: np.ndarray) -> np.ndarray:
+    """
+    Reco-space <dσ/dQ²> for truth predictions pred_true (n_true,) or
+    (n_params, n_true): one matrix product for the whole batch.
+    """
+    pred_true = np.asarray(pred_true, dtype=float)
+    dq_true = np.diff(migration.true_edges)
+    dq_reco = np.diff(migration.reco_edges)
+    return (pred_true * dq_true) @ migration.matrix.T / dq_reco
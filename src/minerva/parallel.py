@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 23:02:14 2026
+
+@author: User
+"""
+
+# src/minerva/parallel.py
+# Process-pool backend of flux_folded_binned_xsec (n_workers > 1).
+#
+# The flux and the bin edges are copied once into multiprocessing.shared_memory
+# blocks; workers attach to them in the pool initializer, so tasks only carry
+# index ranges, the callable and params. Two ways of splitting the work:
+#
+#   split="bin"    : each task folds a contiguous block of bins with the serial
+#                    engine (any rule: scalar loop, grid, Eν quadrature, grad).
+#   split="energy" : trapezoid rule over the flux points (nE=None) only; each
+#                    task returns Σ_E w_E φ(E) ∫dQ² acc·dσ/dQ² over a chunk of
+#                    flux points for all bins, and the chunks are summed. Useful
+#                    when there are fewer bins than workers. Needs a vectorized
+#                    callable.
+#
+# The callable must be picklable (a module-level function).
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from minerva.flux_folding import (
+    _grad_func,
+    flux_folded_binned_xsec,
+    muon_kinematics_array,
+    passes_minos_cuts_array,
+)
+
+# arrays attached by the worker initializer: name -> ndarray view
+_SHARED: dict[str, np.ndarray] = {}
+_SHM_HANDLES: list = []
+
+
+def _share(arrays: dict[str, np.ndarray]) -> tuple[list, dict]:
+    """Copies arrays into new shared-memory blocks: (handles, {name: (shm_name, shape, dtype)})."""
+    handles, spec = [], {}
+    for key, arr in arrays.items():
+        arr = np.ascontiguousarray(arr, dtype=float)
+        shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+        handles.append(shm)
+        spec[key] = (shm.name, arr.shape, arr.dtype.str)
+    return handles, spec
+
+
+def _attach(spec: dict) -> None:
+    """Pool initializer: views on the parent's shared-memory blocks."""
+    _SHARED.clear()
+    for key, (name, shape, dtype) in spec.items():
+        # pool workers share the parent's resource tracker, which unlinks the
+        # blocks only if the parent dies without doing it itself
+        shm = shared_memory.SharedMemory(name=name)
+        _SHM_HANDLES.append(shm)
+        _SHARED[key] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def _bin_task(start: int, stop: int, dsigma_dQ2_callable, params: dict, kwargs: dict):
+    s = slice(start, stop)
+    return flux_folded_binned_xsec(
+        _SHARED["q2_low"][s], _SHARED["q2_high"][s], _SHARED["flux_E"], _SHARED["flux_phi"],
+        dsigma_dQ2_callable, params, **kwargs,
+    )
+
+
+def _energy_task(start: int, stop: int, dsigma_dQ2_callable, params: dict, nQ2: int, grad: bool) -> np.ndarray:
+    """Unnormalised numerator of the trapezoid fold over flux points start:stop, (nbins, n_out)."""
+    E = _SHARED["E"][start:stop]
+    w_phi = _SHARED["w_phi"][start:stop]
+    q2_low, q2_high = _SHARED["q2_low"], _SHARED["q2_high"]
+
+    if grad:
+        func = _grad_func(dsigma_dQ2_callable, params)
+    else:
+        def func(Ev, Q2):
+            return np.asarray(dsigma_dQ2_callable(Ev, Q2, params))[..., None]
+
+    t = np.linspace(0.0, 1.0, nQ2)
+    q2_grid = q2_low[:, None] + (q2_high - q2_low)[:, None] * t[None, :]
+    Q2 = q2_grid[:, None, :]
+    Ev = E[None, :, None]
+    E_mu, cos_th = muon_kinematics_array(Ev, Q2)
+    acc = passes_minos_cuts_array(E_mu, cos_th)
+    vals = np.where(acc[..., None], func(Ev, Q2), 0.0)
+    int_Q2 = np.trapezoid(vals, q2_grid[:, None, :, None], axis=-2)       # (nbins, nE, n_out)
+    return np.einsum("e,beo->bo", w_phi, int_Q2)
+
+
+def _chunks(n: int, n_chunks: int) -> list[tuple[int, int]]:
+    edges = np.linspace(0, n, min(n, n_chunks) + 1).round().astype(int)
+    return [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+
+def parallel_fold(
+    q2_low,
+    q2_high,
+    flux_E,
+    flux_phi,
+    dsigma_dQ2_callable,
+    params: dict,
+    n_workers: int | None = None,
+    split: str = "bin",
+    nQ2: int = 80,
+    Ev_max: float = 20.0,
+    grad: bool = False,
+    nE: int | None = None,
+    flux_kind: str = "linear",
+    chunks_per_worker: int = 2,
+):
+    """flux_folded_binned_xsec on a process pool; same return value as the serial call."""
+    n_workers = int(n_workers or os.cpu_count() or 1)
+    q2_low = np.asarray(q2_low, dtype=float)
+    q2_high = np.asarray(q2_high, dtype=float)
+    flux_E = np.asarray(flux_E, dtype=float)
+    flux_phi = np.asarray(flux_phi, dtype=float)
+
+    if split == "bin":
+        arrays = {"q2_low": q2_low, "q2_high": q2_high, "flux_E": flux_E, "flux_phi": flux_phi}
+        tasks = _chunks(len(q2_low), n_workers * chunks_per_worker)
+        kwargs = {"nQ2": nQ2, "Ev_max": Ev_max, "grad": grad, "nE": nE, "flux_kind": flux_kind}
+    elif split == "energy":
+        if nE is not None:
+            raise ValueError("split='energy' solo con la regla del trapecio (nE=None); usa split='bin'.")
+        m = (flux_E > 0.0) & (flux_E < Ev_max) & np.isfinite(flux_phi) & (flux_phi > 0.0)
+        E, phi = flux_E[m], flux_phi[m]
+        if len(E) < 5:
+            raise ValueError("Flujo vacío/mal leído. Revisa el CSV del flujo y sus columnas.")
+        phi_tot = np.trapezoid(phi, E)
+        if phi_tot <= 0:
+            raise ValueError("Normalización de flujo <=0. Revisa el CSV del flujo.")
+        dE = np.diff(E)
+        w = np.zeros_like(E)
+        w[:-1] += 0.5 * dE
+        w[1:] += 0.5 * dE
+        arrays = {"q2_low": q2_low, "q2_high": q2_high, "E": E, "w_phi": w * phi}
+        tasks = _chunks(len(E), n_workers * chunks_per_worker)
+    else:
+        raise ValueError("split debe ser 'bin' o 'energy'.")
+
+    handles, spec = _share(arrays)
+    try:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_attach, initargs=(spec,)) as pool:
+            if split == "bin":
+                futures = [pool.submit(_bin_task, a, b, dsigma_dQ2_callable, params, kwargs) for a, b in tasks]
+                parts = [f.result() for f in futures]
+            else:
+                futures = [pool.submit(_energy_task, a, b, dsigma_dQ2_callable, params, nQ2, grad) for a, b in tasks]
+                num = sum(f.result() for f in futures)
+    finally:
+        for shm in handles:
+            shm.close()
+            shm.unlink()
+
+    if split == "bin":
+        if grad:
+            return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+        return np.concatenate(parts)
+
+    out = num / phi_tot / (q2_high - q2_low)[:, None]
+    return (out[:, 0], out[:, 1:]) if grad else out[:, 0]
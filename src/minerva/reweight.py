@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 14:05:36 2026
+
+@author: User
+"""
+
+# src/minerva/reweight.py
+# Event reweighting for (MA, MV2, vector model) variations.
+#
+# dσ/dQ² is a quadratic form in (FA, F1V, xiF2V) whose coefficients c_k(Ev,Q²)
+# do not depend on the form factors (ccqe_hydrogen_xsec.ls_coefficients). The
+# coefficients are computed once per event and cached next to the event file;
+# a new parameter set only needs the form factors at each event's Q² and a
+# 6-term dot product:
+#
+#   w_i(params) = Σ_k c_ik m_k(params; Q²_i) / dσ_nominal,i
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from ccqe_hydrogen_xsec import (
+    N_LS_TERMS,
+    F1V_xiF2V_array,
+    _FA_dipole,
+    ls_coefficients,
+    ls_monomials,
+)
+from form_factors import vector_ff_provider
+
+
+@dataclass(frozen=True)
+class ReweightSample:
+    Q2: np.ndarray          # (n,)
+    coef: np.ndarray        # (n, 6) cached LS coefficients
+    dsig_nominal: np.ndarray  # (n,) dσ/dQ² at the generation parameters
+    nominal: dict
+
+
+def _params(p: dict) -> tuple[float, float, str]:
+    return float(p.get("MA", 1.00)), float(p.get("MV2", 0.71)), str(p.get("vector_ff", "gkex"))
+
+
+def coefficients_path(events_path: Path) -> Path:
+    events_path = Path(events_path)
+    return events_path.with_name(events_path.stem + ".coef.npy")
+
+
+def write_coefficients(events: np.ndarray, path: Path, chunk_size: int = 1_000_000) -> Path:
+    """Computes c_k(Ev,Q²) for every event, chunk by chunk, into a memory-mapped .npy."""
+    n = len(events)
+    out = np.lib.format.open_memmap(Path(path), mode="w+", dtype=float, shape=(n, N_LS_TERMS))
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        chunk = events[start:stop]
+        out[start:stop] = ls_coefficients(chunk["Ev"], chunk["Q2"])
+    out.flush()
+    del out
+    return Path(path)
+
+
+def dsigma_from_coefficients(coef: np.ndarray, Q2: np.ndarray, params: dict) -> np.ndarray:
+    MA, MV2, vector_ff = _params(params)
+    F1V, xiF2V = F1V_xiF2V_array(Q2, MV2, vector_ff)
+    FA = _FA_dipole(Q2, MA)
+    return np.einsum("nk,nk->n", coef, ls_monomials(FA, F1V, xiF2V))
+
+
+def prepare_sample(events: np.ndarray, nominal: dict, coef: np.ndarray | None = None) -> ReweightSample:
+    """
+    events  : structured array from event_generator (fields Ev, Q2).
+    nominal : parameters the events were generated with (meta["params"]).
+    coef    : cached coefficients (e.g. np.load(coefficients_path(...), mmap_mode="r")).
+    """
+    Q2 = np.asarray(events["Q2"], dtype=float)
+    if coef is None:
+        coef = ls_coefficients(events["Ev"], Q2)
+    dsig = dsigma_from_coefficients(coef, Q2, nominal)
+    return ReweightSample(Q2=Q2, coef=np.asarray(coef), dsig_nominal=dsig, nominal=dict(nominal))
+
+
+def compute_weights(sample: ReweightSample, params_list: list[dict]) -> np.ndarray:
+    """
+    Weights w[p, i] = dσ(params_list[p]) / dσ(nominal) for every event.
+
+    Parameter sets sharing (vector_ff, MV2) reuse the vector form factors and
+    the vector-only part of the quadratic form; only FA changes with MA.
+    """
+    Q2 = sample.Q2
+    c = sample.coef
+    inv_nom = np.divide(1.0, sample.dsig_nominal, out=np.zeros_like(sample.dsig_nominal),
+                        where=sample.dsig_nominal > 0.0)
+
+    W = np.empty((len(params_list), len(Q2)), dtype=float)
+    groups: dict[tuple[str, float | None], list[int]] = {}
+    for p, params in enumerate(params_list):
+        _, MV2, vector_ff = _params(params)
+        vector_ff = vector_ff.lower().strip()
+        # MV2 only splits the models that take it (dipole, Galster), as in batch._vector_key
+        key = (vector_ff, MV2 if "MV2" in vector_ff_provider(vector_ff).params else None)
+        groups.setdefault(key, []).append(p)
+
+    for (vector_ff, _), idx in groups.items():
+        F1V, xiF2V = F1V_xiF2V_array(Q2, _params(params_list[idx[0]])[1], vector_ff)
+        # vector part and the FA-linear / FA-quadratic pieces, shared by the group
+        vec = c[:, 1] * F1V * F1V + c[:, 2] * xiF2V * xiF2V + c[:, 3] * F1V * xiF2V
+        lin = c[:, 4] * F1V + c[:, 5] * xiF2V
+        quad = c[:, 0]
+        for p in idx:
+            MA, _, _ = _params(params_list[p])
+            FA = _FA_dipole(Q2, MA)
+            W[p] = (vec + FA * (lin + FA * quad)) * inv_nom
+    return W
+
+
+def binned_prediction(
+    sample: ReweightSample,
+    weights: np.ndarray,
+    q2_low: np.ndarray,
+    q2_high: np.ndarray,
+    sigma_avg: float,
+    accepted: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    <dσ/dQ²> per bin [1e-38 cm²/GeV²] for each row of weights, from events drawn
+    with flux-averaged total σ = sigma_avg. accepted: optional per-event cut mask.
+    """
+    weights = np.atleast_2d(weights)
+    n = weights.shape[1]
+    q2_low = np.asarray(q2_low, dtype=float)
+    q2_high = np.asarray(q2_high, dtype=float)
+
+    edges = np.concatenate([q2_low, [q2_high[-1]]])
+    if not np.allclose(q2_high[:-1], q2_low[1:]):
+        raise ValueError("binned_prediction necesita bins contiguos.")
+    ibin = np.searchsorted(edges, sample.Q2, side="right") - 1
+    ok = (ibin >= 0) & (ibin < len(q2_low))
+    if accepted is not None:
+        ok &= np.asarray(accepted, dtype=bool)
+
+    out = np.zeros((weights.shape[0], len(q2_low)), dtype=float)
+    for p in range(weights.shape[0]):
+        out[p] = np.bincount(ibin[ok], weights=weights[p, ok], minlength=len(q2_low))
+    return out * (sigma_avg / n) / (q2_high - q2_low)
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 16:02:11 2026
+
+@author: User
+"""
+
+# src/minerva/total_xsec.py
+# Total CCQE cross section σ(Eν) for \bar{nu}_mu p -> mu^+ n and nu_mu n -> mu^- p.
+#
+# σ(Eν) = ∫ dQ² dσ/dQ² over the full physical range [Q²_min(Eν), Q²_max(Eν)].
+# The integral is done with Gauss-Legendre in v = ln(1 + (Q² - Q²_min)/Q2_SCALE)
+# (the mapping of xsec_table), which flattens the dipole-like fall-off, so a
+# single (nE, n_gauss) array evaluation covers a whole energy grid. With the
+# default 64 nodes the result agrees with adaptive quadrature to < 1e-8.
+#
+# Results are cached per (vector model, MA, MV2, ν/ν̄, nodes, energy grid), so
+# repeated flux averages / event rates with the same parameters cost a dot product.
+from __future__ import annotations
+
+import hashlib
+from functools import lru_cache
+
+import numpy as np
+
+from ccqe_hydrogen_xsec import F1V_xiF2V_array, _FA_dipole, ls_coefficients, ls_monomials
+from form_factors import vector_ff_provider
+from minerva.flux_folding import MP, MN, M_MU, q2_limits
+from minerva.event_generator import EV_THRESHOLD
+from minerva.xsec_table import Q2_SCALE
+
+N_GAUSS = 64
+
+# nu_mu n -> mu^- p threshold (neutron at rest)
+EV_THRESHOLD_NU = ((MP + M_MU) ** 2 - MN * MN) / (2.0 * MN)
+
+# 1e-38 cm² -> m²
+XSEC_UNIT_M2 = 1e-42
+
+_CACHE: dict = {}
+_CACHE_MAX = 256
+
+
+def _params(p: dict) -> tuple[float, float, str]:
+    return float(p.get("MA", 1.00)), float(p.get("MV2", 0.71)), str(p.get("vector_ff", "gkex"))
+
+
+@lru_cache(maxsize=16)
+def _gauss_legendre_01(n: int) -> tuple[np.ndarray, np.ndarray]:
+    """Gauss-Legendre nodes and weights on [0, 1]."""
+    x, w = np.polynomial.legendre.leggauss(n)
+    return 0.5 * (x + 1.0), 0.5 * w
+
+
+def q2_limits_channel(Ev, is_antinu: bool = True):
+    """q2_limits for ν̄ p (target proton) or ν n (target neutron)."""
+    if is_antinu:
+        return q2_limits(Ev)
+    return q2_limits(Ev, Mp=MN, Mn=MP)
+
+
+def _total_xsec(Ev: np.ndarray, params: dict, is_antinu: bool, n_gauss: int) -> np.ndarray:
+    MA, MV2, vector_ff = _params(params)
+    threshold = EV_THRESHOLD if is_antinu else EV_THRESHOLD_NU
+    above = Ev > threshold
+    sigma = np.zeros(Ev.shape, dtype=float)
+    if not np.any(above):
+        return sigma
+
+    E = Ev[above]
+    Q2_min, Q2_max = q2_limits_channel(E, is_antinu)
+    L = np.log1p((Q2_max - Q2_min) / Q2_SCALE)
+
+    x, w = _gauss_legendre_01(n_gauss)
+    v = L[:, None] * x[None, :]
+    Q2 = Q2_min[:, None] + Q2_SCALE * np.expm1(v)
+    jac = (Q2_SCALE * L)[:, None] * np.exp(v) * w[None, :]   # dQ² = Q2_SCALE e^v L dx
+
+    F1V, xiF2V = F1V_xiF2V_array(Q2, MV2, vector_ff)
+    FA = _FA_dipole(Q2, MA)
+    dsig = np.einsum("...k,...k->...", ls_coefficients(E[:, None], Q2, is_antinu=is_antinu),
+                     ls_monomials(FA, F1V, xiF2V))
+    sigma[above] = np.sum(dsig * jac, axis=1)
+    return sigma
+
+
+def _cache_key(Ev: np.ndarray, params: dict, is_antinu: bool, n_gauss: int) -> tuple:
+    MA, MV2, vector_ff = _params(params)
+    vector_ff = vector_ff.lower().strip()
+    grid = hashlib.blake2b(Ev.tobytes(), digest_size=16).hexdigest()
+    MV2_key = MV2 if "MV2" in vector_ff_provider(vector_ff).params else None   # dipole, Galster
+    return (vector_ff, MA, MV2_key, bool(is_antinu), int(n_gauss), Ev.shape, grid)
+
+
+def total_xsec(Ev, params: dict, is_antinu: bool = True, n_gauss: int = N_GAUSS) -> np.ndarray:
+    """
+    σ(Eν) [1e-38 cm²] on an array of energies (zero below threshold).
+    params: {"MA", "MV2", "vector_ff"} as for dsigma_dQ2_numubar_p.
+    The returned array is cached and read-only.
+    """
+    Ev = np.ascontiguousarray(Ev, dtype=float)
+    key = _cache_key(Ev, params, is_antinu, n_gauss)
+    sigma = _CACHE.get(key)
+    if sigma is None:
+        sigma = _total_xsec(Ev, params, is_antinu, n_gauss)
+        sigma.setflags(write=False)
+        if len(_CACHE) >= _CACHE_MAX:
+            _CACHE.pop(next(iter(_CACHE)))
+        _CACHE[key] = sigma
+    return sigma
+
+
+def clear_cache() -> None:
+    _CACHE.clear()
+
+
+def _flux_in_range(flux_E, flux_phi, Ev_max: float) -> tuple[np.ndarray, np.ndarray]:
+    # same selection as flux_folded_binned_xsec
+    flux_E = np.asarray(flux_E, dtype=float)
+    flux_phi = np.asarray(flux_phi, dtype=float)
+    m = (flux_E > 0.0) & (flux_E < Ev_max) & np.isfinite(flux_phi) & (flux_phi > 0.0)
+    E = flux_E[m]
+    phi = flux_phi[m]
+    if len(E) < 5:
+        raise ValueError("Flujo vacío/mal leído. Revisa el CSV del flujo y sus columnas.")
+    return E, phi
+
+
+def flux_integrated_total_xsec(
+    flux_E: np.ndarray,
+    flux_phi: np.ndarray,
+    params: dict,
+    is_antinu: bool = True,
+    Ev_max: float = 20.0,
+    n_gauss: int = N_GAUSS,
+) -> tuple[float, float]:
+    """
+    Returns (∫ φ σ dE, ∫ φ dE), trapezoid over the flux points as in
+    flux_folded_binned_xsec. Units: [flux units × 1e-38 cm² × GeV], [flux units × GeV].
+    """
+    E, phi = _flux_in_range(flux_E, flux_phi, Ev_max)
+    sigma = total_xsec(E, params, is_antinu=is_antinu, n_gauss=n_gauss)
+    return float(np.trapezoid(phi * sigma, E)), float(np.trapezoid(phi, E))
+
+
+def flux_averaged_total_xsec(
+    flux_E: np.ndarray,
+    flux_phi: np.ndarray,
+    params: dict,
+    is_antinu: bool = True,
+    Ev_max: float = 20.0,
+    n_gauss: int = N_GAUSS,
+) -> float:
+    """<σ>_φ = ∫ φ σ dE / ∫ φ dE  [1e-38 cm²]."""
+    num, phi_tot = flux_integrated_total_xsec(flux_E, flux_phi, params, is_antinu, Ev_max, n_gauss)
+    if phi_tot <= 0:
+        raise ValueError("Normalización de flujo <=0. Revisa el CSV del flujo.")
+    return num / phi_tot
+
+
+def event_rate(
+    flux_E: np.ndarray,
+    flux_phi: np.ndarray,
+    params: dict,
+    n_targets: float,
+    pot: float = 1.0,
+    is_antinu: bool = True,
+    Ev_max: float = 20.0,
+    n_gauss: int = N_GAUSS,
+) -> float:
+    """
+    Expected number of CCQE interactions (no cuts):
+
+      N = n_targets * pot * ∫ φ(E) σ(E) dE
+
+    with φ in [ν / m² / POT / GeV] (the MINERvA flux convention) and n_targets
+    the number of free protons (ν̄) or neutrons (ν).
+    """
+    num, _ = flux_integrated_total_xsec(flux_E, flux_phi, params, is_antinu, Ev_max, n_gauss)
+    return float(n_targets) * float(pot) * num * XSEC_UNIT_M2
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 19:02:37 2026
+
+@author: User
+"""
+
+# src/minerva/zexp_fit.py
+# z-expansion axial form factor fits to the MINERvA hydrogen bins.
+#
+# dσ/dQ² = c0 FA² + (c4 F1V + c5 xiF2V) FA + (vector part), and with the
+# z-expansion FA = Σ_k a_k z^k is linear in the coefficients a. The flux-folded,
+# cut-applied bin prediction is therefore a quadratic form
+#
+#   pred_i(a) = aᵀ Q_i a + L_i · a + V_i
+#
+# whose Q_i, L_i, V_i are folded once (flux_folded_binned_xsec_multi). The
+# constraints (FA(0) = gA, sum rules) are linear, a = a0 + N b, so the form is
+# reduced to the free coefficients b and χ²(b) and its gradient are closed-form:
+# a fit needs no further foldings.
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from ccqe_hydrogen_xsec import GA_ZEXP, F1V_xiF2V_array, _FA_dipole, ls_coefficients
+from form_factors import ZEXP_T0, ZEXP_TCUT, zexp_affine_map, zexp_z
+from minerva.flux_folding import flux_folded_binned_xsec_multi
+
+N_FREE = 4           # kmax = 8 with the 4 sum rules
+PRIOR_WIDTH = 5.0    # Gaussian prior |a_k| ~ 5 on every coefficient (Meyer et al.)
+
+
+@dataclass(frozen=True)
+class ZexpQuadraticForm:
+    Q: np.ndarray    # (nbins, nb, nb) in the free coefficients
+    L: np.ndarray    # (nbins, nb)
+    V: np.ndarray    # (nbins,)
+    a0: np.ndarray   # (kmax+1,) a = a0 + N b
+    N: np.ndarray    # (kmax+1, nb)
+    meta: dict = field(default_factory=dict)
+
+
+def _zexp_outputs(Ev, Q2, K: int, MV2: float, vector_ff: str) -> np.ndarray:
+    """(quadratic upper triangle, linear, constant) integrands, stacked on the last axis."""
+    c = ls_coefficients(Ev, Q2)
+    F1V, xiF2V = F1V_xiF2V_array(Q2, MV2, vector_ff)
+    zp = zexp_z(Q2)[..., None] ** np.arange(K)                      # (..., K)
+
+    iu, ju = np.triu_indices(K)
+    quad = c[..., 0:1] * zp[..., iu] * zp[..., ju]
+    lin = (c[..., 4] * F1V + c[..., 5] * xiF2V)[..., None] * zp
+    const = c[..., 1] * F1V * F1V + c[..., 2] * xiF2V * xiF2V + c[..., 3] * F1V * xiF2V
+    return np.concatenate([quad, lin, const[..., None]], axis=-1)
+
+
+def build_zexp_form(
+    q2_low: np.ndarray,
+    q2_high: np.ndarray,
+    flux_E: np.ndarray,
+    flux_phi: np.ndarray,
+    params: dict,
+    n_free: int = N_FREE,
+    nQ2: int = 80,
+    Ev_max: float = 20.0,
+    nE: int | None = None,
+) -> ZexpQuadraticForm:
+    """
+    Folds the z-expansion quadratic form once (vector model from params: MV2, vector_ff)
+    and reduces it to the n_free coefficients left by FA(0) = GA_ZEXP and the sum rules.
+    """
+    MV2 = float(params.get("MV2", 0.71))
+    vector_ff = str(params.get("vector_ff", "gkex"))
+    a0, N = zexp_affine_map(n_free, gA=GA_ZEXP)
+    K = len(a0)
+
+    folded = flux_folded_binned_xsec_multi(
+        q2_low, q2_high, flux_E, flux_phi,
+        lambda Ev, Q2, p: _zexp_outputs(Ev, Q2, K, MV2, vector_ff), params, nQ2=nQ2, Ev_max=Ev_max, nE=nE,
+    )
+    n_tri = K * (K + 1) // 2
+    iu, ju = np.triu_indices(K)
+    Qa = np.zeros((len(folded), K, K))
+    Qa[:, iu, ju] = folded[:, :n_tri]
+    Qa[:, ju, iu] = folded[:, :n_tri]
+    La = folded[:, n_tri:n_tri + K]
+    Va = folded[:, -1]
+
+    # a = a0 + N b
+    Q = np.einsum("kp,ikl,lq->ipq", N, Qa, N)
+    L = np.einsum("kp,ik->ip", N, 2.0 * np.einsum("ikl,l->ik", Qa, a0) + La)
+    V = np.einsum("k,ikl,l->i", a0, Qa, a0) + La @ a0 + Va
+
+    meta = {
+        "params": {"MV2": MV2, "vector_ff": vector_ff},
+        "n_free": int(n_free),
+        "gA": GA_ZEXP,
+        "tcut": ZEXP_TCUT,
+        "t0": ZEXP_T0,
+        "nQ2": int(nQ2),
+        "Ev_max": float(Ev_max),
+        "nE": nE,
+        "q2_low": np.asarray(q2_low, dtype=float).tolist(),
+        "q2_high": np.asarray(q2_high, dtype=float).tolist(),
+    }
+    return ZexpQuadraticForm(Q=Q, L=L, V=V, a0=a0, N=N, meta=meta)
+
+
+def save_zexp_form(form: ZexpQuadraticForm, path: Path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez(path, Q=form.Q, L=form.L, V=form.V, a0=form.a0, N=form.N)
+    path.with_suffix(".json").write_text(json.dumps(form.meta, indent=2))
+    return path
+
+
+def load_zexp_form(path: Path) -> ZexpQuadraticForm:
+    path = Path(path)
+    d = np.load(path)
+    meta = json.loads(path.with_suffix(".json").read_text())
+    return ZexpQuadraticForm(Q=d["Q"], L=d["L"], V=d["V"], a0=d["a0"], N=d["N"], meta=meta)
+
+
+def zexp_coefficients_from_free(form: ZexpQuadraticForm, b) -> np.ndarray:
+    return form.a0 + form.N @ np.asarray(b, dtype=float)
+
+
+def zexp_prediction(form: ZexpQuadraticForm, b) -> np.ndarray:
+    """<dσ/dQ²> per bin [1e-38 cm²/GeV²] for free coefficients b."""
+    b = np.asarray(b, dtype=float)
+    return form.V + form.L @ b + np.einsum("p,ipq,q->i", b, form.Q, b)
+
+
+def zexp_chi2_and_grad(
+    form: ZexpQuadraticForm,
+    b,
+    data: np.ndarray,
+    cov_inv: np.ndarray,
+    prior_width: float | None = PRIOR_WIDTH,
+) -> tuple[float, np.ndarray]:
+    """χ²(b) + Σ_k (a_k/prior_width)² and its gradient, both analytic."""
+    b = np.asarray(b, dtype=float)
+    r = zexp_prediction(form, b) - data
+    J = form.L + 2.0 * np.einsum("ipq,q->ip", form.Q, b)        # d pred / d b
+    Wr = cov_inv @ r
+    chi2 = float(r @ Wr)
+    grad = 2.0 * J.T @ Wr
+    if prior_width:
+        a = zexp_coefficients_from_free(form, b)
+        chi2 += float(np.sum((a / prior_width) ** 2))
+        grad = grad + 2.0 * form.N.T @ a / prior_width**2
+    return chi2, grad
+
+
+def zexp_chi2_hessian(
+    form: ZexpQuadraticForm,
+    b,
+    data: np.ndarray,
+    cov_inv: np.ndarray,
+    prior_width: float | None = PRIOR_WIDTH,
+) -> np.ndarray:
+    """Exact Hessian of zexp_chi2_and_grad: 2 Jᵀ V⁻¹ J + 4 Σ_i (V⁻¹ r)_i Q_i (+ 2 Nᵀ N / w²)."""
+    b = np.asarray(b, dtype=float)
+    r = zexp_prediction(form, b) - data
+    J = form.L + 2.0 * np.einsum("ipq,q->ip", form.Q, b)
+    H = 2.0 * J.T @ cov_inv @ J + 4.0 * np.einsum("i,ipq->pq", cov_inv @ r, form.Q)
+    if prior_width:
+        H = H + 2.0 * form.N.T @ form.N / prior_width**2
+    return H
+
+
+def zexp_free_from_dipole(MA: float, n_free: int = N_FREE, Q2_max: float = 3.0) -> np.ndarray:
+    """Free coefficients whose FA best matches the dipole (linear least squares); a fit start."""
+    a0, N = zexp_affine_map(n_free, gA=GA_ZEXP)
+    Q2 = np.linspace(0.0, Q2_max, 200)
+    Z = zexp_z(Q2)[:, None] ** np.arange(len(a0))
+    b, *_ = np.linalg.lstsq(Z @ N, _FA_dipole(Q2, MA) - Z @ a0, rcond=None)
+    return b
+
+
+def fit_zexp(
+    form: ZexpQuadraticForm,
+    data: np.ndarray,
+    cov: np.ndarray,
+    b0=None,
+    prior_width: float | None = PRIOR_WIDTH,
+) -> dict:
+    """
+    Minimises χ² over the free z-expansion coefficients (BFGS, analytic gradient).
+    Returns {"free", "coeffs", "chi2", "chi2_data", "ndof", "cov_free", "n_eval", "success"};
+    cov_free = 2 H⁻¹ with H the exact Hessian at the minimum (zexp_chi2_hessian),
+    not BFGS's path-dependent approximation.
+    """
+    from scipy.optimize import minimize
+
+    data = np.asarray(data, dtype=float)
+    cov_inv = np.linalg.inv(cov)
+    n_free = form.N.shape[1]
+    if b0 is None:
+        b0 = zexp_free_from_dipole(1.00, n_free)
+
+    res = minimize(lambda b: zexp_chi2_and_grad(form, b, data, cov_inv, prior_width),
+                   np.asarray(b0, dtype=float), jac=True, method="BFGS")
+    b = res.x
+    r = zexp_prediction(form, b) - data
+
+    return {
+        "free": b,
+        "coeffs": zexp_coefficients_from_free(form, b),
+        "chi2": float(res.fun),
+        "chi2_data": float(r @ cov_inv @ r),
+        "ndof": int(len(data) - n_free),
+        "cov_free": 2.0 * np.linalg.inv(zexp_chi2_hessian(form, b, data, cov_inv, prior_width)),  # χ² = -2 ln L
+        "n_eval": int(res.nfev),
+        "success": bool(res.success),
+    }
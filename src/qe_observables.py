@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 14:37:48 2026
+
+@author: User
+"""
+
+# src/qe_observables.py
+# Kinematic-variable transforms of the CCQE cross section on the free nucleon.
+#
+# At fixed Eν the 2->2 QE kinematics (nucleon of mass M at rest, the single M
+# of both engines) is a one-to-one map Q² -> (Eμ, cosθμ):
+#
+#   Eμ = Eν - Q²/(2M),   pμ cosθμ = Eμ - (Q² + m²)/(2Eν),   pT = pμ sinθμ
+#
+# so every single-differential cross section follows from dσ/dQ² at the same
+# (Eν, Q²) point through an analytic Jacobian:
+#
+#   dσ/dEμ     = 2M dσ/dQ²
+#   dσ/dcosθμ  = (2 Eν pμ / f_rec) dσ/dQ²,  f_rec = 1 + Eν (pμ - Eμ cosθμ)/(M pμ)
+#   dσ/dΩ      = dσ/dcosθμ / (2π)
+#   dσ/dpT     = |dQ²/dpT| dσ/dQ²,          d(pT²)/dQ² = (pμ cosθμ)(1/M + 1/Eν) - Eμ/M
+#
+# (pT is not monotonic in Q²: dσ/dpT here is the density along Q² at fixed Eν,
+# to be summed over both branches when histogrammed in pT; it diverges where
+# d(pT²)/dQ² = 0.)
+#
+# dσ/dQ² comes from either engine, evaluated with one set of form factors and
+# one m_mu (kinematics, Jacobians and both engines):
+#   "ls"          : Llewellyn-Smith A, B, C (ccqe_hydrogen_xsec.ls_coefficients).
+#                   By default without the -m²/4M² [(F1V+ξF2V)² + (FA+2F_P)² -
+#                   (4+Q²/M²)F_P²] part of A, as dsigma_dQ2_numubar_p and the
+#                   folds; exact_lepton_mass=True adds it.
+#   "contraction" : lepton-hadron contraction η~_{μν} H~^{μν} (ccqe_contraction),
+#                   dσ/dQ² = G_F² cos²θ_C Re X / (4π Eν²), the dσ/dΩ of
+#                   dsigma_dOmega times 2π |dcosθμ/dQ²|.
+# In the contraction GA = -FA (FA < 0 in the LS convention) and F2V = ξF2V.
+# The two agree as m_μ² -> 0 (1e-12 at m_μ = 1 keV). At the muon mass,
+# |contraction/ls - 1| for ν̄ p over the physical Q² range (median / max, the
+# max at the kinematic endpoint where dσ/dQ² -> 0):
+#
+#   exact_lepton_mass  pion_pole   Eν = 0.5 GeV    1 GeV         3 GeV
+#   False              False       1.2% / 30%      0.6% / 4.8%   0.1% / 0.7%
+#   False              True        3.7% / 68%      1.3% / 7.7%   0.1% / 0.9%
+#   True               False       0.6% / 32%      0.4% / 3.4%   0.1% / 0.5%
+#   True               True        0.7% / 111%     0.4% / 3.5%   0.1% / 0.5%
+#
+# (ν n: below 0.8% everywhere, 0.1% with exact_lepton_mass.) With
+# exact_lepton_mass and pion_pole=False every term agrees to round-off except
+# the m² F1V·F2V term of the contraction's w4, which is imaginary and dropped
+# by Re X; with the pion pole the contraction's F_P terms (not normalised as in
+# LS) add to it, which dominates near the endpoint at low Eν.
+# cross_check_engines returns both from one pass.
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+import instrumentation as _inst
+from ccqe_contraction import contraction_lep_had
+from ccqe_hydrogen_xsec import (
+    COS_TC,
+    GEV2_TO_CM2,
+    GF,
+    M,
+    M_MU,
+    M_PI,
+    F1V_xiF2V_array,
+    _FA_dipole,
+    ls_coefficients,
+    ls_monomials,
+)
+
+ENGINES = ("ls", "contraction")
+
+
+@dataclass(frozen=True)
+class QEObservables:
+    Ev: np.ndarray              # [GeV]
+    Q2: np.ndarray              # [GeV²]
+    E_mu: np.ndarray            # [GeV]       NaN outside the physical region
+    p_mu: np.ndarray            # [GeV]
+    cos_th: np.ndarray
+    pT: np.ndarray              # [GeV]
+    dsigma_dQ2: np.ndarray      # [1e-38 cm²/GeV²]
+    dsigma_dcos: np.ndarray     # [1e-38 cm²]
+    dsigma_dOmega: np.ndarray   # [1e-38 cm²/sr]
+    dsigma_dEmu: np.ndarray     # [1e-38 cm²/GeV]
+    dsigma_dpT: np.ndarray      # [1e-38 cm²/GeV]
+
+
+def qe_kinematics(Ev, Q2, m_mu: float = M_MU):
+    """
+    (E_mu, p_mu, cos_th, pT, f_rec) broadcast over (Ev, Q2), equal-mass QE
+    kinematics; NaN where the point is unphysical.
+    """
+    Ev, Q2 = np.broadcast_arrays(np.asarray(Ev, dtype=float), np.asarray(Q2, dtype=float))
+    E_mu = Ev - Q2 / (2.0 * M)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p_mu = np.sqrt(np.where(E_mu > m_mu, E_mu * E_mu - m_mu * m_mu, np.nan))
+        pc = E_mu - (Q2 + m_mu * m_mu) / (2.0 * Ev)
+        cos_th = pc / p_mu
+    bad = ~np.isfinite(cos_th) | (cos_th < -1.0) | (cos_th > 1.0) | (Ev <= 0.0) | (Q2 < 0.0)
+    cos_th = np.where(bad, np.nan, cos_th)
+    p_mu = np.where(bad, np.nan, p_mu)
+    E_mu = np.where(bad, np.nan, E_mu)
+    pT = np.sqrt(np.maximum(p_mu * p_mu - pc * pc, 0.0))
+    f_rec = 1.0 + Ev * (p_mu - E_mu * cos_th) / (M * p_mu)
+    return E_mu, p_mu, cos_th, pT, f_rec
+
+
+def qe_jacobians(Ev, Q2, m_mu: float = M_MU):
+    """(|dQ²/dcosθμ|, |dQ²/dEμ|, |dQ²/dpT|) at (Ev, Q2); NaN where unphysical."""
+    Ev, Q2 = np.broadcast_arrays(np.asarray(Ev, dtype=float), np.asarray(Q2, dtype=float))
+    E_mu, p_mu, cos_th, pT, f_rec = qe_kinematics(Ev, Q2, m_mu=m_mu)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        d_cos = 2.0 * Ev * p_mu / f_rec
+        dpT2 = p_mu * cos_th * (1.0 / M + 1.0 / Ev) - E_mu / M
+        d_pT = np.abs(2.0 * pT / dpT2)
+    d_Emu = np.where(np.isfinite(E_mu), 2.0 * M, np.nan)
+    return d_cos, d_Emu, d_pT
+
+
+def transform_observables(Ev, Q2, dsigma_dQ2, m_mu: float = M_MU) -> QEObservables:
+    """All single-differential cross sections from dσ/dQ² [1e-38 cm²/GeV²] at (Ev, Q2)."""
+    Ev, Q2, dsigma_dQ2 = np.broadcast_arrays(
+        np.asarray(Ev, dtype=float), np.asarray(Q2, dtype=float), np.asarray(dsigma_dQ2, dtype=float)
+    )
+    E_mu, p_mu, cos_th, pT, _ = qe_kinematics(Ev, Q2, m_mu=m_mu)
+    d_cos, d_Emu, d_pT = qe_jacobians(Ev, Q2, m_mu=m_mu)
+    ok = np.isfinite(cos_th)
+    s = np.where(ok, dsigma_dQ2, 0.0)
+    with np.errstate(invalid="ignore"):
+        dcos = np.where(ok, s * d_cos, 0.0)
+        dpT = np.where(ok, s * d_pT, 0.0)
+    return QEObservables(
+        Ev=Ev, Q2=Q2, E_mu=E_mu, p_mu=p_mu, cos_th=cos_th, pT=pT,
+        dsigma_dQ2=s,
+        dsigma_dcos=dcos,
+        dsigma_dOmega=dcos / (2.0 * np.pi),
+        dsigma_dEmu=np.where(ok, s * d_Emu, 0.0),
+        dsigma_dpT=dpT,
+    )
+
+
+# -----------------------
+# Engines on a shared form-factor evaluation
+# -----------------------
+def _form_factors(Q2, MA: float, MV2: float, vector_ff: str):
+    """(FA, F1V, ξF2V) in the LS convention, evaluated once per Q² array."""
+    t0 = _inst.tic()
+    F1V, xiF2V = F1V_xiF2V_array(Q2, MV2, vector_ff)
+    _inst.toc("xsec.vector_ff", t0)
+    return _FA_dipole(Q2, MA), F1V, xiF2V
+
+
+def _ls_dsigma_dQ2(Ev, Q2, ff, is_antinu: bool, pion_pole: bool, exact_lepton_mass: bool, m_mu: float) -> np.ndarray:
+    c = ls_coefficients(
+        Ev, Q2, is_antinu=is_antinu, m_mu=m_mu, exact_lepton_mass=exact_lepton_mass, pion_pole=pion_pole
+    )
+    return np.einsum("...k,...k->...", c, ls_monomials(*ff))
+
+
+def _contraction_dsigma_dQ2(Ev, Q2, ff, is_antinu: bool, pion_pole: bool, kin, m_mu: float) -> np.ndarray:
+    FA, F1V, xiF2V = ff
+    E_mu, _, cos_th, _, _ = kin
+    ok = np.isfinite(cos_th)
+    GA = -FA
+    FP = (2.0 * M * M * GA) / (M_PI * M_PI + Q2) if pion_pole else np.zeros_like(GA)
+    X = contraction_lep_had(
+        Q2, Ev, np.where(ok, E_mu, m_mu), np.where(ok, cos_th, 0.0), M, m_mu,
+        F1V, xiF2V, GA, FP, is_antinu=is_antinu,
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        val = (GF * GF) * (COS_TC * COS_TC) * np.real(X) / (4.0 * np.pi * Ev * Ev) * GEV2_TO_CM2 / 1e-38
+    return np.where(ok, val, 0.0)
+
+
+def qe_observables(
+    Ev,
+    Q2,
+    MA: float = 1.00,
+    MV2: float = 0.71,
+    vector_ff: str = "gkex",
+    is_antinu: bool = True,
+    engine: str = "ls",
+    pion_pole: bool = True,
+    exact_lepton_mass: bool = False,
+    m_mu: float = M_MU,
+) -> QEObservables:
+    """
+    dσ/dQ², dσ/dcosθμ, dσ/dΩ, dσ/dEμ and dσ/dpT from one vectorized evaluation
+    over broadcast (Ev, Q2). is_antinu=True: \\bar{ν}_μ p -> μ^+ n, False: ν_μ n -> μ^- p.
+    exact_lepton_mass only enters the LS engine: False (default) is the LS of
+    dsigma_dQ2_numubar_p and the folds, without the m²/M² part of A; True adds
+    it. pion_pole enters the contraction and the exact LS.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"engine debe ser uno de {ENGINES}.")
+    Ev, Q2 = np.broadcast_arrays(np.asarray(Ev, dtype=float), np.asarray(Q2, dtype=float))
+    if _inst.ENABLED:
+        _inst.count("xsec.array_points", Ev.size)
+    kin = qe_kinematics(Ev, Q2, m_mu=m_mu)
+    ff = _form_factors(Q2, MA, MV2, vector_ff)
+    if engine == "ls":
+        dsig = np.where(
+            np.isfinite(kin[2]), _ls_dsigma_dQ2(Ev, Q2, ff, is_antinu, pion_pole, exact_lepton_mass, m_mu), 0.0
+        )
+    else:
+        dsig = _contraction_dsigma_dQ2(Ev, Q2, ff, is_antinu, pion_pole, kin, m_mu)
+    return transform_observables(Ev, Q2, dsig, m_mu=m_mu)
+
+
+def cross_check_engines(
+    Ev,
+    Q2,
+    MA: float = 1.00,
+    MV2: float = 0.71,
+    vector_ff: str = "gkex",
+    is_antinu: bool = True,
+    pion_pole: bool = True,
+    exact_lepton_mass: bool = False,
+    m_mu: float = M_MU,
+) -> dict:
+    """
+    LS vs contraction dσ/dQ² over broadcast (Ev, Q2) from one kinematics and
+    form-factor evaluation, with the same m_mu and pion_pole in both. The LS
+    side omits the m²/M² part of A unless exact_lepton_mass=True. Returns
+    {"ls", "contraction" (QEObservables), "rel_diff" (contraction/ls - 1, NaN
+    where ls = 0), "max_rel_diff"}.
+    """
+    Ev, Q2 = np.broadcast_arrays(np.asarray(Ev, dtype=float), np.asarray(Q2, dtype=float))
+    if _inst.ENABLED:
+        _inst.count("xsec.array_points", Ev.size)
+    kin = qe_kinematics(Ev, Q2, m_mu=m_mu)
+    ok = np.isfinite(kin[2])
+    ff = _form_factors(Q2, MA, MV2, vector_ff)
+    ls = np.where(ok, _ls_dsigma_dQ2(Ev, Q2, ff, is_antinu, pion_pole, exact_lepton_mass, m_mu), 0.0)
+    ct = _contraction_dsigma_dQ2(Ev, Q2, ff, is_antinu, pion_pole, kin, m_mu)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rel = np.where(ls != 0.0, ct / ls - 1.0, np.nan)
+    return {
+        "ls": transform_observables(Ev, Q2, ls, m_mu=m_mu),
+        "contraction": transform_observables(Ev, Q2, ct, m_mu=m_mu),
+        "rel_diff": rel,
+        "max_rel_diff": float(np.nanmax(np.abs(rel))) if np.any(np.isfinite(rel)) else float("nan"),
+    }